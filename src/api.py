@@ -6,60 +6,551 @@ DishDazzle - API Module
 Handles OpenRouter API integration for recipe suggestions and chatbot
 """
 
+import os
+import re
 import json
+import time
+import queue
+import atexit
+import hashlib
+import sqlite3
+import asyncio
 import logging
 import threading
-from typing import List, Dict, Any, Optional, Callable
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Coroutine, NamedTuple, Tuple, TYPE_CHECKING
 
-from openai import OpenAI
+# openai and httpx are among the slowest imports at startup; they are loaded
+# by initialize_api the first time a client is actually built
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+# The Qt dispatcher is only needed by the GUI; scripts and tests can run without PyQt5
+try:
+    from PyQt5.QtCore import QObject, pyqtSignal
+except ImportError:
+    QObject = None
+
+# orjson parses model responses several times faster; fall back to the stdlib if absent.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is unchanged.
+try:
+    import orjson as fast_json
+except ImportError:
+    fast_json = json
 
 from utils import load_config
 
 # Get logger
 logger = logging.getLogger(__name__)
 
-# API response cache
-response_cache = {}
-client = None
+# Sentinel distinguishing "not cached" from a cached falsy value
+_MISSING = object()
+
+# Writes to the persistent response cache file
+UPSERT_CACHE_SQL = "INSERT OR REPLACE INTO response_cache (key, expires_at, value) VALUES (?, ?, ?)"
+DELETE_EXPIRED_CACHE_KEY_SQL = "DELETE FROM response_cache WHERE key = ? AND expires_at < ?"
+PRUNE_CACHE_SQL = (
+    "DELETE FROM response_cache WHERE key NOT IN "
+    "(SELECT key FROM response_cache ORDER BY expires_at DESC LIMIT ?)"
+)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed TTL
+    
+    When a path is given, entries are also written to a small SQLite file so
+    answers survive restarts; memory misses fall through to the file. Writes to
+    the file go through a background thread, and only the in-memory dictionary
+    is guarded by the lock, so a slow disk never holds up a lookup.
+    """
+    
+    def __init__(self, maxsize: int = 256, ttl: float = 3600, path: Optional[Path] = None, disk_maxsize: int = 2048):
+        """
+        Args:
+            maxsize: Maximum number of entries kept in memory before the least recently used is evicted
+            ttl: Seconds an entry stays valid after it was stored
+            path: Optional SQLite file backing the cache across sessions
+            disk_maxsize: Maximum number of entries kept in the file; those expiring soonest are dropped first
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.disk_maxsize = disk_maxsize
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self._writes: "queue.Queue[Optional[List[Tuple[str, Tuple]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at < time.time():
+                    del self._data[key]
+                    return default
+                
+                self._data.move_to_end(key)
+                return value
+        
+        # Memory miss: read the file without holding the lock
+        entry = self._disk_get(key)
+        if entry is None:
+            return default
+        
+        expires_at, value = entry
+        if expires_at < time.time():
+            self._queue_write([(DELETE_EXPIRED_CACHE_KEY_SQL, (self._disk_key(key), time.time()))])
+            return default
+        
+        with self._lock:
+            # A value stored while the file was being read is newer; keep it
+            if key not in self._data:
+                self._remember(key, entry)
+        return value
+    
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __setitem__(self, key: Any, value: Any) -> None:
+        entry = (time.time() + self.ttl, value)
+        with self._lock:
+            self._remember(key, entry)
+        
+        if self.path is not None:
+            try:
+                encoded = json.dumps(value)
+            except (TypeError, ValueError) as e:
+                logger.error("Error writing persistent API cache: %s", e)
+                return
+            self._queue_write([
+                (UPSERT_CACHE_SQL, (self._disk_key(key), entry[0], encoded)),
+                (PRUNE_CACHE_SQL, (self.disk_maxsize,)),
+            ])
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+    
+    def clear(self) -> None:
+        """Remove every entry, including those persisted to disk"""
+        with self._lock:
+            self._data.clear()
+        self._queue_write([("DELETE FROM response_cache", ())])
+    
+    def flush(self) -> None:
+        """Block until every queued write has reached the file"""
+        if self._writer is not None:
+            self._writes.join()
+    
+    def close(self) -> None:
+        """Finish queued writes and close the file; the cache keeps working in memory"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join()
+        
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+            self.path = None
+    
+    def _remember(self, key: Any, entry: Tuple[float, Any]) -> None:
+        """Store an entry in memory, evicting the least recently used overflow"""
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open a connection to the backing file, creating its table; None if persistence is off or unavailable"""
+        if self.path is None:
+            return None
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            
+            # WAL keeps lookups from waiting on the writer thread, and the cache can
+            # afford to lose its last few writes in a crash, so commits skip the fsync
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache "
+                    "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+                )
+            return conn
+        except (OSError, sqlite3.Error) as e:
+            logger.error("Persistent API cache unavailable, using memory only: %s", e)
+            self.path = None
+            return None
+    
+    def _queue_write(self, statements: List[Tuple[str, Tuple]]) -> None:
+        """Hand statements to the writer thread, starting it on first use"""
+        if self.path is None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="dishdazzle-api-cache", daemon=True)
+                self._writer.start()
+        self._writes.put(statements)
+    
+    def _write_loop(self) -> None:
+        """Apply queued writes in order, each batch in its own transaction"""
+        disk = self._connect()
+        if disk is not None:
+            try:
+                with disk:
+                    disk.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+            except sqlite3.Error as e:
+                logger.error("Error pruning persistent API cache: %s", e)
+        
+        while True:
+            statements = self._writes.get()
+            try:
+                if statements is None:
+                    break
+                if disk is not None:
+                    with disk:
+                        for sql, params in statements:
+                            disk.execute(sql, params)
+            except sqlite3.Error as e:
+                logger.error("Error writing persistent API cache: %s", e)
+            finally:
+                self._writes.task_done()
+        
+        if disk is not None:
+            disk.close()
+    
+    @staticmethod
+    def _disk_key(key: Any) -> str:
+        """Flatten a cache key tuple into the text primary key used on disk"""
+        return "\x1f".join(part.hex() if isinstance(part, bytes) else str(part) for part in key)
+    
+    def _disk_get(self, key: Any) -> Optional[Tuple[float, Any]]:
+        with self._disk_lock:
+            if self._disk is None:
+                self._disk = self._connect()
+                if self._disk is None:
+                    return None
+            try:
+                row = self._disk.execute(
+                    "SELECT expires_at, value FROM response_cache WHERE key = ?", (self._disk_key(key),)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error("Error reading persistent API cache: %s", e)
+                return None
+        return (row[0], json.loads(row[1])) if row else None
+
+
+class _DirectDispatcher:
+    """Stand-in for the Qt dispatcher when PyQt5 is unavailable; runs callbacks immediately"""
+    
+    def __init__(self):
+        self.dispatch = self
+    
+    def emit(self, payload):
+        callback, result = payload
+        callback(result)
+
+
+if QObject is not None:
+    class _MainThreadDispatcher(QObject):
+        """Runs callbacks on the thread that created it (the Qt main thread)
+        
+        Emitting dispatch from the API event loop thread queues the call onto the
+        main thread's event loop, so callbacks can safely touch widgets.
+        """
+        
+        dispatch = pyqtSignal(object)
+        
+        def __init__(self):
+            super().__init__()
+            self.dispatch.connect(self._run)
+        
+        def _run(self, payload):
+            callback, result = payload
+            callback(result)
+    
+    # Created at import time, which happens on the main thread
+    _dispatcher = _MainThreadDispatcher()
+else:
+    _dispatcher = _DirectDispatcher()
+
+# API response cache, persisted next to the recipe database
+CACHE_DB_PATH = Path(os.path.dirname(os.path.dirname(__file__))) / 'data' / 'api_cache.db'
+response_cache = ResponseCache(maxsize=256, ttl=3600, path=CACHE_DB_PATH)
+atexit.register(response_cache.close)
+
+# Model used for each model type when the config does not name one
+DEFAULT_MODELS = {
+    "deepseek": "deepseek/deepseek-v3.1",
+    "llama": "meta-llama/llama-3-3-70b-instruct"
+}
+
+
+class ClientInfo(NamedTuple):
+    """An initialized OpenRouter client and the model it should call"""
+    client: "AsyncOpenAI"
+    model: str
+
+
+# Initialized clients, keyed by model type
+_clients: Dict[str, ClientInfo] = {}
+_clients_lock = threading.Lock()
+
+# One keep-alive connection pool shared by every model's client, so requests
+# reuse warm TLS connections to OpenRouter instead of handshaking each time.
+# Created with the first client; guarded by _clients_lock.
+_http_client: Optional["httpx.AsyncClient"] = None
+
+
+def _get_http_client():
+    """Return the shared httpx client, creating it on first use"""
+    global _http_client
+    with _clients_lock:
+        if _http_client is None:
+            import httpx
+            
+            # HTTP/2 needs the optional h2 package; without it httpx keeps pooled HTTP/1.1 connections
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+            
+            _http_client = httpx.AsyncClient(
+                http2=http2,
+                timeout=60.0,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return _http_client
+
+# Requests currently running, keyed by cache key; only touched on the event loop
+_inflight: Dict[Tuple, asyncio.Task] = {}
+
+# Single background event loop that runs every API request, so concurrent
+# calls share one connection pool instead of each blocking its own thread
+_loop = asyncio.new_event_loop()
+_loop_thread = threading.Thread(target=_loop.run_forever, name="dishdazzle-api", daemon=True)
+_loop_thread.start()
+
+# Fallback patterns locating the start of the JSON object in a chatty model response.
+# Only the opening is matched; the decoder consumes the object itself in one linear pass.
+_RECIPES_JSON_RE = re.compile(r'\{\s*"recipes"\s*:')
+_SUBS_JSON_RE = re.compile(r'\{\s*"substitutions"\s*:')
+_RESULTS_JSON_RE = re.compile(r'\{\s*"results"\s*:')
+_JSON_DECODER = json.JSONDecoder()
+
+# Upper bound on ingredients sent in a single recipe suggestion prompt
+MAX_PROMPT_INGREDIENTS = 50
+
+_RECIPE_SYSTEM_PROMPT = """You are a helpful cooking assistant that suggests recipes based on available ingredients.
+The user lists the ingredients they have. Suggest 3 recipes they can make with them.
+For each recipe, provide:
+1. Recipe name
+2. Brief description
+3. List of ingredients with amounts (indicate which ones the user has and which they need to get)
+4. Step-by-step instructions
+5. Estimated cooking time
+6. Difficulty level (Easy, Medium, or Hard)
+
+Format your response as a JSON object with the following structure:
+{"recipes": [{"name": "Recipe Name", "description": "Brief description", "ingredients": [{"name": "Ingredient", "amount": "Amount", "available": true/false}], "instructions": ["Step 1", "Step 2"], "cooking_time": minutes, "difficulty": "Easy/Medium/Hard"}]}"""
 
 def initialize_api(model_type="deepseek"):
     """Initialize the OpenRouter API with the appropriate API key from config
     
+    Re-reads the config and rebuilds the client for the model type, so calling
+    this again picks up a changed API key or model name.
+    
     Args:
         model_type: Either "deepseek" or "llama" to specify which model to use
     """
-    global client
     try:
-        config = load_config()
-        openrouter_config = config.get("api", {}).get("openrouter", {})
-        
-        if model_type == "deepseek":
-            api_key = openrouter_config.get("deepseek", {}).get("api_key", "")
-            model = openrouter_config.get("deepseek", {}).get("model", "deepseek/deepseek-v3.1")
-        elif model_type == "llama":
-            api_key = openrouter_config.get("llama", {}).get("api_key", "")
-            model = openrouter_config.get("llama", {}).get("model", "meta-llama/llama-3-3-70b-instruct")
-        else:
-            logger.warning(f"Unknown model type: {model_type}")
+        if model_type not in DEFAULT_MODELS:
+            logger.warning("Unknown model type: %s", model_type)
             return False
         
+        model_config = _model_config(model_type)
+        api_key = model_config.get("api_key", "")
+        model = model_config.get("model", DEFAULT_MODELS[model_type])
+        
         if not api_key:
-            logger.warning(f"OpenRouter API key for {model_type} not found in config")
+            logger.warning("OpenRouter API key for %s not found in config", model_type)
+            with _clients_lock:
+                _clients.pop(model_type, None)
             return False
         
+        from openai import AsyncOpenAI
+        
         # Configure OpenAI client to use OpenRouter
-        client = OpenAI(
+        client = AsyncOpenAI(
             base_url="https://openrouter.ai/api/v1",
             api_key=api_key,
+            http_client=_get_http_client(),
         )
         
-        logger.info(f"OpenRouter API initialized successfully for {model_type} model: {model}")
+        # Cache keys include the model name, so answers from a previous model are never reused
+        with _clients_lock:
+            _clients[model_type] = ClientInfo(client, model)
+        
+        logger.info("OpenRouter API initialized successfully for %s model: %s", model_type, model)
         return True
         
     except Exception as e:
-        logger.error(f"Error initializing API for {model_type}: {e}")
+        logger.error("Error initializing API for %s: %s", model_type, e)
         return False
 
+def _model_config(model_type: str) -> Dict[str, Any]:
+    """Return the config's OpenRouter settings for a model type"""
+    return load_config().get("api", {}).get("openrouter", {}).get(model_type, {})
+
+def _model_name(model_type: str) -> str:
+    """Return the model requests for a model type go to
+    
+    This is the initialized client's model, or the configured one before the
+    client exists; cache keys use it so a changed model never gets old answers.
+    """
+    entry = _clients.get(model_type)
+    if entry is not None:
+        return entry.model
+    return _model_config(model_type).get("model", DEFAULT_MODELS.get(model_type, model_type))
+
+def reset_clients():
+    """Forget every initialized client so the next request re-reads the config"""
+    with _clients_lock:
+        _clients.clear()
+    logger.info("API clients reset")
+
+def _get_client(model_type: str) -> Optional[ClientInfo]:
+    """Return the cached client and model name, initializing them on first use
+    
+    Args:
+        model_type: Either "deepseek" or "llama" to specify which model to use
+        
+    Returns:
+        ClientInfo with the client and model name, or None if the API could not be initialized
+    """
+    entry = _clients.get(model_type)
+    if entry is None and initialize_api(model_type):
+        entry = _clients.get(model_type)
+    return entry
+
+def _normalize_ingredients(ingredients: List[str]) -> Tuple[str, ...]:
+    """Lowercase, strip, de-duplicate and sort ingredients, capped at MAX_PROMPT_INGREDIENTS
+    
+    The same tuple feeds both the cache key and the prompt, so equivalent
+    ingredient orderings produce an identical request.
+    """
+    return tuple(sorted({i.strip().lower() for i in ingredients if i.strip()})[:MAX_PROMPT_INGREDIENTS])
+
+def _recipe_cache_key(model_type: str, ingredients: Tuple[str, ...]) -> Tuple[str, str, bytes]:
+    """Build a fixed-size cache key for an already-normalized ingredient set and the model answering it"""
+    digest = hashlib.blake2b(b"\0".join(i.encode() for i in ingredients), digest_size=16).digest()
+    return ("recipe_suggestions", _model_name(model_type), digest)
+
+def _substitution_cache_key(model_type: str, ingredient: str) -> Tuple[str, str, str]:
+    """Build the cache key for a single ingredient's substitutions from the model answering it"""
+    return ("substitution", _model_name(model_type), ingredient.lower())
+
+async def _singleflight(key: Tuple, make_request: Callable[[], Coroutine]) -> Any:
+    """Share one in-flight request between all callers asking for the same key
+    
+    The first caller starts the request; identical callers that arrive before it
+    finishes wait on the same task instead of issuing another API call.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(make_request())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    
+    # Shield so one waiter being cancelled does not cancel the shared request
+    return await asyncio.shield(task)
+
+def _run_sync(coro: Coroutine) -> Any:
+    """Run a coroutine on the API event loop and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+def _run_async(coro: Coroutine) -> None:
+    """Schedule a coroutine on the API event loop without waiting for it"""
+    future = asyncio.run_coroutine_threadsafe(coro, _loop)
+    
+    def log_failure(done):
+        if not done.cancelled() and done.exception():
+            logger.error("Unhandled error in API request: %s", done.exception())
+    
+    future.add_done_callback(log_failure)
+
+class RequestBatcher:
+    """Coalesces requests issued within a short window into batched calls
+    
+    Requests are grouped by signature (e.g. the model type) and a group is
+    flushed once it reaches max_batch_size items or max_wait_ms after its first
+    request, whichever comes first. All methods must run on the API event loop.
+    """
+    
+    def __init__(self, flush: Callable[[Any, List[Any]], Awaitable[List[Any]]], max_batch_size: int = 10, max_wait_ms: int = 50):
+        """
+        Args:
+            flush: Coroutine function taking (signature, items) and returning one result per item
+            max_batch_size: Number of queued items that triggers an immediate flush
+            max_wait_ms: Longest time the first queued item waits for companions
+        """
+        self.flush = flush
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: Dict[Any, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Any, asyncio.TimerHandle] = {}
+    
+    async def submit(self, signature: Any, item: Any) -> Any:
+        """Queue an item and wait for its result from the batched call"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        pending = self._pending.setdefault(signature, [])
+        pending.append((item, future))
+        
+        if len(pending) >= self.max_batch_size:
+            self._flush(signature)
+        elif len(pending) == 1:
+            self._timers[signature] = loop.call_later(self.max_wait, self._flush, signature)
+        
+        return await future
+    
+    def _flush(self, signature: Any) -> None:
+        """Take the pending group for a signature and start its batched call"""
+        timer = self._timers.pop(signature, None)
+        if timer:
+            timer.cancel()
+        
+        batch = self._pending.pop(signature, [])
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(signature, batch))
+    
+    async def _run(self, signature: Any, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Issue the batched call and hand each waiter its own result"""
+        try:
+            results = await self.flush(signature, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
 def get_recipe_suggestions(ingredients: List[str], callback: Optional[Callable] = None, model_type: str = "deepseek") -> Dict[str, Any]:
     """Get recipe suggestions based on available ingredients
     
@@ -71,13 +562,16 @@ def get_recipe_suggestions(ingredients: List[str], callback: Optional[Callable]
     Returns:
         Dictionary with recipe suggestions if callback is None, otherwise None
     """
+    # Normalize so equivalent lists share a cache entry and the prompt stays short
+    ingredients = _normalize_ingredients(ingredients)
+    
     # Create a cache key from the sorted ingredients
-    cache_key = f"recipe_suggestions:{model_type}:" + ",".join(sorted(ingredients))
+    cache_key = _recipe_cache_key(model_type, ingredients)
     
     # Check if we have a cached response
-    if cache_key in response_cache:
-        logger.info(f"Using cached recipe suggestions for {len(ingredients)} ingredients from {model_type}")
-        result = response_cache[cache_key]
+    result = response_cache.get(cache_key)
+    if result is not None:
+        logger.info("Using cached recipe suggestions for %d ingredients from %s", len(ingredients), model_type)
         
         if callback:
             callback(result)
@@ -85,7 +579,7 @@ def get_recipe_suggestions(ingredients: List[str], callback: Optional[Callable]
         return result
     
     # Initialize API for the specified model
-    if not initialize_api(model_type):
+    if _get_client(model_type) is None:
         error_msg = f"Failed to initialize API for {model_type}"
         logger.error(error_msg)
         result = {"recipes": [], "error": error_msg}
@@ -97,53 +591,30 @@ def get_recipe_suggestions(ingredients: List[str], callback: Optional[Callable]
     
     # If a callback is provided, run asynchronously
     if callback:
-        thread = threading.Thread(
-            target=_get_recipe_suggestions_async,
-            args=(ingredients, cache_key, callback, model_type)
-        )
-        thread.daemon = True
-        thread.start()
+        _run_async(_get_recipe_suggestions_async(ingredients, cache_key, callback, model_type))
         return None
     
     # Otherwise, run synchronously
-    return _get_recipe_suggestions_sync(ingredients, cache_key, model_type)
+    return _run_sync(_singleflight(cache_key, lambda: _get_recipe_suggestions_impl(ingredients, cache_key, model_type)))
 
-def _get_recipe_suggestions_sync(ingredients: List[str], cache_key: str, model_type: str) -> Dict[str, Any]:
-    """Synchronous implementation of get_recipe_suggestions"""
-    global client
+async def _get_recipe_suggestions_impl(ingredients: Tuple[str, ...], cache_key: Tuple, model_type: str) -> Dict[str, Any]:
+    """Coroutine implementing get_recipe_suggestions"""
     try:
-        # Get config for model
-        config = load_config()
-        openrouter_config = config.get("api", {}).get("openrouter", {})
-        
-        if model_type == "deepseek":
-            model = openrouter_config.get("deepseek", {}).get("model", "deepseek/deepseek-v3.1")
-        else:
-            model = openrouter_config.get("llama", {}).get("model", "meta-llama/llama-3-3-70b-instruct")
+        client_info = _get_client(model_type)
+        if client_info is None:
+            raise RuntimeError(f"Failed to initialize API for {model_type}")
+        client, model = client_info
         
-        # Prepare the prompt for the model
-        prompt = f"""I have the following ingredients: {', '.join(ingredients)}.
-        Please suggest 3 recipes I can make with these ingredients.
-        For each recipe, provide:
-        1. Recipe name
-        2. Brief description
-        3. List of ingredients with amounts (indicate which ones I have and which I need to get)
-        4. Step-by-step instructions
-        5. Estimated cooking time
-        6. Difficulty level (Easy, Medium, or Hard)
-        
-        Format your response as a JSON object with the following structure:
-        {{"recipes": [{{"name": "Recipe Name", "description": "Brief description", "ingredients": [{{"name": "Ingredient", "amount": "Amount", "available": true/false}}], "instructions": ["Step 1", "Step 2"], "cooking_time": minutes, "difficulty": "Easy/Medium/Hard"}}]}}
-        """
-        
-        # Prepare API call parameters
+        # Prepare API call parameters; the static instructions live in the
+        # system message so the provider can reuse its cached prompt prefix
+        prompt = "Ingredients: " + ", ".join(ingredients)
         messages = [
-            {"role": "system", "content": "You are a helpful cooking assistant that suggests recipes based on available ingredients."},
+            {"role": "system", "content": _RECIPE_SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ]
         
         # Call the API
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.7,
@@ -164,14 +635,14 @@ def _get_recipe_suggestions_sync(ingredients: List[str], cache_key: str, model_t
         # Find the JSON object in the response (it might be surrounded by markdown or other text)
         try:
             # Try to parse the entire response as JSON
-            result = json.loads(content)
+            result = fast_json.loads(content)
         except json.JSONDecodeError:
-            # If that fails, try to extract the JSON object from the response
-            import re
-            json_match = re.search(r'\{\s*"recipes"\s*:\s*\[.+?\]\s*\}', content, re.DOTALL)
+            # If that fails, try to extract the JSON object from the response,
+            # skipping the regex when the key does not even appear in the text
+            json_match = _RECIPES_JSON_RE.search(content) if '"recipes"' in content else None
             if json_match:
                 try:
-                    result = json.loads(json_match.group(0))
+                    result, _ = _JSON_DECODER.raw_decode(content, json_match.start())
                 except json.JSONDecodeError:
                     logger.error("Failed to parse JSON from model response")
                     result = {"recipes": [], "error": "Failed to parse response"}
@@ -179,37 +650,69 @@ def _get_recipe_suggestions_sync(ingredients: List[str], cache_key: str, model_t
                 logger.error("No JSON object found in model response")
                 result = {"recipes": [], "error": "No valid response found"}
         
-        # Cache the result
-        response_cache[cache_key] = result
+        # Cache the result; a failed parse is retried next time rather than remembered
+        if not result.get("error"):
+            response_cache[cache_key] = result
         
         return result
         
     except Exception as e:
-        logger.error(f"Error getting recipe suggestions from {model_type}: {e}")
+        logger.error("Error getting recipe suggestions from %s: %s", model_type, e)
         return {"recipes": [], "error": str(e)}
 
-def _get_recipe_suggestions_async(ingredients: List[str], cache_key: str, callback: Callable, model_type: str):
+async def _get_recipe_suggestions_async(ingredients: Tuple[str, ...], cache_key: Tuple, callback: Callable, model_type: str):
     """Asynchronous implementation of get_recipe_suggestions"""
-    from PyQt5.QtCore import QTimer
-    
-    result = _get_recipe_suggestions_sync(ingredients, cache_key, model_type)
+    result = await _singleflight(cache_key, lambda: _get_recipe_suggestions_impl(ingredients, cache_key, model_type))
     
-    # Use QTimer to safely call the callback on the main thread
+    # Hand the result back to the main thread
     if hasattr(callback, '__self__') and hasattr(callback.__self__, 'recipe_suggestions_signal'):
         # If callback is a MainWindow method, use the signal
         callback.__self__.recipe_suggestions_signal.emit(result)
     else:
-        # Otherwise use QTimer to call on main thread
-        def call_on_main_thread():
-            callback(result)
-        
-        timer = QTimer()
-        timer.timeout.connect(call_on_main_thread)
-        timer.setSingleShot(True)
-        timer.start(0)
+        # Otherwise queue it through the main-thread dispatcher
+        _dispatcher.dispatch.emit((callback, result))
 
 # [Similar updates needed for all other API functions...]
 
+def prewarm_recipe_cache(ingredient_sets: List[List[str]], model_type: str = "deepseek", max_concurrency: int = 4) -> None:
+    """Fetch recipe suggestions for several ingredient sets in the background
+    
+    Results land in the response cache, so later suggestion requests for the
+    same ingredients return immediately. Sets that are already cached are skipped.
+    
+    Args:
+        ingredient_sets: Ingredient lists to fetch suggestions for
+        model_type: Either "deepseek" or "llama" to specify which model to use
+        max_concurrency: Maximum number of requests in flight at once
+    """
+    pending = []
+    for ingredients in ingredient_sets:
+        ingredients = _normalize_ingredients(ingredients)
+        cache_key = _recipe_cache_key(model_type, ingredients)
+        if ingredients and cache_key not in response_cache:
+            pending.append((ingredients, cache_key))
+    
+    if not pending:
+        return
+    
+    if _get_client(model_type) is None:
+        logger.error("Failed to initialize API for %s; skipping cache prewarm", model_type)
+        return
+    
+    _run_async(_prewarm_recipe_cache_impl(pending, model_type, max_concurrency))
+
+async def _prewarm_recipe_cache_impl(pending: List[Tuple[List[str], Tuple]], model_type: str, max_concurrency: int):
+    """Coroutine implementing prewarm_recipe_cache"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def fetch(ingredients, cache_key):
+        async with semaphore:
+            return await _singleflight(cache_key, lambda: _get_recipe_suggestions_impl(ingredients, cache_key, model_type))
+    
+    results = await asyncio.gather(*(fetch(ingredients, cache_key) for ingredients, cache_key in pending))
+    failed = sum(1 for result in results if result.get("error"))
+    logger.info("Prewarmed recipe cache for %d of %d ingredient sets from %s", len(pending) - failed, len(pending), model_type)
+
 def get_ingredient_substitutions(ingredient: str, callback: Optional[Callable] = None, model_type: str = "deepseek") -> Dict[str, Any]:
     """Get substitution suggestions for an ingredient
     
@@ -222,12 +725,12 @@ def get_ingredient_substitutions(ingredient: str, callback: Optional[Callable] =
         Dictionary with substitution suggestions if callback is None, otherwise None
     """
     # Create a cache key
-    cache_key = f"substitution:{model_type}:{ingredient.lower()}"
+    cache_key = _substitution_cache_key(model_type, ingredient)
     
     # Check if we have a cached response
-    if cache_key in response_cache:
-        logger.info(f"Using cached substitution suggestions for {ingredient} from {model_type}")
-        result = response_cache[cache_key]
+    result = response_cache.get(cache_key)
+    if result is not None:
+        logger.info("Using cached substitution suggestions for %s from %s", ingredient, model_type)
         
         if callback:
             callback(result)
@@ -235,7 +738,7 @@ def get_ingredient_substitutions(ingredient: str, callback: Optional[Callable] =
         return result
     
     # Initialize API for the specified model
-    if not initialize_api(model_type):
+    if _get_client(model_type) is None:
         error_msg = f"Failed to initialize API for {model_type}"
         logger.error(error_msg)
         result = {"substitutions": [], "error": error_msg}
@@ -244,31 +747,22 @@ def get_ingredient_substitutions(ingredient: str, callback: Optional[Callable] =
             callback(result)
         return result
     
+    # Lookups issued close together are coalesced into one batched request
     # If a callback is provided, run asynchronously
     if callback:
-        thread = threading.Thread(
-            target=_get_ingredient_substitutions_async,
-            args=(ingredient, cache_key, callback, model_type)
-        )
-        thread.daemon = True
-        thread.start()
+        _run_async(_get_ingredient_substitutions_async(ingredient, cache_key, callback, model_type))
         return None
     
     # Otherwise, run synchronously
-    return _get_ingredient_substitutions_sync(ingredient, cache_key, model_type)
+    return _run_sync(_singleflight(cache_key, lambda: _substitution_batcher.submit(model_type, ingredient)))
 
-def _get_ingredient_substitutions_sync(ingredient: str, cache_key: str, model_type: str) -> Dict[str, Any]:
-    """Synchronous implementation of get_ingredient_substitutions"""
-    global client
+async def _get_ingredient_substitutions_impl(ingredient: str, cache_key: Tuple, model_type: str) -> Dict[str, Any]:
+    """Coroutine implementing get_ingredient_substitutions"""
     try:
-        # Get config for model
-        config = load_config()
-        openrouter_config = config.get("api", {}).get("openrouter", {})
-        
-        if model_type == "deepseek":
-            model = openrouter_config.get("deepseek", {}).get("model", "deepseek/deepseek-v3.1")
-        else:
-            model = openrouter_config.get("llama", {}).get("model", "meta-llama/llama-3-3-70b-instruct")
+        client_info = _get_client(model_type)
+        if client_info is None:
+            raise RuntimeError(f"Failed to initialize API for {model_type}")
+        client, model = client_info
         
         # Prepare the prompt for the model
         prompt = f"""I don't have {ingredient} for my recipe. What are some good substitutions?
@@ -288,7 +782,7 @@ def _get_ingredient_substitutions_sync(ingredient: str, cache_key: str, model_ty
         ]
         
         # Call the API
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.7,
@@ -308,14 +802,14 @@ def _get_ingredient_substitutions_sync(ingredient: str, cache_key: str, model_ty
         # Parse the JSON response
         try:
             # Try to parse the entire response as JSON
-            result = json.loads(content)
+            result = fast_json.loads(content)
         except json.JSONDecodeError:
-            # If that fails, try to extract the JSON object from the response
-            import re
-            json_match = re.search(r'\{\s*"substitutions"\s*:\s*\[.+?\]\s*\}', content, re.DOTALL)
+            # If that fails, try to extract the JSON object from the response,
+            # skipping the regex when the key does not even appear in the text
+            json_match = _SUBS_JSON_RE.search(content) if '"substitutions"' in content else None
             if json_match:
                 try:
-                    result = json.loads(json_match.group(0))
+                    result, _ = _JSON_DECODER.raw_decode(content, json_match.start())
                 except json.JSONDecodeError:
                     logger.error("Failed to parse JSON from model response")
                     result = {"substitutions": [], "error": "Failed to parse response"}
@@ -323,29 +817,202 @@ def _get_ingredient_substitutions_sync(ingredient: str, cache_key: str, model_ty
                 logger.error("No JSON object found in model response")
                 result = {"substitutions": [], "error": "No valid response found"}
         
-        # Cache the result
-        response_cache[cache_key] = result
+        # Cache the result; a failed parse is retried next time rather than remembered
+        if not result.get("error"):
+            response_cache[cache_key] = result
         
         return result
         
     except Exception as e:
-        logger.error(f"Error getting ingredient substitutions from {model_type}: {e}")
+        logger.error("Error getting ingredient substitutions from %s: %s", model_type, e)
         return {"substitutions": [], "error": str(e)}
 
-def _get_ingredient_substitutions_async(ingredient: str, cache_key: str, callback: Callable, model_type: str):
+async def _get_ingredient_substitutions_async(ingredient: str, cache_key: Tuple, callback: Callable, model_type: str):
     """Asynchronous implementation of get_ingredient_substitutions"""
-    from PyQt5.QtCore import QTimer
+    result = await _singleflight(cache_key, lambda: _substitution_batcher.submit(model_type, ingredient))
     
-    result = _get_ingredient_substitutions_sync(ingredient, cache_key, model_type)
+    # Hand the result back to the main thread
+    _dispatcher.dispatch.emit((callback, result))
+
+def get_ingredient_substitutions_batch(ingredients: List[str], callback: Optional[Callable] = None, model_type: str = "deepseek") -> Dict[str, Any]:
+    """Get substitution suggestions for several ingredients with a single API call
     
-    # Use QTimer to safely call the callback on the main thread
-    def call_on_main_thread():
-        callback(result)
+    Ingredients already in the cache are not requested again, and every
+    ingredient returned by the model is cached individually so later calls to
+    get_ingredient_substitutions hit the cache.
     
-    timer = QTimer()
-    timer.timeout.connect(call_on_main_thread)
-    timer.setSingleShot(True)
-    timer.start(0)
+    Args:
+        ingredients: The ingredients to find substitutions for
+        callback: Optional callback function to receive the result asynchronously
+        model_type: Either "deepseek" or "llama" to specify which model to use
+        
+    Returns:
+        Dictionary with a "results" list of {"ingredient", "substitutions"} entries
+        in the same order as the input if callback is None, otherwise None
+    """
+    # Only ask the model about ingredients we have no cached answer for
+    missing = []
+    seen = set()
+    for ingredient in ingredients:
+        key = ingredient.lower()
+        if key not in seen and _substitution_cache_key(model_type, key) not in response_cache:
+            seen.add(key)
+            missing.append(ingredient)
+    
+    if not missing:
+        logger.info("Using cached substitution suggestions for %d ingredients from %s", len(ingredients), model_type)
+        result = _collect_substitution_results(ingredients, model_type)
+        
+        if callback:
+            callback(result)
+            return None
+        return result
+    
+    # Initialize API for the specified model
+    if _get_client(model_type) is None:
+        error_msg = f"Failed to initialize API for {model_type}"
+        logger.error(error_msg)
+        result = {"results": [], "error": error_msg}
+        
+        if callback:
+            callback(result)
+        return result
+    
+    # If a callback is provided, run asynchronously
+    if callback:
+        _run_async(_get_ingredient_substitutions_batch_async(ingredients, missing, callback, model_type))
+        return None
+    
+    # Otherwise, run synchronously
+    return _run_sync(_get_ingredient_substitutions_batch_impl(ingredients, missing, model_type))
+
+def _collect_substitution_results(ingredients: List[str], model_type: str) -> Dict[str, Any]:
+    """Assemble cached substitution results for the given ingredients in order"""
+    results = []
+    for ingredient in ingredients:
+        cached = response_cache.get(
+            _substitution_cache_key(model_type, ingredient),
+            {"substitutions": [], "error": "No substitutions returned"}
+        )
+        results.append({"ingredient": ingredient, **cached})
+    return {"results": results}
+
+async def _get_ingredient_substitutions_batch_impl(ingredients: List[str], missing: List[str], model_type: str) -> Dict[str, Any]:
+    """Coroutine implementing get_ingredient_substitutions_batch"""
+    try:
+        client_info = _get_client(model_type)
+        if client_info is None:
+            raise RuntimeError(f"Failed to initialize API for {model_type}")
+        client, model = client_info
+        
+        # Prepare the prompt for the model
+        prompt = f"""I don't have the following ingredients for my recipe: {json.dumps(missing)}.
+        For each of them, suggest at least 3 substitutions if possible, with the following information for each:
+        1. Substitute ingredient name
+        2. Substitution ratio (e.g., "1:1" or "use half as much")
+        3. Brief note about flavor/texture differences
+        
+        Format your response as a JSON object with one entry per ingredient, using the ingredient names exactly as given:
+        {{"results": [{{"ingredient": "Ingredient", "substitutions": [{{"name": "Substitute Name", "ratio": "Substitution Ratio", "notes": "Notes about differences"}}]}}]}}
+        """
+        
+        # Prepare API call parameters
+        messages = [
+            {"role": "system", "content": "You are a helpful cooking assistant that suggests ingredient substitutions."},
+            {"role": "user", "content": prompt}
+        ]
+        
+        # Call the API
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=min(800 * len(missing), 4000),
+            top_p=1.0,
+            frequency_penalty=0.0,
+            presence_penalty=0.0,
+            extra_headers={
+                "HTTP-Referer": "https://dishdazzle.app",  # Replace with your app's URL
+                "X-Title": "DishDazzle App"
+            }
+        )
+        
+        # Extract the content from the response
+        content = response.choices[0].message.content
+        
+        # Parse the JSON response
+        try:
+            # Try to parse the entire response as JSON
+            parsed = fast_json.loads(content)
+        except json.JSONDecodeError:
+            # If that fails, try to extract the JSON object from the response,
+            # skipping the regex when the key does not even appear in the text
+            json_match = _RESULTS_JSON_RE.search(content) if '"results"' in content else None
+            if json_match:
+                try:
+                    parsed, _ = _JSON_DECODER.raw_decode(content, json_match.start())
+                except json.JSONDecodeError:
+                    logger.error("Failed to parse JSON from model response")
+                    return {"results": [], "error": "Failed to parse response"}
+            else:
+                logger.error("No JSON object found in model response")
+                return {"results": [], "error": "No valid response found"}
+        
+        # Cache each ingredient's substitutions under its single-ingredient key
+        for item in parsed.get("results", []):
+            name = item.get("ingredient", "")
+            if name:
+                response_cache[_substitution_cache_key(model_type, name)] = {
+                    "substitutions": item.get("substitutions", [])
+                }
+        
+        return _collect_substitution_results(ingredients, model_type)
+        
+    except Exception as e:
+        logger.error("Error getting batched ingredient substitutions from %s: %s", model_type, e)
+        return {"results": [], "error": str(e)}
+
+async def _get_ingredient_substitutions_batch_async(ingredients: List[str], missing: List[str], callback: Callable, model_type: str):
+    """Asynchronous implementation of get_ingredient_substitutions_batch"""
+    result = await _get_ingredient_substitutions_batch_impl(ingredients, missing, model_type)
+    
+    # Hand the result back to the main thread
+    _dispatcher.dispatch.emit((callback, result))
+
+async def _flush_substitutions(model_type: str, ingredients: List[str]) -> List[Dict[str, Any]]:
+    """Resolve a coalesced group of substitution lookups with as few API calls as possible"""
+    if len(ingredients) == 1:
+        ingredient = ingredients[0]
+        cache_key = _substitution_cache_key(model_type, ingredient)
+        return [await _get_ingredient_substitutions_impl(ingredient, cache_key, model_type)]
+    
+    # Ask about each distinct ingredient once, even if several callers wanted it
+    missing = list({ingredient.lower(): ingredient for ingredient in ingredients}.values())
+    result = await _get_ingredient_substitutions_batch_impl(ingredients, missing, model_type)
+    
+    if result.get("error"):
+        return [{"substitutions": [], "error": result["error"]} for _ in ingredients]
+    
+    return [
+        {key: value for key, value in item.items() if key != "ingredient"}
+        for item in result["results"]
+    ]
+
+_substitution_batcher = RequestBatcher(_flush_substitutions, max_batch_size=10, max_wait_ms=50)
+
+async def _collect_stream(response: Any, on_delta: Callable[[str], None]) -> str:
+    """Forward each text delta of a streamed completion and return the full text"""
+    parts = []
+    async for chunk in response:
+        if not chunk.choices:
+            continue
+        
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            on_delta(delta)
+    
+    return "".join(parts)
 
 def get_cooking_assistance(query: str, recipe_context: Optional[Dict[str, Any]] = None, callback: Optional[Callable] = None, model_type: str = "deepseek") -> Dict[str, Any]:
     """Get cooking assistance from the AI chatbot
@@ -362,7 +1029,7 @@ def get_cooking_assistance(query: str, recipe_context: Optional[Dict[str, Any]]
     # For cooking assistance, we don't cache responses as they're more conversational
     
     # Initialize API for the specified model
-    if not initialize_api(model_type):
+    if _get_client(model_type) is None:
         error_msg = f"Failed to initialize API for {model_type}"
         logger.error(error_msg)
         result = {"response": error_msg, "error": error_msg}
@@ -373,29 +1040,23 @@ def get_cooking_assistance(query: str, recipe_context: Optional[Dict[str, Any]]
     
     # If a callback is provided, run asynchronously
     if callback:
-        thread = threading.Thread(
-            target=_get_cooking_assistance_async,
-            args=(query, recipe_context, callback, model_type)
-        )
-        thread.daemon = True
-        thread.start()
+        _run_async(_get_cooking_assistance_async(query, recipe_context, callback, model_type))
         return None
     
     # Otherwise, run synchronously
-    return _get_cooking_assistance_sync(query, recipe_context, model_type)
+    return _run_sync(_get_cooking_assistance_impl(query, recipe_context, model_type))
 
-def _get_cooking_assistance_sync(query: str, recipe_context: Optional[Dict[str, Any]], model_type: str) -> Dict[str, Any]:
-    """Synchronous implementation of get_cooking_assistance"""
-    global client
+async def _get_cooking_assistance_impl(query: str, recipe_context: Optional[Dict[str, Any]], model_type: str, on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Coroutine implementing get_cooking_assistance
+    
+    When on_delta is given the completion is streamed and each text delta is
+    passed to it as it arrives; the full response is still returned at the end.
+    """
     try:
-        # Get config for model
-        config = load_config()
-        openrouter_config = config.get("api", {}).get("openrouter", {})
-        
-        if model_type == "deepseek":
-            model = openrouter_config.get("deepseek", {}).get("model", "deepseek/deepseek-v3.1")
-        else:
-            model = openrouter_config.get("llama", {}).get("model", "meta-llama/llama-3-3-70b-instruct")
+        client_info = _get_client(model_type)
+        if client_info is None:
+            raise RuntimeError(f"Failed to initialize API for {model_type}")
+        client, model = client_info
         
         # Prepare the system message with recipe context if available
         system_message = "You are a helpful cooking assistant that provides guidance, tips, and answers questions about cooking."
@@ -416,7 +1077,7 @@ def _get_cooking_assistance_sync(query: str, recipe_context: Optional[Dict[str,
         ]
         
         # Call the API
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.7,
@@ -424,6 +1085,7 @@ def _get_cooking_assistance_sync(query: str, recipe_context: Optional[Dict[str,
             top_p=1.0,
             frequency_penalty=0.0,
             presence_penalty=0.0,
+            stream=on_delta is not None,
             extra_headers={
                 "HTTP-Referer": "https://dishdazzle.app",  # Replace with your app's URL
                 "X-Title": "DishDazzle App"
@@ -431,33 +1093,32 @@ def _get_cooking_assistance_sync(query: str, recipe_context: Optional[Dict[str,
         )
         
         # Extract the content from the response
-        content = response.choices[0].message.content
+        if on_delta is None:
+            content = response.choices[0].message.content
+        else:
+            content = await _collect_stream(response, on_delta)
         
         return {"response": content}
         
     except Exception as e:
-        logger.error(f"Error getting cooking assistance from {model_type}: {e}")
+        logger.error("Error getting cooking assistance from %s: %s", model_type, e)
         return {"response": f"I'm sorry, I encountered an error: {str(e)}", "error": str(e)}
 
-def _get_cooking_assistance_async(query: str, recipe_context: Optional[Dict[str, Any]], callback: Callable, model_type: str):
+async def _get_cooking_assistance_async(query: str, recipe_context: Optional[Dict[str, Any]], callback: Callable, model_type: str):
     """Asynchronous implementation of get_cooking_assistance"""
-    from PyQt5.QtCore import QTimer
+    # Stream partial text to windows that can display it
+    chunk_signal = getattr(getattr(callback, '__self__', None), 'assistant_response_chunk_signal', None)
+    on_delta = chunk_signal.emit if chunk_signal is not None else None
     
-    result = _get_cooking_assistance_sync(query, recipe_context, model_type)
+    result = await _get_cooking_assistance_impl(query, recipe_context, model_type, on_delta)
     
-    # Use QTimer to safely call the callback on the main thread
+    # Hand the result back to the main thread
     if hasattr(callback, '__self__') and hasattr(callback.__self__, 'assistant_response_signal'):
         # If callback is a MainWindow method, use the signal
         callback.__self__.assistant_response_signal.emit(result)
     else:
-        # Otherwise use QTimer to call on main thread
-        def call_on_main_thread():
-            callback(result)
-        
-        timer = QTimer()
-        timer.timeout.connect(call_on_main_thread)
-        timer.setSingleShot(True)
-        timer.start(0)
+        # Otherwise queue it through the main-thread dispatcher
+        _dispatcher.dispatch.emit((callback, result))
 
 def get_chat_response(messages: List[Dict[str, str]], callback: Optional[Callable] = None, model_type: str = "deepseek") -> Dict[str, Any]:
     """Get a response from the AI chatbot for general conversation
@@ -473,7 +1134,7 @@ def get_chat_response(messages: List[Dict[str, str]], callback: Optional[Callabl
     # For chat, we don't cache responses as they're conversational
     
     # Initialize API for the specified model
-    if not initialize_api(model_type):
+    if _get_client(model_type) is None:
         error_msg = f"Failed to initialize API for {model_type}"
         logger.error(error_msg)
         result = {"response": error_msg, "error": error_msg}
@@ -484,29 +1145,23 @@ def get_chat_response(messages: List[Dict[str, str]], callback: Optional[Callabl
     
     # If a callback is provided, run asynchronously
     if callback:
-        thread = threading.Thread(
-            target=_get_chat_response_async,
-            args=(messages, callback, model_type)
-        )
-        thread.daemon = True
-        thread.start()
+        _run_async(_get_chat_response_async(messages, callback, model_type))
         return None
     
     # Otherwise, run synchronously
-    return _get_chat_response_sync(messages, model_type)
+    return _run_sync(_get_chat_response_impl(messages, model_type))
 
-def _get_chat_response_sync(messages: List[Dict[str, str]], model_type: str) -> Dict[str, Any]:
-    """Synchronous implementation of get_chat_response"""
-    global client
+async def _get_chat_response_impl(messages: List[Dict[str, str]], model_type: str, on_delta: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Coroutine implementing get_chat_response
+    
+    When on_delta is given the completion is streamed and each text delta is
+    passed to it as it arrives; the full response is still returned at the end.
+    """
     try:
-        # Get config for model
-        config = load_config()
-        openrouter_config = config.get("api", {}).get("openrouter", {})
-        
-        if model_type == "deepseek":
-            model = openrouter_config.get("deepseek", {}).get("model", "deepseek/deepseek-v3.1")
-        else:
-            model = openrouter_config.get("llama", {}).get("model", "meta-llama/llama-3-3-70b-instruct")
+        client_info = _get_client(model_type)
+        if client_info is None:
+            raise RuntimeError(f"Failed to initialize API for {model_type}")
+        client, model = client_info
         
         # Ensure the first message is a system message
         if not messages or messages[0].get('role') != 'system':
@@ -518,7 +1173,7 @@ def _get_chat_response_sync(messages: List[Dict[str, str]], model_type: str) ->
             })
         
         # Call the API
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=0.7,
@@ -526,6 +1181,7 @@ def _get_chat_response_sync(messages: List[Dict[str, str]], model_type: str) ->
             top_p=1.0,
             frequency_penalty=0.0,
             presence_penalty=0.0,
+            stream=on_delta is not None,
             extra_headers={
                 "HTTP-Referer": "https://dishdazzle.app",  # Replace with your app's URL
                 "X-Title": "DishDazzle App"
@@ -533,37 +1189,34 @@ def _get_chat_response_sync(messages: List[Dict[str, str]], model_type: str) ->
         )
         
         # Extract the content from the response
-        content = response.choices[0].message.content
+        if on_delta is None:
+            content = response.choices[0].message.content
+        else:
+            content = await _collect_stream(response, on_delta)
         
         return {"response": content}
         
     except Exception as e:
-        logger.error(f"Error getting chat response from {model_type}: {e}")
+        logger.error("Error getting chat response from %s: %s", model_type, e)
         return {"response": f"I'm sorry, I encountered an error: {str(e)}", "error": str(e)}
 
-def _get_chat_response_async(messages: List[Dict[str, str]], callback: Callable, model_type: str):
+async def _get_chat_response_async(messages: List[Dict[str, str]], callback: Callable, model_type: str):
     """Asynchronous implementation of get_chat_response"""
-    from PyQt5.QtCore import QTimer, QObject
-    import sys
+    # Stream partial text to windows that can display it
+    chunk_signal = getattr(getattr(callback, '__self__', None), 'assistant_response_chunk_signal', None)
+    on_delta = chunk_signal.emit if chunk_signal is not None else None
     
-    result = _get_chat_response_sync(messages, model_type)
+    result = await _get_chat_response_impl(messages, model_type, on_delta)
     
-    # Use QTimer to safely call the callback on the main thread
+    # Hand the result back to the main thread
     if hasattr(callback, '__self__') and hasattr(callback.__self__, 'assistant_response_signal'):
         # If callback is a MainWindow method, use the signal
         callback.__self__.assistant_response_signal.emit(result)
     else:
-        # Otherwise use QTimer to call on main thread
-        def call_on_main_thread():
-            callback(result)
-        
-        timer = QTimer()
-        timer.timeout.connect(call_on_main_thread)
-        timer.setSingleShot(True)
-        timer.start(0)
+        # Otherwise queue it through the main-thread dispatcher
+        _dispatcher.dispatch.emit((callback, result))
 
 def clear_cache():
     """Clear the API response cache"""
-    global response_cache
-    response_cache = {}
+    response_cache.clear()
     logger.info("API response cache cleared")
\ No newline at end of file
@@ -7,345 +7,1008 @@ Handles SQLite database operations for recipe management
 """
 
 import os
+import atexit
 import json
+import queue
 import sqlite3
 import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+# orjson decodes several times faster than the stdlib; fall back to json if absent.
+# JSON is only read now: older databases' columns and tables, and callers passing JSON strings.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Get logger
 logger = logging.getLogger(__name__)
 
 # Database file path
 DB_PATH = Path(os.path.dirname(os.path.dirname(__file__))) / 'data' / 'dishdazzle.db'
 
+# Per-connection tuning: relaxed fsyncs (safe under WAL), in-memory temp tables,
+# a ~20 MB page cache, memory-mapped reads, a busy timeout instead of SQLITE_BUSY,
+# enforced foreign keys so deleting a recipe cascades to its child rows, and a row
+# cap on the sampling ANALYZE does when PRAGMA optimize runs
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA analysis_limit=400",
+)
+
+# journal_mode=WAL is persistent in the database file, so it only needs setting once per process
+_wal_enabled = False
+
+# Number of pooled read-only connections
+READER_POOL_SIZE = 4
+
+# Refresh query planner statistics every this many pool releases, and at exit.
+# 0x10002 analyzes every table that needs it, not only those this connection queried.
+OPTIMIZE_INTERVAL = 256
+OPTIMIZE_SQL = "PRAGMA optimize=0x10002"
+
 
 def get_db_connection():
     """Create and return a database connection"""
+    global _wal_enabled
     try:
         # Ensure data directory exists
         os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
         
-        # Create connection with row factory for dictionary-like results
-        conn = sqlite3.connect(str(DB_PATH))
+        # Create connection with row factory for dictionary-like results;
+        # connections may be handed to worker threads, so skip the same-thread check.
+        # isolation_level=None leaves transactions to explicit BEGIN IMMEDIATE / COMMIT.
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
         conn.row_factory = sqlite3.Row
         
+        # WAL lets readers proceed while a write is in progress
+        if not _wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _wal_enabled = True
+        
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        
         return conn
     except sqlite3.Error as e:
         logger.error(f"Database connection error: {e}")
         raise
 
 
-def initialize_database():
-    """Initialize the database with required tables if they don't exist"""
+class _ConnectionPool:
+    """Reuses initialized connections instead of opening one per call
+    
+    Writes are serialized through a single writer connection; reads draw from
+    a LIFO stack of query-only connections, so the most recently used handle
+    (with the warmest page and statement caches) is handed out first.
+    """
+    
+    def __init__(self, readers: int = READER_POOL_SIZE):
+        self._max_readers = readers
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._releases = 0
+        self._releases_lock = threading.Lock()
+    
+    @contextmanager
+    def acquire(self, readonly: bool = True):
+        """Borrow a connection for the duration of the with block"""
+        if readonly:
+            conn = self._get_reader()
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._readers.put(conn)
+                # Readers are query-only, so statistics are refreshed through the writer
+                # if it's free; a busy writer just means this round is skipped.
+                if self._optimize_due():
+                    self.optimize(blocking=False)
+        else:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = get_db_connection()
+                try:
+                    yield self._writer
+                except BaseException:
+                    # Don't leave a half-finished write open for the next caller
+                    if self._writer.in_transaction:
+                        self._writer.rollback()
+                    raise
+                finally:
+                    if self._optimize_due():
+                        self._optimize_writer()
+    
+    def _get_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        
+        # Open another reader while below the limit, otherwise wait for one to be returned
+        with self._reader_lock:
+            if self._reader_count < self._max_readers:
+                conn = get_db_connection()
+                conn.execute("PRAGMA query_only=1")
+                self._reader_count += 1
+                return conn
+        return self._readers.get()
+    
+    def _optimize_due(self):
+        """Count a release; true on every OPTIMIZE_INTERVAL-th one"""
+        with self._releases_lock:
+            self._releases += 1
+            return self._releases % OPTIMIZE_INTERVAL == 0
+    
+    def optimize(self, blocking: bool = True):
+        """Run PRAGMA optimize on the writer, if one is open"""
+        if not self._writer_lock.acquire(blocking):
+            return
+        try:
+            self._optimize_writer()
+        finally:
+            self._writer_lock.release()
+    
+    def _optimize_writer(self):
+        # Caller holds the writer lock
+        if self._writer is None or self._writer.in_transaction:
+            return
+        try:
+            self._writer.execute(OPTIMIZE_SQL)
+        except sqlite3.Error as e:
+            # Stale statistics only cost plan quality; never fail the caller over it
+            logger.warning(f"PRAGMA optimize failed: {e}")
+    
+    def close_all(self):
+        """Close every pooled connection, e.g. before switching DB_PATH"""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._reader_lock:
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._reader_count = 0
+
+
+_pool = _ConnectionPool()
+
+# Parsed recipes keyed by id, plus (version, recipes) for the full listing.
+# Writes bump _recipes_version, so a listing read before a write is never served after it.
+_recipe_cache = {}
+_all_recipes_cache = None
+_recipes_version = 0
+_recipe_cache_lock = threading.Lock()
+
+
+def acquire(readonly=True):
+    """Borrow a pooled connection: with acquire(readonly=False) as conn: ..."""
+    return _pool.acquire(readonly)
+
+
+@contextmanager
+def _write_transaction():
+    """Borrow the writer and run the with block in a BEGIN IMMEDIATE transaction
+    
+    IMMEDIATE takes the write lock up front, so a SELECT followed by a write in
+    the same block can't be interleaved with another writer. Commits on exit,
+    rolls back if the block raises.
+    """
+    with acquire(readonly=False) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+@contextmanager
+def _read_snapshot():
+    """Borrow a reader and run the with block inside one read transaction
+    
+    Under WAL the first SELECT pins a snapshot, so multi-query reads (a recipe
+    listing plus its ingredient and instruction rows) all see the same data
+    even if a write commits in between. Readers run in parallel with each
+    other and with the writer.
+    """
+    with acquire() as conn:
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            # Nothing to keep; ending the read releases the snapshot
+            conn.rollback()
+
+
+def close_connections():
+    """Close all pooled database connections"""
+    _pool.close_all()
+    _invalidate_recipes()
+
+
+@atexit.register
+def _close_connections_at_exit():
+    """Leave fresh planner statistics for the next run, then close the pool"""
+    _pool.optimize()
+    _pool.close_all()
+
+
+def _invalidate_recipes(recipe_id=None):
+    """Drop cached recipes after a write; recipe_id=None clears every entry"""
+    global _recipes_version
+    with _recipe_cache_lock:
+        _recipes_version += 1
+        if recipe_id is None:
+            _recipe_cache.clear()
+        else:
+            _recipe_cache.pop(recipe_id, None)
+
+
+# Timestamps are stored as INTEGER unix epoch seconds. unixepoch() needs SQLite 3.38+,
+# so the current time comes from strftime, which every version supports.
+EPOCH_NOW_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def _epoch_from(column):
+    """SQL expression converting a legacy TIMESTAMP text value in column to epoch seconds"""
+    return (
+        f"COALESCE(CASE WHEN typeof({column}) = 'text' THEN CAST(strftime('%s', {column}) AS INTEGER) "
+        f"ELSE {column} END, {EPOCH_NOW_SQL})"
+    )
+
+
+RECIPES_TABLE_SQL = f'''
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT,
+    cooking_time INTEGER,  -- in minutes
+    difficulty TEXT CHECK(difficulty IN ('Easy', 'Medium', 'Hard')),
+    image_url TEXT,
+    created_at INTEGER NOT NULL DEFAULT ({EPOCH_NOW_SQL})  -- unix epoch seconds
+)
+'''
+
+FAVORITES_TABLE_SQL = f'''
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipe_id INTEGER NOT NULL,
+    created_at INTEGER NOT NULL DEFAULT ({EPOCH_NOW_SQL}),
+    FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
+)
+'''
+
+PANTRY_ITEMS_TABLE_SQL = f'''
+CREATE TABLE IF NOT EXISTS pantry_items (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    amount TEXT,
+    updated_at INTEGER NOT NULL DEFAULT ({EPOCH_NOW_SQL})
+)
+'''
+
+GROCERY_ITEMS_TABLE_SQL = f'''
+CREATE TABLE IF NOT EXISTS grocery_items (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    amount TEXT,
+    checked INTEGER NOT NULL DEFAULT 0,
+    updated_at INTEGER NOT NULL DEFAULT ({EPOCH_NOW_SQL})
+)
+'''
+
+# Tables with a timestamp column, rebuilt once by _migrate_epoch_timestamps on older databases
+TIMESTAMPED_TABLES = (
+    ("recipes", RECIPES_TABLE_SQL, "created_at"),
+    ("favorites", FAVORITES_TABLE_SQL, "created_at"),
+    ("pantry_items", PANTRY_ITEMS_TABLE_SQL, "updated_at"),
+    ("grocery_items", GROCERY_ITEMS_TABLE_SQL, "updated_at"),
+)
+
+INSERT_INGREDIENT_SQL = "INSERT INTO recipe_ingredients (recipe_id, pos, name, amount) VALUES (?, ?, ?, ?)"
+INSERT_INSTRUCTION_SQL = "INSERT INTO recipe_instructions (recipe_id, pos, text) VALUES (?, ?, ?)"
+
+# Full-text index over recipe names and descriptions, kept in sync by triggers.
+# The trigram tokenizer (SQLite 3.34+) indexes every 3-character substring, so
+# MATCH gives the same results as the LIKE '%query%' scan it replaces.
+RECIPES_FTS_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5("
+    "name, description, content='recipes', content_rowid='id', tokenize='trigram')",
+    """CREATE TRIGGER IF NOT EXISTS recipes_fts_insert AFTER INSERT ON recipes BEGIN
+        INSERT INTO recipes_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS recipes_fts_delete AFTER DELETE ON recipes BEGIN
+        INSERT INTO recipes_fts (recipes_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS recipes_fts_update AFTER UPDATE ON recipes BEGIN
+        INSERT INTO recipes_fts (recipes_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO recipes_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+)
+
+# Set by initialize_database; False when this SQLite build lacks FTS5 and search falls back to LIKE
+_fts_enabled = False
+
+# Pantry and grocery items are one row each, matched case-insensitively by name.
+# Re-adding a grocery item updates its amount and keeps its checked state and position.
+UPSERT_PANTRY_ITEM_SQL = f'''
+INSERT INTO pantry_items (name, amount) VALUES (?, ?)
+ON CONFLICT(name) DO UPDATE SET amount = excluded.amount, updated_at = {EPOCH_NOW_SQL}
+'''
+UPSERT_GROCERY_ITEM_SQL = f'''
+INSERT INTO grocery_items (name, amount, checked) VALUES (?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET amount = excluded.amount, updated_at = {EPOCH_NOW_SQL}
+'''
+
+# Where older databases kept the pantry and grocery JSON lists: a row of the kv table,
+# or before that a single-row table of their own, given as (table, JSON column)
+LEGACY_LIST_SOURCES = {
+    'pantry': ("pantry", "ingredients"),
+    'grocery': ("grocery_list", "items"),
+}
+
+# Columns kept on the recipes table itself
+RECIPE_COLUMNS = "id, name, description, cooking_time, difficulty, image_url, created_at"
+
+# Summary columns for list views; LIMIT -1 means no limit
+SUMMARY_COLUMNS = "r.id, r.name, r.description, r.cooking_time, r.difficulty, r.image_url"
+SUMMARY_SQL = f"SELECT {SUMMARY_COLUMNS} FROM recipes r ORDER BY r.name LIMIT ? OFFSET ?"
+SUMMARY_FAVORITES_SQL = (
+    f"SELECT {SUMMARY_COLUMNS} FROM recipes r JOIN favorites f ON r.id = f.recipe_id "
+    "ORDER BY r.name LIMIT ? OFFSET ?"
+)
+
+
+def _recipe_queries(where=""):
+    """Build the (recipes, ingredients, instructions) SELECTs for one full-recipe lookup
+    
+    The child queries reuse the same FROM/WHERE clause so they return rows for
+    exactly the recipes matched. Built once at import, so every call passes
+    the identical SQL text to sqlite3's statement cache.
+    """
+    child_filter = f"WHERE recipe_id IN (SELECT r.id FROM recipes r {where})" if where else ""
+    return (
+        f"SELECT r.* FROM recipes r {where} ORDER BY r.name",
+        f"SELECT recipe_id, name, amount FROM recipe_ingredients {child_filter} ORDER BY recipe_id, pos",
+        f"SELECT recipe_id, text FROM recipe_instructions {child_filter} ORDER BY recipe_id, pos",
+    )
+
+
+# Full-recipe lookups
+ALL_RECIPES_QUERIES = _recipe_queries()
+RECIPE_BY_ID_QUERIES = _recipe_queries("WHERE r.id = ?")
+FAVORITE_RECIPES_QUERIES = _recipe_queries("JOIN favorites f ON r.id = f.recipe_id")
+SEARCH_FTS_QUERIES = _recipe_queries("JOIN recipes_fts f ON f.rowid = r.id WHERE recipes_fts MATCH ?")
+SEARCH_LIKE_QUERIES = _recipe_queries("WHERE r.name LIKE ? ESCAPE '\\' OR r.description LIKE ? ESCAPE '\\'")
+
+# Escapes LIKE wildcards so a typed % or _ matches literally
+LIKE_ESCAPES = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
+# Shorter queries use a LIKE substring scan; the trigram index cannot match fewer than three characters
+FTS_MIN_QUERY_LENGTH = 3
+
+# Recipe writes. Writable columns in statement order with their defaults; name is required.
+RECIPE_WRITE_FIELDS = (
+    ("name", None),
+    ("description", ""),
+    ("cooking_time", 0),
+    ("difficulty", "Medium"),
+    ("image_url", ""),
+)
+INSERT_RECIPE_SQL = f'''
+INSERT INTO recipes ({", ".join(column for column, _ in RECIPE_WRITE_FIELDS)})
+VALUES ({", ".join("?" for _ in RECIPE_WRITE_FIELDS)})
+'''
+UPDATE_RECIPE_SQL = f'''
+UPDATE recipes SET
+    {", ".join(f"{column} = ?" for column, _ in RECIPE_WRITE_FIELDS)}
+WHERE id = ?
+'''
+
+
+def _compile_params_builder(name, fields, extra_args=()):
+    """Generate a function building a statement's parameter tuple from a recipe dictionary
+    
+    The column order and defaults are written into the function's source once at
+    import, so each write is a single tuple display with constant defaults instead
+    of a loop over the field list.
+    """
+    values = [
+        f"d[{column!r}]" if default is None else f"d.get({column!r}, {default!r})"
+        for column, default in fields
+    ]
+    values.extend(extra_args)
+    source = f"def {name}(d{''.join(', ' + arg for arg in extra_args)}):\n    return ({', '.join(values)},)\n"
+    namespace = {}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+# _recipe_params(d) -> INSERT_RECIPE_SQL parameters; _recipe_update_params(d, recipe_id) -> UPDATE_RECIPE_SQL's
+_recipe_params = _compile_params_builder("_recipe_params", RECIPE_WRITE_FIELDS)
+_recipe_update_params = _compile_params_builder("_recipe_update_params", RECIPE_WRITE_FIELDS, ("recipe_id",))
+DELETE_RECIPE_SQL = "DELETE FROM recipes WHERE id = ?"
+DELETE_RECIPE_INGREDIENTS_SQL = "DELETE FROM recipe_ingredients WHERE recipe_id = ?"
+DELETE_RECIPE_INSTRUCTIONS_SQL = "DELETE FROM recipe_instructions WHERE recipe_id = ?"
+
+# Favorites
+INSERT_FAVORITE_SQL = "INSERT OR IGNORE INTO favorites (recipe_id) VALUES (?)"
+DELETE_FAVORITE_SQL = "DELETE FROM favorites WHERE recipe_id = ?"
+
+# Pantry and grocery list
+SELECT_PANTRY_ITEMS_SQL = "SELECT name, amount FROM pantry_items ORDER BY id"
+DELETE_PANTRY_ITEM_SQL = "DELETE FROM pantry_items WHERE name = ?"
+CLEAR_PANTRY_ITEMS_SQL = "DELETE FROM pantry_items"
+SELECT_GROCERY_ITEMS_SQL = "SELECT name, amount, checked FROM grocery_items ORDER BY id"
+DELETE_GROCERY_ITEM_SQL = "DELETE FROM grocery_items WHERE name = ?"
+CLEAR_GROCERY_ITEMS_SQL = "DELETE FROM grocery_items"
+
+
+def _has_json_recipe_columns(conn):
+    """True if recipes still has the ingredients/instructions JSON columns of older databases"""
+    return 'ingredients' in {row['name'] for row in conn.execute("PRAGMA table_info(recipes)")}
+
+
+def _stale_timestamp_tables(conn):
+    """List (table, create_sql, column, columns) for each table whose timestamp column is not INTEGER yet"""
+    stale = []
+    for table, create_sql, column in TIMESTAMPED_TABLES:
+        columns = {row['name']: row['type'] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if columns.get(column, 'INTEGER').upper() != 'INTEGER':
+            stale.append((table, create_sql, column, list(columns)))
+    return stale
+
+
+def _migrate_json_recipes(conn):
+    """Move ingredients/instructions JSON columns into recipe_ingredients/recipe_instructions
+    
+    Runs once on databases created before the child tables existed; the recipes
+    table is rebuilt without the JSON columns afterwards.
+    """
+    if not _has_json_recipe_columns(conn):
+        return
+    
+    logger.info("Migrating recipe ingredients and instructions out of JSON columns")
+    
+    # The rebuild drops and recreates recipes; foreign keys must be off so favorites survive.
+    # The PRAGMA is a no-op inside a transaction, so it is toggled around it.
+    conn.execute("PRAGMA foreign_keys=OFF")
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Create recipes table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS recipes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT,
-            ingredients TEXT NOT NULL,  -- JSON string
-            instructions TEXT NOT NULL,  -- JSON string
-            cooking_time INTEGER,  -- in minutes
-            difficulty TEXT CHECK(difficulty IN ('Easy', 'Medium', 'Hard')),
-            image_url TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create favorites table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS favorites (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            recipe_id INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
-        )
-        ''')
-        
-        # Create pantry table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS pantry (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ingredients TEXT NOT NULL,  -- JSON string
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute("SELECT id, ingredients, instructions FROM recipes").fetchall()
+        for row in rows:
+            _insert_recipe_children(conn, row['id'], _loads(row['ingredients']), _loads(row['instructions']))
+        
+        conn.execute(RECIPES_TABLE_SQL.replace("recipes", "recipes_new", 1))
+        conn.execute(
+            f"INSERT INTO recipes_new ({RECIPE_COLUMNS}) "
+            f"SELECT {RECIPE_COLUMNS.replace('created_at', _epoch_from('created_at'))} FROM recipes"
         )
-        ''')
-        
-        # Create grocery_list table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS grocery_list (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            items TEXT NOT NULL,  -- JSON string
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
+        conn.execute("DROP TABLE recipes")
+        conn.execute("ALTER TABLE recipes_new RENAME TO recipes")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
+    
+    logger.info(f"Migrated {len(rows)} recipes to relational ingredient and instruction tables")
+
+
+def _migrate_epoch_timestamps(conn):
+    """Rebuild tables whose timestamp column is still TIMESTAMP text as INTEGER epoch seconds
+    
+    The declared column type serves as the schema version: tables created with
+    the current DDL are skipped, so this only does work once per older database.
+    """
+    stale = _stale_timestamp_tables(conn)
+    if not stale:
+        return
+    
+    logger.info(f"Converting timestamps to epoch seconds in {', '.join(table for table, *_ in stale)}")
+    
+    # Dropping recipes must not cascade to favorites or child rows; the PRAGMA only applies outside a transaction
+    conn.execute("PRAGMA foreign_keys=OFF")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for table, create_sql, column, columns in stale:
+            select_list = ", ".join(_epoch_from(name) if name == column else name for name in columns)
+            conn.execute(create_sql.replace(table, f"{table}_new", 1))
+            conn.execute(f"INSERT INTO {table}_new ({', '.join(columns)}) SELECT {select_list} FROM {table}")
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
+
+
+def _ingredient_rows(recipe_id, ingredients):
+    """Build recipe_ingredients rows in list order
+    
+    Ingredients are {"name", "amount"} dictionaries; bare strings are stored as a name with no amount.
+    """
+    return [
+        (recipe_id, pos, item, "") if isinstance(item, str) else (recipe_id, pos, item["name"], item.get("amount", ""))
+        for pos, item in enumerate(ingredients)
+    ]
+
+
+def _instruction_rows(recipe_id, instructions):
+    """Build recipe_instructions rows in list order"""
+    return [(recipe_id, pos, text) for pos, text in enumerate(instructions)]
+
+
+def _create_favorites_index(cursor):
+    """Enforce one favorite per recipe, dropping duplicates first; skipped once the index exists"""
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_favorites_recipe'").fetchone():
+        return
+    cursor.execute("DELETE FROM favorites WHERE id NOT IN (SELECT MIN(id) FROM favorites GROUP BY recipe_id)")
+    cursor.execute("CREATE UNIQUE INDEX idx_favorites_recipe ON favorites (recipe_id)")
+
+
+def _create_search_index(cursor, rebuild=False):
+    """Create the recipes_fts index and its triggers inside the caller's transaction
+    
+    Skipped once a trigram index exists, unless rebuild is set because recipes was
+    just rebuilt and lost its triggers. An index built by an earlier version with the
+    default word tokenizer is dropped and rebuilt. A savepoint keeps a failure on
+    SQLite builds without FTS5 or trigram from undoing the rest of the transaction.
+    """
+    global _fts_enabled
+    row = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'recipes_fts'").fetchone()
+    if row is not None and 'trigram' in row['sql'] and not rebuild:
+        _fts_enabled = True
+        return
+    
+    try:
+        cursor.execute("SAVEPOINT search_index")
+        if row is not None:
+            cursor.execute("DROP TABLE recipes_fts")
+        for statement in RECIPES_FTS_SQL:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO recipes_fts (recipes_fts) VALUES ('rebuild')")
+        cursor.execute("RELEASE search_index")
+        _fts_enabled = True
+    except sqlite3.OperationalError as e:
+        cursor.execute("ROLLBACK TO search_index")
+        cursor.execute("RELEASE search_index")
+        logger.warning(f"Full-text search unavailable, falling back to LIKE: {e}")
+        _fts_enabled = False
+
+
+def _fts_query(query):
+    """Quote free text as a single FTS5 string, which the trigram index matches as a substring"""
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _legacy_list(cursor, key):
+    """Read the pantry or grocery JSON list an older database stored, or [] if it has none"""
+    table, column = LEGACY_LIST_SOURCES[key]
+    tables = {
+        row['name'] for row in
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('kv', ?)", (table,))
+    }
+    
+    row = None
+    if 'kv' in tables:
+        row = cursor.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+    if row is None and table in tables:
+        row = cursor.execute(f"SELECT {column} FROM {table} LIMIT 1").fetchone()
+    
+    return _loads(row[0]) if row else []
+
+
+def _pantry_rows(items):
+    """Build (name, amount) rows for UPSERT_PANTRY_ITEM_SQL"""
+    return [(item["name"], item.get("amount", "")) for item in items]
+
+
+def _grocery_rows(items):
+    """Build (name, amount, checked) rows for UPSERT_GROCERY_ITEM_SQL"""
+    return [(item["name"], item.get("amount", ""), int(bool(item.get("checked", False)))) for item in items]
+
+
+def _insert_recipe_children(cursor, recipe_id, ingredients, instructions):
+    """Insert a recipe's ingredient and instruction rows in list order"""
+    cursor.executemany(INSERT_INGREDIENT_SQL, _ingredient_rows(recipe_id, ingredients))
+    cursor.executemany(INSERT_INSTRUCTION_SQL, _instruction_rows(recipe_id, instructions))
+
+
+def _as_list(value):
+    """Accept either a list or a legacy JSON string for ingredients/instructions"""
+    return _loads(value) if isinstance(value, str) else list(value or [])
+
+
+def _load_recipes(conn, queries, params=()):
+    """Run one of the *_QUERIES triples and return recipe dictionaries with children attached
+    
+    Child rows are fetched with one query per table and grouped by recipe_id in a single pass.
+    """
+    recipes_sql, ingredients_sql, instructions_sql = queries
+    
+    result = [dict(row, ingredients=[], instructions=[]) for row in conn.execute(recipes_sql, params)]
+    if not result:
+        return result
+    
+    # Unpack child rows positionally and append straight onto each recipe's lists
+    ingredients_by_id = {recipe['id']: recipe['ingredients'] for recipe in result}
+    for recipe_id, name, amount in conn.execute(ingredients_sql, params):
+        ingredients_by_id[recipe_id].append({"name": name, "amount": amount})
+    
+    instructions_by_id = {recipe['id']: recipe['instructions'] for recipe in result}
+    for recipe_id, text in conn.execute(instructions_sql, params):
+        instructions_by_id[recipe_id].append(text)
+    
+    return result
+
+
+# Recipes seeded into an empty database
+SAMPLE_RECIPES = [
+    {
+        "name": "Pasta Aglio e Olio",
+        "description": "A simple, classic Italian pasta dish with garlic and olive oil.",
+        "ingredients": [
+            {"name": "Spaghetti", "amount": "1 pound"},
+            {"name": "Olive oil", "amount": "1/2 cup"},
+            {"name": "Garlic", "amount": "6 cloves, thinly sliced"},
+            {"name": "Red pepper flakes", "amount": "1 teaspoon"},
+            {"name": "Parsley", "amount": "1/4 cup, chopped"},
+            {"name": "Salt", "amount": "To taste"},
+            {"name": "Black pepper", "amount": "To taste"}
+        ],
+        "instructions": [
+            "Bring a large pot of salted water to a boil.",
+            "Cook spaghetti according to package directions until al dente.",
+            "Meanwhile, heat olive oil in a large pan over medium heat.",
+            "Add sliced garlic and red pepper flakes, cooking until garlic is lightly golden.",
+            "Drain pasta, reserving 1/4 cup of pasta water.",
+            "Add pasta to the pan with garlic and oil, tossing to coat.",
+            "Add reserved pasta water if needed to loosen the sauce.",
+            "Season with salt and pepper, and garnish with chopped parsley."
+        ],
+        "cooking_time": 20,
+        "difficulty": "Easy",
+        "image_url": "https://example.com/pasta_aglio_olio.jpg"
+    },
+    {
+        "name": "Caprese Salad",
+        "description": "A simple Italian salad made with fresh tomatoes, mozzarella, and basil.",
+        "ingredients": [
+            {"name": "Tomatoes", "amount": "4 large, sliced"},
+            {"name": "Fresh mozzarella", "amount": "16 oz, sliced"},
+            {"name": "Fresh basil leaves", "amount": "1 bunch"},
+            {"name": "Extra virgin olive oil", "amount": "1/4 cup"},
+            {"name": "Balsamic glaze", "amount": "2 tablespoons"},
+            {"name": "Salt", "amount": "To taste"},
+            {"name": "Black pepper", "amount": "To taste"}
+        ],
+        "instructions": [
+            "Arrange tomato and mozzarella slices alternately on a serving plate.",
+            "Tuck fresh basil leaves between the tomato and cheese slices.",
+            "Drizzle with olive oil and balsamic glaze.",
+            "Season with salt and freshly ground black pepper.",
+            "Serve immediately at room temperature."
+        ],
+        "cooking_time": 10,
+        "difficulty": "Easy",
+        "image_url": "https://example.com/caprese_salad.jpg"
+    },
+    {
+        "name": "Classic Beef Stew",
+        "description": "A hearty beef stew with vegetables and rich gravy.",
+        "ingredients": [
+            {"name": "Beef chuck", "amount": "2 pounds, cubed"},
+            {"name": "Onions", "amount": "2 medium, chopped"},
+            {"name": "Carrots", "amount": "4 medium, chopped"},
+            {"name": "Potatoes", "amount": "4 medium, cubed"},
+            {"name": "Celery", "amount": "3 stalks, chopped"},
+            {"name": "Garlic", "amount": "3 cloves, minced"},
+            {"name": "Beef broth", "amount": "4 cups"},
+            {"name": "Tomato paste", "amount": "2 tablespoons"},
+            {"name": "Flour", "amount": "1/4 cup"},
+            {"name": "Vegetable oil", "amount": "3 tablespoons"},
+            {"name": "Bay leaves", "amount": "2"},
+            {"name": "Thyme", "amount": "1 teaspoon"},
+            {"name": "Salt", "amount": "To taste"},
+            {"name": "Black pepper", "amount": "To taste"}
+        ],
+        "instructions": [
+            "Season beef with salt and pepper, then coat with flour.",
+            "Heat oil in a large pot over medium-high heat.",
+            "Brown beef in batches, then set aside.",
+            "In the same pot, sauté onions, carrots, and celery until softened.",
+            "Add garlic and cook for 1 minute.",
+            "Stir in tomato paste and cook for 2 minutes.",
+            "Return beef to the pot and add beef broth, bay leaves, and thyme.",
+            "Bring to a boil, then reduce heat and simmer covered for 1.5 hours.",
+            "Add potatoes and simmer for another 30-45 minutes until meat and vegetables are tender.",
+            "Season with additional salt and pepper if needed."
+        ],
+        "cooking_time": 150,
+        "difficulty": "Medium",
+        "image_url": "https://example.com/beef_stew.jpg"
+    }
+]
+
+
+def initialize_database():
+    """Initialize the database with required tables if they don't exist"""
+    try:
+        with acquire(readonly=False) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            
+            # Create recipes table
+            cursor.execute(RECIPES_TABLE_SQL)
+            
+            # Create recipe ingredient and instruction tables, one row per list entry
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS recipe_ingredients (
+                recipe_id INTEGER NOT NULL,
+                pos INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                amount TEXT,
+                PRIMARY KEY (recipe_id, pos),
+                FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
+            )
+            ''')
+            
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS recipe_instructions (
+                recipe_id INTEGER NOT NULL,
+                pos INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (recipe_id, pos),
+                FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
+            )
+            ''')
+            
+            # Create favorites table
+            cursor.execute(FAVORITES_TABLE_SQL)
+            
+            # Create pantry and grocery items tables, one row per item
+            existing_tables = {row['name'] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            cursor.execute(PANTRY_ITEMS_TABLE_SQL)
+            cursor.execute(GROCERY_ITEMS_TABLE_SQL)
+            
+            # First run with the row tables: copy in the JSON lists an older database kept
+            # in kv or its legacy single-row tables, which new databases never create
+            if 'pantry_items' not in existing_tables:
+                cursor.executemany(UPSERT_PANTRY_ITEM_SQL, _pantry_rows(_legacy_list(cursor, 'pantry')))
+            if 'grocery_items' not in existing_tables:
+                cursor.executemany(UPSERT_GROCERY_ITEM_SQL, _grocery_rows(_legacy_list(cursor, 'grocery')))
+            
+            # Older databases rebuild recipes (and favorites) below, which drops their indexes and
+            # triggers; those are created once after the migrations instead of here
+            legacy_recipes = _has_json_recipe_columns(cursor)
+            needs_migration = legacy_recipes or bool(_stale_timestamp_tables(cursor))
+            
+            # Seed an empty database in the same transaction as the schema, so a first run commits once.
+            # A pre-migration recipes table still has its JSON columns; seed that after the migration.
+            needs_samples = cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM recipes)").fetchone()[0]
+            if needs_samples and not legacy_recipes:
+                _insert_sample_recipes(cursor)
+            
+            if not needs_migration:
+                _create_favorites_index(cursor)
+                _create_search_index(cursor)
+            
+            conn.commit()
+            
+            if needs_migration:
+                # Split JSON ingredient/instruction blobs from older databases into the child tables
+                _migrate_json_recipes(conn)
+                
+                # Convert TIMESTAMP text columns from older databases to epoch seconds
+                _migrate_epoch_timestamps(conn)
+                
+                # Index the rebuilt tables; favorites may hold duplicates from before the unique index
+                cursor.execute("BEGIN IMMEDIATE")
+                _create_favorites_index(cursor)
+                if needs_samples:
+                    _insert_sample_recipes(cursor)
+                _create_search_index(cursor, rebuild=True)
+                conn.commit()
+            
+        if needs_samples:
+            _invalidate_recipes()
+            logger.info("Sample recipes added successfully")
         logger.info("Database initialized successfully")
-        
-        # Check if we need to add sample recipes
-        cursor.execute("SELECT COUNT(*) FROM recipes")
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
-            add_sample_recipes()
             
     except sqlite3.Error as e:
         logger.error(f"Database initialization error: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
+
+
+def _insert_sample_recipes(cursor):
+    """Insert SAMPLE_RECIPES and their child rows inside the caller's transaction"""
+    cursor.executemany(INSERT_RECIPE_SQL, [_recipe_params(recipe) for recipe in SAMPLE_RECIPES])
+    
+    # executemany doesn't report per-row ids; rowids are handed out in insertion
+    # order inside the transaction, so the newest N ids match SAMPLE_RECIPES
+    cursor.execute("SELECT id FROM recipes ORDER BY id DESC LIMIT ?", (len(SAMPLE_RECIPES),))
+    recipe_ids = [row['id'] for row in reversed(cursor.fetchall())]
+    
+    cursor.executemany(INSERT_INGREDIENT_SQL, [
+        row for recipe_id, recipe in zip(recipe_ids, SAMPLE_RECIPES)
+        for row in _ingredient_rows(recipe_id, recipe["ingredients"])
+    ])
+    cursor.executemany(INSERT_INSTRUCTION_SQL, [
+        row for recipe_id, recipe in zip(recipe_ids, SAMPLE_RECIPES)
+        for row in _instruction_rows(recipe_id, recipe["instructions"])
+    ])
 
 
 def add_sample_recipes():
     """Add sample recipes to the database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Sample recipes
-        sample_recipes = [
-            {
-                "name": "Pasta Aglio e Olio",
-                "description": "A simple, classic Italian pasta dish with garlic and olive oil.",
-                "ingredients": json.dumps([
-                    {"name": "Spaghetti", "amount": "1 pound"},
-                    {"name": "Olive oil", "amount": "1/2 cup"},
-                    {"name": "Garlic", "amount": "6 cloves, thinly sliced"},
-                    {"name": "Red pepper flakes", "amount": "1 teaspoon"},
-                    {"name": "Parsley", "amount": "1/4 cup, chopped"},
-                    {"name": "Salt", "amount": "To taste"},
-                    {"name": "Black pepper", "amount": "To taste"}
-                ]),
-                "instructions": json.dumps([
-                    "Bring a large pot of salted water to a boil.",
-                    "Cook spaghetti according to package directions until al dente.",
-                    "Meanwhile, heat olive oil in a large pan over medium heat.",
-                    "Add sliced garlic and red pepper flakes, cooking until garlic is lightly golden.",
-                    "Drain pasta, reserving 1/4 cup of pasta water.",
-                    "Add pasta to the pan with garlic and oil, tossing to coat.",
-                    "Add reserved pasta water if needed to loosen the sauce.",
-                    "Season with salt and pepper, and garnish with chopped parsley."
-                ]),
-                "cooking_time": 20,
-                "difficulty": "Easy",
-                "image_url": "https://example.com/pasta_aglio_olio.jpg"
-            },
-            {
-                "name": "Caprese Salad",
-                "description": "A simple Italian salad made with fresh tomatoes, mozzarella, and basil.",
-                "ingredients": json.dumps([
-                    {"name": "Tomatoes", "amount": "4 large, sliced"},
-                    {"name": "Fresh mozzarella", "amount": "16 oz, sliced"},
-                    {"name": "Fresh basil leaves", "amount": "1 bunch"},
-                    {"name": "Extra virgin olive oil", "amount": "1/4 cup"},
-                    {"name": "Balsamic glaze", "amount": "2 tablespoons"},
-                    {"name": "Salt", "amount": "To taste"},
-                    {"name": "Black pepper", "amount": "To taste"}
-                ]),
-                "instructions": json.dumps([
-                    "Arrange tomato and mozzarella slices alternately on a serving plate.",
-                    "Tuck fresh basil leaves between the tomato and cheese slices.",
-                    "Drizzle with olive oil and balsamic glaze.",
-                    "Season with salt and freshly ground black pepper.",
-                    "Serve immediately at room temperature."
-                ]),
-                "cooking_time": 10,
-                "difficulty": "Easy",
-                "image_url": "https://example.com/caprese_salad.jpg"
-            },
-            {
-                "name": "Classic Beef Stew",
-                "description": "A hearty beef stew with vegetables and rich gravy.",
-                "ingredients": json.dumps([
-                    {"name": "Beef chuck", "amount": "2 pounds, cubed"},
-                    {"name": "Onions", "amount": "2 medium, chopped"},
-                    {"name": "Carrots", "amount": "4 medium, chopped"},
-                    {"name": "Potatoes", "amount": "4 medium, cubed"},
-                    {"name": "Celery", "amount": "3 stalks, chopped"},
-                    {"name": "Garlic", "amount": "3 cloves, minced"},
-                    {"name": "Beef broth", "amount": "4 cups"},
-                    {"name": "Tomato paste", "amount": "2 tablespoons"},
-                    {"name": "Flour", "amount": "1/4 cup"},
-                    {"name": "Vegetable oil", "amount": "3 tablespoons"},
-                    {"name": "Bay leaves", "amount": "2"},
-                    {"name": "Thyme", "amount": "1 teaspoon"},
-                    {"name": "Salt", "amount": "To taste"},
-                    {"name": "Black pepper", "amount": "To taste"}
-                ]),
-                "instructions": json.dumps([
-                    "Season beef with salt and pepper, then coat with flour.",
-                    "Heat oil in a large pot over medium-high heat.",
-                    "Brown beef in batches, then set aside.",
-                    "In the same pot, sauté onions, carrots, and celery until softened.",
-                    "Add garlic and cook for 1 minute.",
-                    "Stir in tomato paste and cook for 2 minutes.",
-                    "Return beef to the pot and add beef broth, bay leaves, and thyme.",
-                    "Bring to a boil, then reduce heat and simmer covered for 1.5 hours.",
-                    "Add potatoes and simmer for another 30-45 minutes until meat and vegetables are tender.",
-                    "Season with additional salt and pepper if needed."
-                ]),
-                "cooking_time": 150,
-                "difficulty": "Medium",
-                "image_url": "https://example.com/beef_stew.jpg"
-            }
-        ]
-        
-        # Insert sample recipes
-        for recipe in sample_recipes:
-            cursor.execute('''
-            INSERT INTO recipes (name, description, ingredients, instructions, cooking_time, difficulty, image_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                recipe["name"],
-                recipe["description"],
-                recipe["ingredients"],
-                recipe["instructions"],
-                recipe["cooking_time"],
-                recipe["difficulty"],
-                recipe["image_url"]
-            ))
-        
-        # Initialize empty pantry
-        cursor.execute('''
-        INSERT INTO pantry (ingredients) VALUES (?)
-        ''', (json.dumps([]),))
-        
-        # Initialize empty grocery list
-        cursor.execute('''
-        INSERT INTO grocery_list (items) VALUES (?)
-        ''', (json.dumps([]),))
-        
-        conn.commit()
+        # Seed everything in one write transaction so it commits with a single sync
+        with _write_transaction() as conn:
+            _insert_sample_recipes(conn.cursor())
+        _invalidate_recipes()
         logger.info("Sample recipes added successfully")
         
     except sqlite3.Error as e:
         logger.error(f"Error adding sample recipes: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
-def get_all_recipes():
-    """Get all recipes from the database"""
+def list_recipes(limit=None, offset=0, favorites_only=False):
+    """Get recipe summaries (no ingredients or instructions) for list views
+    
+    Returns sqlite3.Row objects with id, name, description, cooking_time,
+    difficulty and image_url, ordered by name.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM recipes ORDER BY name")
-        recipes = cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        result = []
-        for recipe in recipes:
-            recipe_dict = dict(recipe)
-            recipe_dict['ingredients'] = json.loads(recipe_dict['ingredients'])
-            recipe_dict['instructions'] = json.loads(recipe_dict['instructions'])
-            result.append(recipe_dict)
-            
+        with acquire() as conn:
+            return conn.execute(
+                SUMMARY_FAVORITES_SQL if favorites_only else SUMMARY_SQL,
+                (-1 if limit is None else limit, offset)
+            ).fetchall()
+        
+    except sqlite3.Error as e:
+        logger.error(f"Error listing recipes: {e}")
+        raise
+
+
+def iter_recipes(batch_size=100):
+    """Yield recipe summaries one at a time, fetching batch_size rows per round trip
+    
+    For large scans that shouldn't materialize every row; the reader connection
+    is held until the generator is exhausted or closed.
+    """
+    try:
+        with acquire() as conn:
+            cursor = conn.execute(SUMMARY_SQL, (-1, 0))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        
+    except sqlite3.Error as e:
+        logger.error(f"Error iterating recipes: {e}")
+        raise
+
+
+def get_recipes_full():
+    """Get all recipes with their ingredients and instructions, for detail views
+    
+    Results are cached until the next recipe write; treat the returned dictionaries as read-only.
+    List views should use list_recipes instead.
+    """
+    global _all_recipes_cache
+    with _recipe_cache_lock:
+        version = _recipes_version
+        if _all_recipes_cache is not None and _all_recipes_cache[0] == version:
+            return list(_all_recipes_cache[1])
+    
+    try:
+        with _read_snapshot() as conn:
+            result = _load_recipes(conn, ALL_RECIPES_QUERIES)
+        
+        # Only keep the result if no write happened while it was being read
+        with _recipe_cache_lock:
+            if version == _recipes_version:
+                _all_recipes_cache = (version, tuple(result))
+                _recipe_cache.update((recipe['id'], recipe) for recipe in result)
+        
         return result
         
     except sqlite3.Error as e:
         logger.error(f"Error getting recipes: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
+
+
+# Kept for existing callers; prefer list_recipes for lists and get_recipes_full for details
+get_all_recipes = get_recipes_full
 
 
 def get_recipe_by_id(recipe_id):
-    """Get a recipe by its ID"""
+    """Get a recipe by its ID
+    
+    Results are cached until the recipe is next written; treat the returned dictionary as read-only.
+    """
+    with _recipe_cache_lock:
+        version = _recipes_version
+        recipe = _recipe_cache.get(recipe_id)
+        if recipe is not None:
+            return recipe
+    
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with _read_snapshot() as conn:
+            recipes = _load_recipes(conn, RECIPE_BY_ID_QUERIES, (recipe_id,))
         
-        cursor.execute("SELECT * FROM recipes WHERE id = ?", (recipe_id,))
-        recipe = cursor.fetchone()
-        
-        if recipe:
-            recipe_dict = dict(recipe)
-            recipe_dict['ingredients'] = json.loads(recipe_dict['ingredients'])
-            recipe_dict['instructions'] = json.loads(recipe_dict['instructions'])
-            return recipe_dict
-        else:
+        if not recipes:
             return None
         
+        with _recipe_cache_lock:
+            if version == _recipes_version:
+                _recipe_cache[recipe_id] = recipes[0]
+        
+        return recipes[0]
+        
     except sqlite3.Error as e:
         logger.error(f"Error getting recipe by ID: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def search_recipes(query):
     """Search recipes by name or description"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Use LIKE for case-insensitive search
-        search_term = f"%{query}%"
-        cursor.execute(
-            "SELECT * FROM recipes WHERE name LIKE ? OR description LIKE ? ORDER BY name",
-            (search_term, search_term)
-        )
-        recipes = cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        result = []
-        for recipe in recipes:
-            recipe_dict = dict(recipe)
-            recipe_dict['ingredients'] = json.loads(recipe_dict['ingredients'])
-            recipe_dict['instructions'] = json.loads(recipe_dict['instructions'])
-            result.append(recipe_dict)
-            
-        return result
+        if _fts_enabled and len(query) >= FTS_MIN_QUERY_LENGTH:
+            # Match the query as a substring through the trigram index
+            queries, params = SEARCH_FTS_QUERIES, (_fts_query(query),)
+        else:
+            # Use LIKE for case-insensitive search, with wildcards in the query escaped
+            search_term = f"%{query.translate(LIKE_ESCAPES)}%"
+            queries, params = SEARCH_LIKE_QUERIES, (search_term,) * 2
+        
+        with _read_snapshot() as conn:
+            # Convert to list of dictionaries
+            return _load_recipes(conn, queries, params)
         
     except sqlite3.Error as e:
         logger.error(f"Error searching recipes: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def add_recipe(recipe_data):
     """Add a new recipe to the database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        ingredients = _as_list(recipe_data['ingredients'])
+        instructions = _as_list(recipe_data['instructions'])
         
-        # Ensure ingredients and instructions are JSON strings
-        if isinstance(recipe_data['ingredients'], list):
-            recipe_data['ingredients'] = json.dumps(recipe_data['ingredients'])
+        with _write_transaction() as conn:
+            cursor = conn.cursor()
             
-        if isinstance(recipe_data['instructions'], list):
-            recipe_data['instructions'] = json.dumps(recipe_data['instructions'])
-        
-        cursor.execute('''
-        INSERT INTO recipes (name, description, ingredients, instructions, cooking_time, difficulty, image_url)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            recipe_data["name"],
-            recipe_data.get("description", ""),
-            recipe_data["ingredients"],
-            recipe_data["instructions"],
-            recipe_data.get("cooking_time", 0),
-            recipe_data.get("difficulty", "Medium"),
-            recipe_data.get("image_url", "")
-        ))
-        
-        # Get the ID of the newly inserted recipe
-        recipe_id = cursor.lastrowid
-        
-        conn.commit()
+            cursor.execute(INSERT_RECIPE_SQL, _recipe_params(recipe_data))
+            
+            # Get the ID of the newly inserted recipe
+            recipe_id = cursor.lastrowid
+            _insert_recipe_children(cursor, recipe_id, ingredients, instructions)
+        _invalidate_recipes(recipe_id)
         logger.info(f"Recipe '{recipe_data['name']}' added successfully with ID {recipe_id}")
         
         return recipe_id
@@ -353,67 +1016,43 @@ def add_recipe(recipe_data):
     except sqlite3.Error as e:
         logger.error(f"Error adding recipe: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def update_recipe(recipe_id, recipe_data):
     """Update an existing recipe"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        ingredients = _as_list(recipe_data['ingredients'])
+        instructions = _as_list(recipe_data['instructions'])
         
-        # Ensure ingredients and instructions are JSON strings
-        if isinstance(recipe_data.get('ingredients'), list):
-            recipe_data['ingredients'] = json.dumps(recipe_data['ingredients'])
+        with _write_transaction() as conn:
+            cursor = conn.cursor()
             
-        if isinstance(recipe_data.get('instructions'), list):
-            recipe_data['instructions'] = json.dumps(recipe_data['instructions'])
-        
-        cursor.execute('''
-        UPDATE recipes SET 
-            name = ?,
-            description = ?,
-            ingredients = ?,
-            instructions = ?,
-            cooking_time = ?,
-            difficulty = ?,
-            image_url = ?
-        WHERE id = ?
-        ''', (
-            recipe_data["name"],
-            recipe_data.get("description", ""),
-            recipe_data["ingredients"],
-            recipe_data["instructions"],
-            recipe_data.get("cooking_time", 0),
-            recipe_data.get("difficulty", "Medium"),
-            recipe_data.get("image_url", ""),
-            recipe_id
-        ))
-        
-        conn.commit()
+            cursor.execute(UPDATE_RECIPE_SQL, _recipe_update_params(recipe_data, recipe_id))
+            updated = cursor.rowcount > 0
+            
+            # Replace the child rows wholesale; positions are rewritten from the new lists
+            if updated:
+                cursor.execute(DELETE_RECIPE_INGREDIENTS_SQL, (recipe_id,))
+                cursor.execute(DELETE_RECIPE_INSTRUCTIONS_SQL, (recipe_id,))
+                _insert_recipe_children(cursor, recipe_id, ingredients, instructions)
+        _invalidate_recipes(recipe_id)
         logger.info(f"Recipe with ID {recipe_id} updated successfully")
         
-        return cursor.rowcount > 0  # Return True if a row was updated
+        return updated  # Return True if a row was updated
         
     except sqlite3.Error as e:
         logger.error(f"Error updating recipe: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def delete_recipe(recipe_id):
     """Delete a recipe by its ID"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM recipes WHERE id = ?", (recipe_id,))
-        
-        conn.commit()
+        with _write_transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(DELETE_RECIPE_SQL, (recipe_id,))
+        _invalidate_recipes(recipe_id)
         logger.info(f"Recipe with ID {recipe_id} deleted successfully")
         
         return cursor.rowcount > 0  # Return True if a row was deleted
@@ -421,47 +1060,34 @@ def delete_recipe(recipe_id):
     except sqlite3.Error as e:
         logger.error(f"Error deleting recipe: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def add_to_favorites(recipe_id):
     """Add a recipe to favorites"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with _write_transaction() as conn:
+            # The unique index on recipe_id turns a duplicate into a no-op, so one statement suffices
+            added = conn.execute(INSERT_FAVORITE_SQL, (recipe_id,)).rowcount == 1
         
-        # Check if already in favorites
-        cursor.execute("SELECT id FROM favorites WHERE recipe_id = ?", (recipe_id,))
-        if cursor.fetchone():
+        if added:
+            logger.info(f"Recipe with ID {recipe_id} added to favorites")
+        else:
             logger.info(f"Recipe with ID {recipe_id} is already in favorites")
-            return False
-        
-        cursor.execute("INSERT INTO favorites (recipe_id) VALUES (?)", (recipe_id,))
         
-        conn.commit()
-        logger.info(f"Recipe with ID {recipe_id} added to favorites")
-        
-        return True
+        return added
         
     except sqlite3.Error as e:
         logger.error(f"Error adding to favorites: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def remove_from_favorites(recipe_id):
     """Remove a recipe from favorites"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM favorites WHERE recipe_id = ?", (recipe_id,))
-        
-        conn.commit()
+        with _write_transaction() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(DELETE_FAVORITE_SQL, (recipe_id,))
         logger.info(f"Recipe with ID {recipe_id} removed from favorites")
         
         return cursor.rowcount > 0  # Return True if a row was deleted
@@ -469,87 +1095,87 @@ def remove_from_favorites(recipe_id):
     except sqlite3.Error as e:
         logger.error(f"Error removing from favorites: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_favorite_recipes():
     """Get all favorite recipes"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT r.* FROM recipes r
-        JOIN favorites f ON r.id = f.recipe_id
-        ORDER BY r.name
-        ''')
-        recipes = cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        result = []
-        for recipe in recipes:
-            recipe_dict = dict(recipe)
-            recipe_dict['ingredients'] = json.loads(recipe_dict['ingredients'])
-            recipe_dict['instructions'] = json.loads(recipe_dict['instructions'])
-            result.append(recipe_dict)
-            
-        return result
+        with _read_snapshot() as conn:
+            # Convert to list of dictionaries
+            return _load_recipes(conn, FAVORITE_RECIPES_QUERIES)
         
     except sqlite3.Error as e:
         logger.error(f"Error getting favorite recipes: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_pantry_ingredients():
     """Get the current pantry ingredients"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT ingredients FROM pantry LIMIT 1")
-        result = cursor.fetchone()
+        with acquire() as conn:
+            rows = conn.execute(SELECT_PANTRY_ITEMS_SQL).fetchall()
         
-        if result:
-            return json.loads(result['ingredients'])
-        else:
-            # Initialize pantry if it doesn't exist
-            cursor.execute("INSERT INTO pantry (ingredients) VALUES (?)", (json.dumps([]),))
-            conn.commit()
-            return []
+        return [dict(row) for row in rows]
         
     except sqlite3.Error as e:
         logger.error(f"Error getting pantry ingredients: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
-def update_pantry_ingredients(ingredients):
-    """Update the pantry ingredients"""
+def add_pantry_items(items):
+    """Add pantry items, updating the amount of any already present (names match case-insensitively)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with _write_transaction() as conn:
+            conn.executemany(UPSERT_PANTRY_ITEM_SQL, _pantry_rows(items))
+        logger.info(f"Added {len(items)} pantry items")
         
-        # Ensure ingredients is a JSON string
-        if isinstance(ingredients, list):
-            ingredients = json.dumps(ingredients)
+        return True
         
-        cursor.execute("SELECT id FROM pantry LIMIT 1")
-        result = cursor.fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Error adding pantry items: {e}")
+        raise
+
+
+def remove_pantry_items(names):
+    """Remove pantry items by name (case-insensitive)"""
+    try:
+        with _write_transaction() as conn:
+            conn.executemany(DELETE_PANTRY_ITEM_SQL, [(name,) for name in names])
+        logger.info(f"Removed {len(names)} pantry items")
         
-        if result:
-            cursor.execute("UPDATE pantry SET ingredients = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", 
-                          (ingredients, result['id']))
-        else:
-            cursor.execute("INSERT INTO pantry (ingredients) VALUES (?)", (ingredients,))
+        return True
         
-        conn.commit()
+    except sqlite3.Error as e:
+        logger.error(f"Error removing pantry items: {e}")
+        raise
+
+
+def clear_pantry_items():
+    """Remove every item from the pantry"""
+    try:
+        with _write_transaction() as conn:
+            conn.execute(CLEAR_PANTRY_ITEMS_SQL)
+        logger.info("Pantry cleared")
+        
+        return True
+        
+    except sqlite3.Error as e:
+        logger.error(f"Error clearing pantry: {e}")
+        raise
+
+
+def update_pantry_ingredients(ingredients):
+    """Replace the pantry ingredients with a new list
+    
+    Prefer add_pantry_items / remove_pantry_items for single edits; this rewrites every row.
+    """
+    try:
+        # Accept a JSON string as well as a list
+        ingredients = _as_list(ingredients)
+        
+        with _write_transaction() as conn:
+            conn.execute(CLEAR_PANTRY_ITEMS_SQL)
+            conn.executemany(UPSERT_PANTRY_ITEM_SQL, _pantry_rows(ingredients))
         logger.info("Pantry ingredients updated successfully")
         
         return True
@@ -557,56 +1183,73 @@ def update_pantry_ingredients(ingredients):
     except sqlite3.Error as e:
         logger.error(f"Error updating pantry ingredients: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_grocery_list():
-    """Get the current grocery list"""
+    """Get the current grocery list as {"name", "amount", "checked"} dictionaries"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with acquire() as conn:
+            return [
+                {"name": name, "amount": amount, "checked": bool(checked)}
+                for name, amount, checked in conn.execute(SELECT_GROCERY_ITEMS_SQL)
+            ]
         
-        cursor.execute("SELECT items FROM grocery_list LIMIT 1")
-        result = cursor.fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Error getting grocery list: {e}")
+        raise
+
+
+def add_grocery_items(items):
+    """Add grocery items, updating the amount of any already listed (names match case-insensitively)"""
+    try:
+        with _write_transaction() as conn:
+            conn.executemany(UPSERT_GROCERY_ITEM_SQL, _grocery_rows(items))
+        logger.info(f"Added {len(items)} grocery items")
         
-        if result:
-            return json.loads(result['items'])
-        else:
-            # Initialize grocery list if it doesn't exist
-            cursor.execute("INSERT INTO grocery_list (items) VALUES (?)", (json.dumps([]),))
-            conn.commit()
-            return []
+        return True
         
     except sqlite3.Error as e:
-        logger.error(f"Error getting grocery list: {e}")
+        logger.error(f"Error adding grocery items: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
 
 
-def update_grocery_list(items):
-    """Update the grocery list"""
+def remove_grocery_items(names):
+    """Remove grocery items by name (case-insensitive)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with _write_transaction() as conn:
+            conn.executemany(DELETE_GROCERY_ITEM_SQL, [(name,) for name in names])
+        logger.info(f"Removed {len(names)} grocery items")
         
-        # Ensure items is a JSON string
-        if isinstance(items, list):
-            items = json.dumps(items)
+        return True
         
-        cursor.execute("SELECT id FROM grocery_list LIMIT 1")
-        result = cursor.fetchone()
+    except sqlite3.Error as e:
+        logger.error(f"Error removing grocery items: {e}")
+        raise
+
+
+def clear_grocery_items():
+    """Remove every item from the grocery list"""
+    try:
+        with _write_transaction() as conn:
+            conn.execute(CLEAR_GROCERY_ITEMS_SQL)
+        logger.info("Grocery list cleared")
         
-        if result:
-            cursor.execute("UPDATE grocery_list SET items = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", 
-                          (items, result['id']))
-        else:
-            cursor.execute("INSERT INTO grocery_list (items) VALUES (?)", (items,))
+        return True
         
-        conn.commit()
+    except sqlite3.Error as e:
+        logger.error(f"Error clearing grocery list: {e}")
+        raise
+
+
+def update_grocery_list(items):
+    """Replace the grocery list with a new list
+    
+    Prefer add_grocery_items / remove_grocery_items for single edits; this rewrites every row.
+    """
+    try:
+        with _write_transaction() as conn:
+            conn.execute(CLEAR_GROCERY_ITEMS_SQL)
+            conn.executemany(UPSERT_GROCERY_ITEM_SQL, _grocery_rows(items))
         logger.info("Grocery list updated successfully")
         
         return True
@@ -614,6 +1257,3 @@ def update_grocery_list(items):
     except sqlite3.Error as e:
         logger.error(f"Error updating grocery list: {e}")
         raise
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -8,15 +8,53 @@ Main application entry point
 
 import sys
 import logging
-from PyQt5.QtWidgets import QApplication
+import argparse
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QMessageBox
 
 from ui import MainWindow
 from utils import setup_logging, load_config
-from database import initialize_database
+from database import initialize_database, get_pantry_ingredients
+from api import prewarm_recipe_cache
+
+
+class DatabaseInitWorker(QRunnable):
+    """Runs initialize_database on a pool thread and reports back to the main thread"""
+    
+    class Signals(QObject):
+        finished = pyqtSignal()
+        failed = pyqtSignal(str)
+    
+    def __init__(self):
+        super().__init__()
+        # Created on the main thread, so emits from the worker are queued back to it
+        self.signals = self.Signals()
+    
+    def run(self):
+        try:
+            initialize_database()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit()
+
+
+def parse_args():
+    """Parse DishDazzle's own command-line flags, leaving Qt's untouched"""
+    parser = argparse.ArgumentParser(description="DishDazzle - AI-powered desktop recipe assistant")
+    parser.add_argument(
+        "--prewarm-cache",
+        action="store_true",
+        help="Fetch recipe suggestions for the pantry ingredients in the background at startup"
+    )
+    args, _ = parser.parse_known_args()
+    return args
 
 
 def main():
     """Main application entry point"""
+    args = parse_args()
+    
     # Setup logging
     setup_logging()
     logger = logging.getLogger(__name__)
@@ -25,9 +63,6 @@ def main():
     # Load configuration
     config = load_config()
     
-    # Initialize database
-    initialize_database()
-    
     # Create and start Qt application
     app = QApplication(sys.argv)
     app.setApplicationName("DishDazzle")
@@ -37,6 +72,25 @@ def main():
     main_window = MainWindow(config)
     main_window.show()
     
+    def on_database_ready():
+        main_window.load_initial_data()
+        
+        # Optionally warm the suggestion cache for what's already in the pantry
+        if args.prewarm_cache:
+            pantry_names = [item["name"] for item in get_pantry_ingredients()]
+            prewarm_recipe_cache([pantry_names])
+    
+    def on_database_failed(error):
+        logger.error(f"Database initialization failed: {error}")
+        QMessageBox.critical(main_window, "Database Error", f"Failed to initialize the database: {error}")
+        app.exit(1)
+    
+    # Initialize the database off the UI thread so the window paints immediately
+    db_worker = DatabaseInitWorker()
+    db_worker.signals.finished.connect(on_database_ready)
+    db_worker.signals.failed.connect(on_database_failed)
+    QThreadPool.globalInstance().start(db_worker)
+    
     # Start application event loop
     sys.exit(app.exec_())
 
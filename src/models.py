@@ -6,11 +6,16 @@ DishDazzle - Data Models
 Defines data models for the application
 """
 
+import sys
+from datetime import datetime
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 
+# Slotted dataclasses drop the per-instance __dict__; slots=True needs Python 3.10+
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Ingredient:
     """Represents a recipe ingredient"""
     name: str
@@ -32,7 +37,7 @@ class Ingredient:
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Recipe:
     """Represents a recipe"""
     id: Optional[int] = None
@@ -43,7 +48,12 @@ class Recipe:
     cooking_time: int = 0  # in minutes
     difficulty: str = "Medium"  # Easy, Medium, Hard
     image_url: str = ""
-    created_at: str = ""
+    created_at: int = 0  # unix epoch seconds
+    
+    @property
+    def created_datetime(self) -> Optional[datetime]:
+        """created_at as a local datetime, parsed on demand"""
+        return datetime.fromtimestamp(self.created_at) if self.created_at else None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -51,7 +61,8 @@ class Recipe:
             "id": self.id,
             "name": self.name,
             "description": self.description,
-            "ingredients": [ingredient.to_dict() for ingredient in self.ingredients],
+            # Built inline rather than via Ingredient.to_dict to skip a method call per ingredient
+            "ingredients": [{"name": ingredient.name, "amount": ingredient.amount} for ingredient in self.ingredients],
             "instructions": self.instructions,
             "cooking_time": self.cooking_time,
             "difficulty": self.difficulty,
@@ -61,8 +72,12 @@ class Recipe:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Recipe':
-        """Create from dictionary"""
-        ingredients = [Ingredient.from_dict(ing) for ing in data.get("ingredients", [])]
+        """Create from dictionary
+        
+        Slow path for detail views and typed callers only: the database layer
+        and UI pass recipe dictionaries straight through.
+        """
+        ingredients = [Ingredient(ing.get("name", ""), ing.get("amount", "")) for ing in data.get("ingredients", [])]
         
         return cls(
             id=data.get("id"),
@@ -73,11 +88,11 @@ class Recipe:
             cooking_time=data.get("cooking_time", 0),
             difficulty=data.get("difficulty", "Medium"),
             image_url=data.get("image_url", ""),
-            created_at=data.get("created_at", "")
+            created_at=data.get("created_at", 0)
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class GroceryItem:
     """Represents an item in the grocery list"""
     name: str
@@ -102,7 +117,7 @@ class GroceryItem:
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class PantryItem:
     """Represents an item in the pantry"""
     name: str
@@ -124,7 +139,7 @@ class PantryItem:
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class ChatMessage:
     """Represents a chat message in the AI assistant"""
     content: str
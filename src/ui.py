@@ -3,26 +3,38 @@ DishDazzle - Modern UI Module
 Implements a beautiful PyQt5 GUI with sidebar navigation and professional styling
 """
 
+import re
+import html
 import json
+import math
 import logging
+import functools
 from typing import Dict, List, Any, Optional, Callable
 
+# Dialog-only widgets (QDialog, QFormLayout, QDialogButtonBox, QFileDialog) are
+# imported in the handlers that open them, keeping them off the startup path
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget,
-    QPushButton, QLabel, QLineEdit, QTextEdit, QListWidget, QListWidgetItem,
+    QPushButton, QLabel, QLineEdit, QTextEdit, QPlainTextEdit, QTextBrowser, QListWidget, QListWidgetItem, QListView,
     QComboBox, QSpinBox, QCheckBox, QRadioButton, QGroupBox, QScrollArea,
-    QSplitter, QFrame, QFileDialog, QMessageBox, QProgressBar, QAction,
-    QToolBar, QStatusBar, QMenu, QSizePolicy, QInputDialog, QDialog,
-    QDialogButtonBox, QFormLayout, QApplication, QGraphicsDropShadowEffect
+    QSplitter, QFrame, QMessageBox, QProgressBar, QAction,
+    QToolBar, QStatusBar, QMenu, QSizePolicy,
+    QApplication, QGraphicsDropShadowEffect, QStyledItemDelegate
+)
+from PyQt5.QtCore import (
+    Qt, QSize, pyqtSignal, QThread, QTimer, QDateTime, QPropertyAnimation, QEasingCurve,
+    QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, QRectF
+)
+from PyQt5.QtGui import (
+    QIcon, QPixmap, QFont, QColor, QLinearGradient, QPainter, QPainterPath, QPalette, QPen,
+    QTextDocument, QAbstractTextDocumentLayout
 )
-from PyQt5.QtCore import Qt, QSize, pyqtSignal, QThread, QTimer, QDateTime, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QIcon, QPixmap, QFont, QColor, QPalette, QPainter, QLinearGradient
 
-from models import Recipe, Ingredient, GroceryItem, PantryItem, ChatMessage
 from database import (
-    get_all_recipes, get_recipe_by_id, search_recipes, add_recipe, update_recipe,
-    delete_recipe, add_to_favorites, remove_from_favorites, get_favorite_recipes,
-    get_pantry_ingredients, update_pantry_ingredients, get_grocery_list, update_grocery_list
+    list_recipes, get_recipe_by_id, search_recipes, add_recipe, update_recipe,
+    delete_recipe, add_to_favorites, remove_from_favorites,
+    get_pantry_ingredients, add_pantry_items, remove_pantry_items, clear_pantry_items,
+    get_grocery_list, add_grocery_items, remove_grocery_items, clear_grocery_items
 )
 from api import (
     initialize_api, get_recipe_suggestions, get_ingredient_substitutions,
@@ -33,167 +45,854 @@ from utils import load_config, update_config, export_recipe_to_json, import_reci
 # Get logger
 logger = logging.getLogger(__name__)
 
+# Color of a recipe's difficulty in the details view; anything else shows as "Hard"
+_DIFFICULTY_COLORS = {"Easy": "green", "Medium": "orange", "Hard": "red"}
+
+# Default stylesheet of the suggestions document: ingredients the user has or lacks
+_SUGGESTIONS_CSS = "li.available { color: green; } li.missing { color: red; }"
+
+
+def _esc(value):
+    """Escape a recipe field for rich text, formatted the way an f-string would format it"""
+    return html.escape(str(value))
+
+# Comments and whitespace runs in the stylesheet template; Qt's parser doesn't need them
+_QSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_QSS_WHITESPACE = re.compile(r'\s+')
+
+
+def _minify_qss(stylesheet):
+    """Strip comments and collapse whitespace in a Qt stylesheet"""
+    return _QSS_WHITESPACE.sub(' ', _QSS_COMMENT.sub('', stylesheet)).strip()
+
+
+# Application stylesheet with str.format fields for the theme colors ({{ }} are
+# literal braces). Minified once at import; MainWindow._build_stylesheet fills it
+# in. Styles shared by several widgets select on their "class" property;
+# #objectName selectors are kept for one-off widgets.
+_STYLESHEET_TEMPLATE = _minify_qss("""
+    /* Main Window */
+    QMainWindow {{
+        background-color: {background};
+        color: {text};
+        font-family: "Segoe UI", sans-serif;
+    }}
+    
+    /* Sidebar */
+    #sidebar {{
+        background: transparent;
+        border-right: 1px solid {border};
+    }}
+    
+    #sidebarHeader {{
+        background: transparent;
+        border-bottom: 1px solid rgba(255, 255, 255, 0.1);
+    }}
+    
+    #appIcon {{
+        color: {primary_light};
+    }}
+    
+    #appTitle {{
+        color: {sidebar_text};
+        font-weight: bold;
+        letter-spacing: -0.5px;
+    }}
+    
+    #subtitleIcon {{
+        color: {accent};
+    }}
+    
+    #appSubtitle {{
+        color: rgba(255, 255, 255, 0.8);
+        font-weight: 400;
+    }}
+    
+    #versionBadge {{
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 {accent}, stop:1 {primary_light});
+        color: white;
+        border-radius: 9px;
+        font-weight: bold;
+        padding: 2px 6px;
+    }}
+    
+    /* Sidebar Buttons */
+    QPushButton[class="sidebarButton"] {{
+        background: transparent;
+        color: {sidebar_text};
+        border: none;
+        text-align: left;
+        padding-left: 20px;
+        font-size: 14px;
+        font-weight: 500;
+    }}
+    
+    QPushButton[class="sidebarButton"]:hover {{
+        background: rgba(255, 255, 255, 0.1);
+    }}
+    
+    QPushButton[class="sidebarButton"]:checked {{
+        background: rgba(255, 255, 255, 0.2);
+        border-left: 4px solid {primary};
+    }}
+    
+    /* Content Area */
+    #contentStack {{
+        background-color: {background};
+    }}
+    
+    *[class="contentPage"] {{
+        background-color: {background};
+    }}
+    
+    /* Modern Cards */
+    #modernCard {{
+        background-color: {surface};
+        border: 1px solid {border};
+        border-radius: 12px;
+        margin: 2px;
+    }}
+    
+    /* Enhanced Page Headers */
+    *[class="pageHeader"] {{
+        background: transparent;
+        margin-bottom: 10px;
+    }}
+    
+    *[class="pageTitle"] {{
+        color: {text};
+        font-weight: 800;
+    }}
+    
+    *[class="pageSubtitle"] {{
+        color: {text_light};
+        font-weight: 400;
+        margin-top: 5px;
+    }}
+    
+    *[class="pageIcon"] {{
+        color: {primary};
+    }}
+    
+    *[class="headerLine"] {{
+        background-color: {border};
+        border: none;
+        height: 2px;
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 {primary}, 
+            stop:0.5 {accent}, 
+            stop:1 {secondary});
+        border-radius: 1px;
+        margin: 10px 0;
+    }}
+    
+    /* Card Headers */
+    *[class="cardHeader"] {{
+        color: {text};
+        margin-bottom: 15px;
+    }}
+    
+    /* Modern Inputs */
+    *[class="modernInput"] {{
+        background-color: {surface};
+        border: 2px solid {border};
+        border-radius: 8px;
+        padding: 12px;
+        font-size: 14px;
+        color: {text};
+    }}
+    
+    *[class="modernInput"]:focus {{
+        border-color: {primary};
+        outline: none;
+    }}
+    
+    #modernCombo {{
+        background-color: {surface};
+        border: 2px solid {border};
+        border-radius: 8px;
+        padding: 8px 12px;
+        font-size: 14px;
+        color: {text};
+        min-height: 20px;
+    }}
+    
+    #modernCombo:focus {{
+        border-color: {primary};
+    }}
+    
+    #modernCombo::drop-down {{
+        border: none;
+        width: 30px;
+    }}
+    
+    #modernCombo::down-arrow {{
+        image: none;
+        border: 2px solid {text_light};
+        border-top: none;
+        border-right: none;
+        width: 6px;
+        height: 6px;
+        margin-right: 8px;
+        transform: rotate(-45deg);
+    }}
+    
+    /* Modern Lists */
+    *[class="modernList"] {{
+        background-color: {surface};
+        border: 1px solid {border};
+        border-radius: 8px;
+        padding: 5px;
+        font-size: 14px;
+        color: {text};
+    }}
+    
+    *[class="modernList"]::item {{
+        padding: 12px;
+        border-radius: 6px;
+        margin: 2px;
+    }}
+    
+    *[class="modernList"]::item:selected {{
+        background-color: {primary};
+        color: white;
+    }}
+    
+    *[class="modernList"]::item:hover {{
+        background-color: {border};
+    }}
+    
+    /* Modern Text Edit */
+    *[class="modernTextEdit"] {{
+        background-color: {surface};
+        border: 1px solid {border};
+        border-radius: 8px;
+        padding: 12px;
+        font-size: 14px;
+        color: {text};
+    }}
+    
+    /* Enhanced Modern Buttons */
+    QPushButton {{
+        background-color: {surface_elevated};
+        color: {text};
+        border: 1px solid {border};
+        border-radius: 10px;
+        padding: 12px 24px;
+        font-size: 14px;
+        font-weight: 500;
+        min-height: 16px;
+    }}
+    
+    QPushButton:hover {{
+        background-color: {border_light};
+        border-color: {primary};
+    }}
+    
+    QPushButton:pressed {{
+        background-color: {primary};
+        color: white;
+    }}
+    
+    QPushButton[class="primaryButton"] {{
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 {primary}, stop:1 {primary_dark});
+        color: white;
+        font-weight: 600;
+        border: none;
+    }}
+    
+    QPushButton[class="primaryButton"]:hover {{
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 {primary_light}, stop:1 {primary});
+    }}
+    
+    QPushButton[class="primaryButton"]:pressed {{
+        background: {primary_dark};
+    }}
+    
+    QPushButton[class="successButton"] {{
+        background-color: {success};
+        color: white;
+    }}
+    
+    QPushButton[class="successButton"]:hover {{
+        background-color: {success};
+    }}
+    
+    QPushButton[class="warningButton"] {{
+        background-color: {warning};
+        color: white;
+    }}
+    
+    QPushButton[class="warningButton"]:hover {{
+        background-color: {warning};
+    }}
+    
+    QPushButton[class="errorButton"] {{
+        background-color: {error};
+        color: white;
+    }}
+    
+    QPushButton[class="errorButton"]:hover {{
+        background-color: {error};
+    }}
+    
+    #secondaryButton {{
+        background-color: transparent;
+        border: 2px solid {primary};
+        color: {primary};
+    }}
+    
+    #secondaryButton:hover {{
+        background-color: {primary};
+        color: white;
+    }}
+    
+    /* Settings Buttons */
+    #themeButton, #settingsButton {{
+        background-color: rgba(255, 255, 255, 0.1);
+        color: {sidebar_text};
+        border: 1px solid rgba(255, 255, 255, 0.2);
+    }}
+    
+    #themeButton:hover, #settingsButton:hover {{
+        background-color: rgba(255, 255, 255, 0.2);
+    }}
+    
+    #settingsLabel {{
+        color: rgba(255, 255, 255, 0.8);
+        font-size: 12px;
+        margin-bottom: 5px;
+    }}
+    
+    #settingsCombo {{
+        background-color: rgba(255, 255, 255, 0.1);
+        color: {sidebar_text};
+        border: 1px solid rgba(255, 255, 255, 0.2);
+        border-radius: 6px;
+    }}
+    
+    /* Chat Interface */
+    #chatHeader {{
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 {primary}, stop:1 {primary_dark});
+        border-top-left-radius: 12px;
+        border-top-right-radius: 12px;
+    }}
+    
+    #chatTitle {{
+        color: white;
+    }}
+    
+    #statusOnline {{
+        color: {success};
+        font-weight: bold;
+    }}
+    
+    #chatScroll {{
+        background-color: {surface};
+        border: none;
+    }}
+    
+    #chatInput {{
+        background-color: {background};
+        border-top: 1px solid {border};
+    }}
+    
+    #messageInput {{
+        background-color: {surface};
+        border: 2px solid {border};
+        border-radius: 20px;
+        padding: 15px 20px;
+        font-size: 14px;
+        color: {text};
+    }}
+    
+    #messageInput:focus {{
+        border-color: {primary};
+    }}
+    
+    /* Recipe Details */
+    #recipeTitle {{
+        color: {text};
+    }}
+    
+    #recipeInfo {{
+        color: {text_light};
+        margin: 10px 0;
+    }}
+    
+    *[class="sectionFrame"] {{
+        background-color: {background};
+        border: 1px solid {border};
+        border-radius: 8px;
+        margin: 10px 0;
+        padding: 10px;
+    }}
+    
+    *[class="sectionTitle"] {{
+        color: {text};
+    }}
+    
+    *[class="sectionContent"] {{
+        color: {text_light};
+    }}
+    
+    /* Cooking Guide */
+    #cookingTitle {{
+        color: {text};
+        margin: 20px 0;
+    }}
+    
+    #stepDetails {{
+        color: {text};
+        background-color: {background};
+        border: 1px solid {border};
+        border-radius: 8px;
+        padding: 15px;
+        margin: 10px 0;
+    }}
+    
+    #assistantFrame {{
+        background-color: {background};
+        border: 2px solid {primary};
+        border-radius: 12px;
+        margin-top: 20px;
+    }}
+    
+    #assistantHeader {{
+        color: {primary};
+    }}
+    
+    /* Progress Bars */
+    *[class="modernProgress"] {{
+        background-color: {border};
+        border: none;
+        border-radius: 10px;
+        height: 20px;
+    }}
+    
+    *[class="modernProgress"]::chunk {{
+        background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+            stop:0 {primary}, stop:1 {primary_dark});
+        border-radius: 10px;
+    }}
+    
+    /* Scrollbars */
+    QScrollBar:vertical {{
+        background-color: {background};
+        width: 8px;
+        border-radius: 4px;
+    }}
+    
+    QScrollBar::handle:vertical {{
+        background-color: {text_light};
+        border-radius: 4px;
+        min-height: 20px;
+    }}
+    
+    QScrollBar::handle:vertical:hover {{
+        background-color: {primary};
+    }}
+    
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
+        height: 0px;
+    }}
+    
+    /* Status Bar */
+    #modernStatusBar {{
+        background-color: {surface};
+        color: {text_light};
+        border-top: 1px solid {border};
+        padding: 5px;
+    }}
+    
+    /* Scroll Areas */
+    #detailsScroll {{
+        background-color: transparent;
+        border: none;
+    }}
+""")
+
+
+@functools.lru_cache(maxsize=None)
+def _font(size, bold=False):
+    """Shared app font at the given point size
+    
+    QFont is implicitly shared, so widgets can all be handed the same instance;
+    built lazily because fonts need the QApplication to exist.
+    """
+    return QFont("Segoe UI", size, QFont.Bold if bold else QFont.Normal)
+
+
+# Markdown patterns used by markdown_to_html, compiled once rather than on every message
+# Emphasis matches either marker in one scan; the backreference makes the closing marker match the opening one
+_MD_BOLD = re.compile(r'(\*\*|__)(.+?)\1')
+_MD_ITALIC = re.compile(r'([*_])(.+?)\1')
+_MD_INLINE_CODE = re.compile(r'`(.+?)`')
+_MD_ULINE = re.compile(r'^[-*+]\s+(.+)')
+_MD_OLINE = re.compile(r'^\d+\.\s+(.+)')
+
+# Header prefixes checked longest first, with the tag each one opens
+_MD_HEADERS = (
+    ('### ', '<h3 style="color: #667eea; margin: 15px 0 10px 0;">', '</h3>'),
+    ('## ', '<h2 style="color: #667eea; margin: 20px 0 15px 0;">', '</h2>'),
+    ('# ', '<h1 style="color: #667eea; margin: 25px 0 20px 0;">', '</h1>'),
+)
+_MD_CODE_OPEN = '<pre style="background-color: #f7fafc; border: 1px solid #e2e8f0; border-radius: 6px; padding: 12px; margin: 10px 0; overflow-x: auto;"><code>'
+_MD_CODE_CLOSE = '</code></pre>'
+_MD_UL = ('<ul style="margin: 10px 0; padding-left: 20px;">', '</ul>')
+_MD_OL = ('<ol style="margin: 10px 0; padding-left: 20px;">', '</ol>')
+
+
+def _md_inline(text):
+    """Apply bold, italic and inline code formatting to a single line"""
+    # Lines without any markers, the common case, skip the regexes entirely
+    if '*' in text or '_' in text:
+        text = _MD_BOLD.sub(r'<strong style="color: #2d3748;">\2</strong>', text)
+        text = _MD_ITALIC.sub(r'<em style="color: #4a5568;">\2</em>', text)
+    if '`' in text:
+        text = _MD_INLINE_CODE.sub(r'<code style="background-color: #f7fafc; border: 1px solid #e2e8f0; border-radius: 3px; padding: 2px 4px; font-family: monospace;">\1</code>', text)
+    return text
+
 
+@functools.lru_cache(maxsize=512)
 def markdown_to_html(text):
-    """Convert basic Markdown formatting to HTML"""
-    import re
+    """Convert basic Markdown formatting to HTML
     
+    Results are cached by message text, so re-rendering a message is a dict lookup.
+    Text that is still changing (a streaming response) should go through
+    markdown_to_html.__wrapped__ so partial prefixes don't crowd out the cache.
+    """
     # Convert text to string if it's not already
     if not isinstance(text, str):
         text = str(text)
     
-    # Escape HTML characters first
-    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-    
-    # Convert headers (### -> <h3>, ## -> <h2>, # -> <h1>)
-    text = re.sub(r'^### (.+)$', r'<h3 style="color: #667eea; margin: 15px 0 10px 0;">\1</h3>', text, flags=re.MULTILINE)
-    text = re.sub(r'^## (.+)$', r'<h2 style="color: #667eea; margin: 20px 0 15px 0;">\1</h2>', text, flags=re.MULTILINE)
-    text = re.sub(r'^# (.+)$', r'<h1 style="color: #667eea; margin: 25px 0 20px 0;">\1</h1>', text, flags=re.MULTILINE)
-    
-    # Convert bold text (**text** or __text__)
-    text = re.sub(r'\*\*(.+?)\*\*', r'<strong style="color: #2d3748;">\1</strong>', text)
-    text = re.sub(r'__(.+?)__', r'<strong style="color: #2d3748;">\1</strong>', text)
-    
-    # Convert italic text (*text* or _text_)
-    text = re.sub(r'\*(.+?)\*', r'<em style="color: #4a5568;">\1</em>', text)
-    text = re.sub(r'_(.+?)_', r'<em style="color: #4a5568;">\1</em>', text)
-    
-    # Convert code blocks (```code```)
-    text = re.sub(r'```([\s\S]*?)```', r'<pre style="background-color: #f7fafc; border: 1px solid #e2e8f0; border-radius: 6px; padding: 12px; margin: 10px 0; overflow-x: auto;"><code>\1</code></pre>', text)
-    
-    # Convert inline code (`code`)
-    text = re.sub(r'`(.+?)`', r'<code style="background-color: #f7fafc; border: 1px solid #e2e8f0; border-radius: 3px; padding: 2px 4px; font-family: monospace;">\1</code>', text)
-    
-    # Convert unordered lists (- item or * item)
-    lines = text.split('\n')
-    in_list = False
-    result_lines = []
-    
-    for line in lines:
-        if re.match(r'^[-*+]\s+(.+)', line):
-            if not in_list:
-                result_lines.append('<ul style="margin: 10px 0; padding-left: 20px;">')
-                in_list = True
-            item = re.sub(r'^[-*+]\s+(.+)', r'<li style="margin: 5px 0;">\1</li>', line)
-            result_lines.append(item)
+    # Escape HTML characters first. str.translate with a table was measured and is
+    # slower here: multi-character replacements take its per-character slow path.
+    text = html.escape(text, quote=False)
+    
+    # Walk the lines once, emitting one HTML fragment per line (plus list tags);
+    # the fragments are joined with <br> at the end
+    parts = []
+    in_code = False
+    open_list = None  # (open tag, close tag) of the list being built
+    
+    for line in text.split('\n'):
+        # Code blocks (```code```): contents are kept verbatim, fences may share a line with text
+        if in_code or '```' in line:
+            if open_list:
+                parts.append(open_list[1])
+                open_list = None
+            pieces = line.split('```')
+            fragment = [pieces[0] if in_code else _md_inline(pieces[0])]
+            for piece in pieces[1:]:
+                fragment.append(_MD_CODE_CLOSE if in_code else _MD_CODE_OPEN)
+                in_code = not in_code
+                fragment.append(piece if in_code else _md_inline(piece))
+            parts.append(''.join(fragment))
+            continue
+        
+        # Headers (### -> <h3>, ## -> <h2>, # -> <h1>)
+        if line[:1] == '#':
+            for prefix, open_tag, close_tag in _MD_HEADERS:
+                if line.startswith(prefix) and len(line) > len(prefix):
+                    line = open_tag + line[len(prefix):] + close_tag
+                    break
+        
+        line = _md_inline(line)
+        
+        # Unordered (- item or * item) and ordered (1. item) lists
+        match = None
+        if line[:1] in ('-', '*', '+'):
+            match = _MD_ULINE.match(line)
+            tags = _MD_UL
+        elif line[:1].isdigit():
+            match = _MD_OLINE.match(line)
+            tags = _MD_OL
+        
+        if match:
+            if open_list is not tags:
+                if open_list:
+                    parts.append(open_list[1])
+                parts.append(tags[0])
+                open_list = tags
+            parts.append(f'<li style="margin: 5px 0;">{match.group(1)}</li>')
         else:
-            if in_list:
-                result_lines.append('</ul>')
-                in_list = False
-            result_lines.append(line)
-    
-    if in_list:
-        result_lines.append('</ul>')
-    
-    text = '\n'.join(result_lines)
-    
-    # Convert ordered lists (1. item)
-    lines = text.split('\n')
-    in_ordered_list = False
-    result_lines = []
-    
-    for line in lines:
-        if re.match(r'^\d+\.\s+(.+)', line):
-            if not in_ordered_list:
-                result_lines.append('<ol style="margin: 10px 0; padding-left: 20px;">')
-                in_ordered_list = True
-            item = re.sub(r'^\d+\.\s+(.+)', r'<li style="margin: 5px 0;">\1</li>', line)
-            result_lines.append(item)
-        else:
-            if in_ordered_list:
-                result_lines.append('</ol>')
-                in_ordered_list = False
-            result_lines.append(line)
-    
-    if in_ordered_list:
-        result_lines.append('</ol>')
+            if open_list:
+                parts.append(open_list[1])
+                open_list = None
+            parts.append(line)
     
-    text = '\n'.join(result_lines)
+    # An unclosed fence (e.g. a response still streaming in) runs to the end of the text
+    if in_code:
+        parts[-1] += _MD_CODE_CLOSE
+    if open_list:
+        parts.append(open_list[1])
     
     # Convert line breaks
-    text = text.replace('\n', '<br>')
-    
-    return text
+    return '<br>'.join(parts)
 
 
 class ModernButton(QPushButton):
     """Custom styled button with hover effects"""
     def __init__(self, text="", icon_text="", parent=None):
-        super().__init__(text, parent)
+        # The icon glyph is part of the label, so Qt's own text rendering draws it
+        super().__init__(f"{icon_text}  {text}" if icon_text else text, parent)
         self.icon_text = icon_text
         self.setMinimumHeight(40)
-        
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        if self.icon_text:
-            painter = QPainter(self)
-            painter.setFont(QFont("Segoe UI Symbol", 12))
-            painter.setPen(self.palette().color(QPalette.ButtonText))
-            painter.drawText(10, 25, self.icon_text)
 
 
 class SidebarButton(QPushButton):
     """Custom sidebar button"""
     def __init__(self, text, icon_text="", parent=None):
-        super().__init__(text, parent)
+        super().__init__(f"{icon_text}  {text}" if icon_text else text, parent)
         self.icon_text = icon_text
         self.setMinimumHeight(50)
         self.setCheckable(True)
-        self.setObjectName("sidebarButton")
-        
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        if self.icon_text:
-            painter = QPainter(self)
-            painter.setFont(QFont("Segoe UI Symbol", 16))
-            painter.setPen(self.palette().color(QPalette.ButtonText))
-            painter.drawText(20, 30, self.icon_text)
+        self.setProperty("class", "sidebarButton")
+
+
+class ChatMessage:
+    """One row of the chat: who sent it, its text, and the HTML shown for it (None for plain text)"""
+    __slots__ = ("kind", "text", "html")
+    
+    USER = "user"
+    ASSISTANT = "assistant"
+    
+    def __init__(self, kind, text, html=None):
+        self.kind = kind
+        self.text = text
+        self.html = html
 
 
-class ChatBubble(QFrame):
-    """Custom chat bubble widget with markdown support"""
-    def __init__(self, message, is_user=True, parent=None):
+class ChatModel(QAbstractListModel):
+    """Chat transcript for a QListView; Qt.UserRole returns the ChatMessage itself
+    
+    Only the latest MAX_MESSAGES are kept, so a long session doesn't grow without bound.
+    """
+    MAX_MESSAGES = 1000
+    
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.is_user = is_user
-        self.setMaximumWidth(650)
-        self.setup_ui(message)
-        
-    def setup_ui(self, message):
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(18, 12, 18, 12)
-        
-        # Message label with improved formatting
-        message_label = QLabel()
-        message_label.setWordWrap(True)
-        message_label.setTextFormat(Qt.RichText)
-        message_label.setFont(QFont("Segoe UI", 10))
-        
-        # Format message based on sender
-        if self.is_user:
-            # User messages - simple formatting
-            formatted_message = message.replace('\n', '<br>')
+        self._messages = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._messages)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self._messages[index.row()]
+        if role == Qt.DisplayRole:
+            return message.text
+        if role == Qt.UserRole:
+            return message
+        return None
+    
+    def append(self, message):
+        """Add a message at the end of the transcript, dropping the oldest one if full"""
+        if len(self._messages) >= self.MAX_MESSAGES:
+            self.beginRemoveRows(QModelIndex(), 0, 0)
+            del self._messages[0]
+            self.endRemoveRows()
+        
+        row = len(self._messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._messages.append(message)
+        self.endInsertRows()
+    
+    def message_changed(self, message):
+        """Tell the view a message's text or HTML was replaced"""
+        row = self._row_of(message)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+    
+    def _row_of(self, message):
+        # Messages that change (streamed responses) are at or near the end, so search backwards
+        for row in range(len(self._messages) - 1, -1, -1):
+            if self._messages[row] is message:
+                return row
+        return -1
+
+
+CHAT_WIDTH_BUCKET = 32  # chat text is wrapped at multiples of this many pixels
+
+
+@functools.lru_cache(maxsize=1024)
+def _chat_document(text, html_text, text_width):
+    """Laid-out QTextDocument for one chat message at one wrap width
+    
+    Keyed by content rather than message, so edited messages simply miss;
+    callers round text_width down to CHAT_WIDTH_BUCKET so that resizing the
+    window reuses layouts instead of re-shaping the text every few pixels.
+    """
+    document = QTextDocument()
+    document.setDocumentMargin(0)
+    document.setDefaultFont(_font(10))
+    if html_text is not None:
+        document.setHtml(html_text)
+    else:
+        document.setPlainText(text)
+    document.setTextWidth(text_width)
+    # Lay out now so sizeHint and paint only read the result
+    document.size()
+    return document
+
+
+class ChatBubbleDelegate(QStyledItemDelegate):
+    """Paints chat messages as bubbles, with no widget per message
+    
+    Text is laid out with a QTextDocument (rich text for assistant HTML, plain
+    text for user messages), shared between sizeHint and paint through
+    _chat_document.
+    """
+    MAX_WIDTH = 650            # widest bubble
+    PADDING_X, PADDING_Y = 18, 12
+    VIEW_MARGIN = 20           # gap between bubbles and the view edges
+    SIDE_MARGIN = 50           # space kept free on the other speaker's side
+    SPACING = 15               # vertical gap between bubbles
+    RADIUS, TAIL_RADIUS = 20, 5
+    
+    def __init__(self, view):
+        super().__init__(view)
+        self._view = view
+        self._colors = {}
+    
+    def set_colors(self, colors):
+        """Use a theme's colors for the bubbles"""
+        self._colors = colors
+    
+    def message_changed(self, top_left, bottom_right):
+        """Have the view re-lay out rows whose text changed"""
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self.sizeHintChanged.emit(top_left.sibling(row, 0))
+    
+    def _document(self, message, view_width):
+        available = view_width - 2 * self.VIEW_MARGIN - self.SIDE_MARGIN
+        text_width = max(min(self.MAX_WIDTH, available) - 2 * self.PADDING_X, 40)
+        text_width -= text_width % CHAT_WIDTH_BUCKET
+        return _chat_document(message.text, message.html, text_width)
+    
+    def sizeHint(self, option, index):
+        view_width = self._view.viewport().width()
+        document = self._document(index.data(Qt.UserRole), view_width)
+        height = math.ceil(document.size().height()) + 2 * self.PADDING_Y + self.SPACING
+        return QSize(view_width, height)
+    
+    def paint(self, painter, option, index):
+        message = index.data(Qt.UserRole)
+        colors = self._colors
+        rect = option.rect
+        document = self._document(message, rect.width())
+        
+        width = min(math.ceil(document.idealWidth()), math.ceil(document.textWidth())) + 2 * self.PADDING_X
+        height = math.ceil(document.size().height()) + 2 * self.PADDING_Y
+        is_user = message.kind == ChatMessage.USER
+        x = rect.right() - self.VIEW_MARGIN - width if is_user else rect.left() + self.VIEW_MARGIN
+        bubble = QRectF(x, rect.top() + self.SPACING / 2, width, height)
+        
+        # Rounded bubble with a tighter corner pointing at the speaker's side
+        path = QPainterPath()
+        path.addRoundedRect(bubble, self.RADIUS, self.RADIUS)
+        tail = QRectF(0, 0, 2 * self.RADIUS, 2 * self.RADIUS)
+        tail.moveBottomRight(bubble.bottomRight()) if is_user else tail.moveBottomLeft(bubble.bottomLeft())
+        tail_path = QPainterPath()
+        tail_path.addRoundedRect(tail, self.TAIL_RADIUS, self.TAIL_RADIUS)
+        path = path.united(tail_path)
+        
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if is_user:
+            gradient = QLinearGradient(bubble.topLeft(), bubble.topRight())
+            gradient.setColorAt(0, QColor(colors.get('chat_user', '#4f46e5')))
+            gradient.setColorAt(1, QColor(colors.get('primary_dark', '#4338ca')))
+            painter.setBrush(gradient)
+            painter.setPen(QPen(QColor(0, 0, 0, 30), 1))
+            text_color = QColor("white")
         else:
-            # AI messages - convert markdown to HTML
-            formatted_message = markdown_to_html(message)
-        
-        message_label.setText(formatted_message)
-        
-        layout.addWidget(message_label)
-        
-        # Styling
-        if self.is_user:
-            self.setObjectName("userBubble")
-            layout.setAlignment(Qt.AlignRight)
+            painter.setBrush(QColor(colors.get('chat_assistant', '#f1f5f9')))
+            painter.setPen(QPen(QColor(colors.get('border', '#e2e8f0')), 1))
+            text_color = QColor(colors.get('text', '#1e293b'))
+        painter.drawPath(path)
+        
+        painter.translate(bubble.left() + self.PADDING_X, bubble.top() + self.PADDING_Y)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.Text, text_color)
+        document.documentLayout().draw(painter, context)
+        painter.restore()
+
+
+class MarkdownRenderWorker(QRunnable):
+    """Runs markdown_to_html on a pool thread and hands the HTML back to the main thread"""
+    
+    class Signals(QObject):
+        finished = pyqtSignal(str, str)  # message, html
+    
+    def __init__(self, message, parent=None):
+        super().__init__()
+        self.message = str(message)
+        # Created on the main thread, so emits from the worker are queued back to it;
+        # the parent keeps it alive until the result has been delivered
+        self.signals = self.Signals(parent)
+    
+    def run(self):
+        self.signals.finished.emit(self.message, markdown_to_html(self.message))
+
+
+class BackendWorker(QRunnable):
+    """Runs a database or file call on a pool thread and hands its result back to the main thread"""
+    
+    class Signals(QObject):
+        finished = pyqtSignal(object)  # the call's return value
+        failed = pyqtSignal(str)
+    
+    def __init__(self, fn, *args, parent=None):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        # Created on the main thread, so emits from the worker are queued back to it;
+        # the parent keeps it alive until the result has been delivered
+        self.signals = self.Signals(parent)
+    
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
         else:
-            self.setObjectName("assistantBubble")
-            layout.setAlignment(Qt.AlignLeft)
-        
-        # Add shadow effect
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(10)
-        shadow.setColor(QColor(0, 0, 0, 30))
-        shadow.setOffset(0, 2)
-        self.setGraphicsEffect(shadow)
+            self.signals.finished.emit(result)
+
+
+@functools.lru_cache(maxsize=128)
+def _answer_step_question(question, recipe_name, current_step, model_type):
+    """Ask the assistant about one cooking step; repeated questions are answered from memory"""
+    result = get_cooking_assistance(question, {"name": recipe_name, "current_step": current_step}, None, model_type)
+    if result.get("error"):
+        # Raising keeps failed requests out of the cache
+        raise RuntimeError(result["error"])
+    return result.get("response", "No response received.")
+
+
+def _load_favorite_ids():
+    """Ids of the favorite recipes, as a set"""
+    return {recipe["id"] for recipe in list_recipes(favorites_only=True)}
+
+
+def _write_grocery_list(file_path, grocery_items):
+    """Write the grocery list as a plain-text checklist"""
+    lines = ["DishDazzle Grocery List\n", "======================\n\n"]
+    for item in grocery_items:
+        status = "[x]" if item.get("checked", False) else "[ ]"
+        amount = f" - {item['amount']}" if item["amount"] else ""
+        lines.append(f"{status} {item['name']}{amount}\n")
+    
+    # One buffered writelines call; UTF-8 so ingredient names survive on any platform
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
 
 
 class ModernCard(QFrame):
@@ -210,22 +909,169 @@ class ModernCard(QFrame):
         self.setGraphicsEffect(shadow)
 
 
+@functools.lru_cache(maxsize=4)
+def _gradient_pixmap(width, height, start, stop):
+    """Top-left to bottom-right gradient baked into a pixmap, so painting it is a blit
+    
+    One entry per theme for the main window and the sidebar; resizing replaces them.
+    """
+    pixmap = QPixmap(max(width, 1), max(height, 1))
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, QColor(start))
+    gradient.setColorAt(1, QColor(stop))
+    painter = QPainter(pixmap)
+    painter.fillRect(pixmap.rect(), gradient)
+    painter.end()
+    return pixmap
+
+
+class GradientFrame(QFrame):
+    """QFrame with a diagonal gradient background drawn from a cached pixmap"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._gradient = None
+    
+    def set_gradient(self, start, stop):
+        """Use a gradient between two colors; the stylesheet still draws borders"""
+        self._gradient = (start, stop)
+        self.update()
+    
+    def paintEvent(self, event):
+        if self._gradient:
+            painter = QPainter(self)
+            painter.drawPixmap(0, 0, _gradient_pixmap(self.width(), self.height(), *self._gradient))
+            painter.end()
+        super().paintEvent(event)
+
+
+class RecipeListModel(QAbstractListModel):
+    """Recipe summaries for a QListView: the name is displayed, the id is stored under Qt.UserRole
+    
+    The view only asks for the rows it paints, so no per-recipe item objects are created.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._recipes = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._recipes)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._recipes[index.row()]["name"]
+        if role == Qt.UserRole:
+            return self._recipes[index.row()]["id"]
+        return None
+    
+    def set_recipes(self, recipes):
+        """Replace the listed recipes with one model reset"""
+        self.beginResetModel()
+        self._recipes = list(recipes)
+        self.endResetModel()
+
+
+class ItemListModel(QAbstractListModel):
+    """Pantry or grocery items ({"name", "amount", "checked"} dicts) for a QListView
+    
+    Rows display as "[x] name - amount"; Qt.UserRole holds the item name.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self._items[index.row()]
+        if role == Qt.DisplayRole:
+            display_text = "[x] " if item.get("checked", False) else ""
+            display_text += item["name"]
+            if item.get("amount"):
+                display_text += f" - {item['amount']}"
+            return display_text
+        if role == Qt.UserRole:
+            return item["name"]
+        return None
+    
+    def set_items(self, items):
+        """Replace the listed items with one model reset"""
+        self.beginResetModel()
+        self._items = list(items)
+        self.endResetModel()
+
+
 class MainWindow(QMainWindow):
     """Modern main application window"""
     
     # Custom signals for thread-safe API responses
     assistant_response_signal = pyqtSignal(object)
+    assistant_response_chunk_signal = pyqtSignal(str)
     recipe_suggestions_signal = pyqtSignal(object)
     
+    # Status bar names of the content_stack pages, by index
+    PAGE_NAMES = ("Recipe Library", "Smart Suggestions", "AI Assistant", "Grocery & Pantry", "Cooking Guide")
+    
+    # Pause in typing before the recipe search runs
+    SEARCH_DEBOUNCE_MS = 200
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__()
         
         self.config = config
         self.api_initialized = False
+        self.api_model_type = None  # model type the API was last initialized for
         self.current_recipe = None
+        self.cooking_recipe = None  # recipe loaded on the cooking page
         self.current_model_type = "deepseek"
         self.current_page = 0
         
+        # ChatMessage receiving a streamed assistant response, and its text so far
+        self.streaming_bubble = None
+        self.streaming_text = ""
+        
+        # Set while a scroll_to_bottom is queued
+        self._scroll_pending = False
+        
+        # Built stylesheets keyed by theme name, filled in by apply_theme,
+        # and the theme whose stylesheet is currently set
+        self._stylesheets = {}
+        self._applied_theme = None
+        
+        # (start, stop) colors of the window background, set by apply_theme
+        self._window_gradient = None
+        
+        # Colors of the applied theme, for widgets built after apply_theme
+        self._theme_colors = {}
+        
+        # Set by load_initial_data; pages built after that load their own data
+        self._data_loaded = False
+        
+        # Favorite recipe ids, loaded by favorite_ids on first use
+        self._favorite_ids = None
+        
+        # Bumped by each fill_recipe_list call, so stale results can be dropped
+        self._recipe_list_request = 0
+        
+        # Likewise for ask_step_question, so only the latest answer is shown
+        self._step_question_request = 0
+        
+        # Summary rows from the last load_recipes, restored when a search is cleared
+        self._all_recipe_rows = None
+        
+        # Recipe id -> cooking_recipe_combo index, refreshed by load_cooking_recipes
+        self.cooking_index_by_id = {}
+        
+        # Built by build_preferences_dialog the first time preferences are opened
+        self.prefs_dialog = None
+        
+        # Built by build_add_recipe_dialog the first time Add Recipe is clicked
+        self.add_recipe_dialog = None
+        
         # Enhanced color schemes
         self.light_colors = {
             'primary': '#4f46e5',
@@ -286,13 +1132,14 @@ class MainWindow(QMainWindow):
         
         # Connect signals for thread-safe API responses
         self.assistant_response_signal.connect(self.handle_assistant_response)
+        self.assistant_response_chunk_signal.connect(self.handle_assistant_response_chunk)
         self.recipe_suggestions_signal.connect(self.handle_recipe_suggestions)
         
         # Initialize API and complete setup
         self.initialize_api()
         
-        # Load recipes for cooking page after UI is initialized
-        QTimer.singleShot(100, self.load_cooking_recipes)
+        # Recipes, pantry and grocery data are loaded by load_initial_data once the database is ready
+        self.status_bar.showMessage("Preparing recipe library...")
     
     def init_ui(self):
         """Initialize the modern user interface"""
@@ -335,7 +1182,7 @@ class MainWindow(QMainWindow):
     
     def create_sidebar(self):
         """Create the modern sidebar navigation"""
-        self.sidebar = QFrame()
+        self.sidebar = GradientFrame()
         self.sidebar.setMinimumWidth(220)
         self.sidebar.setMaximumWidth(280)
         self.sidebar.setObjectName("sidebar")
@@ -360,14 +1207,14 @@ class MainWindow(QMainWindow):
         
         # App icon using text symbol
         app_icon = QLabel("◆")
-        app_icon.setFont(QFont("Segoe UI", 28, QFont.Bold))
+        app_icon.setFont(_font(28, bold=True))
         app_icon.setFixedWidth(40)
         app_icon.setAlignment(Qt.AlignCenter)
         app_icon.setObjectName("appIcon")
         
         # App title
         app_title = QLabel("DishDazzle")
-        app_title.setFont(QFont("Segoe UI", 20, QFont.Bold))
+        app_title.setFont(_font(20, bold=True))
         app_title.setObjectName("appTitle")
         app_title.setWordWrap(False)
         
@@ -381,11 +1228,11 @@ class MainWindow(QMainWindow):
         subtitle_layout.setSpacing(8)
         
         subtitle_icon = QLabel("★")
-        subtitle_icon.setFont(QFont("Segoe UI", 12))
+        subtitle_icon.setFont(_font(12))
         subtitle_icon.setObjectName("subtitleIcon")
         
         app_subtitle = QLabel("Your AI Cooking Companion")
-        app_subtitle.setFont(QFont("Segoe UI", 11))
+        app_subtitle.setFont(_font(11))
         app_subtitle.setObjectName("appSubtitle")
         
         subtitle_layout.addWidget(subtitle_icon)
@@ -394,7 +1241,7 @@ class MainWindow(QMainWindow):
         
         # Version badge
         version_badge = QLabel("v2.0")
-        version_badge.setFont(QFont("Segoe UI", 9, QFont.Bold))
+        version_badge.setFont(_font(9, bold=True))
         version_badge.setObjectName("versionBadge")
         version_badge.setFixedSize(40, 20)
         version_badge.setAlignment(Qt.AlignCenter)
@@ -486,19 +1333,48 @@ class MainWindow(QMainWindow):
         self.content_stack = QStackedWidget()
         self.content_stack.setObjectName("contentStack")
         
-        # Create all pages
-        self.create_recipe_page()
-        self.create_suggestion_page()
-        self.create_assistant_page()
-        self.create_grocery_page()
-        self.create_cooking_page()
+        # The recipe library is the start page; the others are built on first visit
+        self.content_stack.addWidget(self.create_recipe_page())
+        self._page_builders = {
+            1: self.create_suggestion_page,
+            2: self.create_assistant_page,
+            3: self.create_grocery_page,
+            4: self.create_cooking_page,
+        }
+        for _ in self._page_builders:
+            self.content_stack.addWidget(QWidget())
+        
+        # Data each lazily built page needs once the database is ready
+        self._page_loaders = {
+            3: (self.load_pantry, self.load_grocery_list),
+            4: (self.load_cooking_recipes,),
+        }
         
         self.main_layout.addWidget(self.content_stack)
     
+    def _page_built(self, page_index):
+        """Whether a page's widgets exist yet"""
+        return page_index not in self._page_builders
+    
+    def _build_page(self, page_index):
+        """Build a page on its first visit, replacing its placeholder in the stack"""
+        builder = self._page_builders.pop(page_index, None)
+        if builder is None:
+            return
+        
+        placeholder = self.content_stack.widget(page_index)
+        self.content_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.content_stack.insertWidget(page_index, builder())
+        
+        if self._data_loaded:
+            for loader in self._page_loaders.get(page_index, ()):
+                loader()
+    
     def create_recipe_page(self):
         """Create the modern Recipe Library page"""
         page = QWidget()
-        page.setObjectName("contentPage")
+        page.setProperty("class", "contentPage")
         layout = QVBoxLayout(page)
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(20)
@@ -513,19 +1389,26 @@ class MainWindow(QMainWindow):
         search_layout.setContentsMargins(20, 20, 20, 20)
         
         search_header = QLabel("Search Recipes")
-        search_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        search_header.setObjectName("cardHeader")
+        search_header.setFont(_font(14, bold=True))
+        search_header.setProperty("class", "cardHeader")
         search_layout.addWidget(search_header)
         
         search_input_layout = QHBoxLayout()
         self.recipe_search_input = QLineEdit()
         self.recipe_search_input.setPlaceholderText("Search by name, ingredient, or cuisine...")
         self.recipe_search_input.returnPressed.connect(self.search_recipes)
-        self.recipe_search_input.setObjectName("modernInput")
+        self.recipe_search_input.setProperty("class", "modernInput")
+        
+        # Search as the user types, once typing pauses for SEARCH_DEBOUNCE_MS
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_recipes)
+        self.recipe_search_input.textChanged.connect(lambda _text: self.search_timer.start())
         
         search_button = ModernButton("▶ Search")
         search_button.clicked.connect(self.search_recipes)
-        search_button.setObjectName("primaryButton")
+        search_button.setProperty("class", "primaryButton")
         
         search_input_layout.addWidget(self.recipe_search_input)
         search_input_layout.addWidget(search_button)
@@ -536,11 +1419,11 @@ class MainWindow(QMainWindow):
         
         add_recipe_btn = ModernButton("+ Add Recipe")
         add_recipe_btn.clicked.connect(self.show_add_recipe_dialog)
-        add_recipe_btn.setObjectName("successButton")
+        add_recipe_btn.setProperty("class", "successButton")
         
         favorites_btn = ModernButton("♥ Favorites")
         favorites_btn.clicked.connect(self.show_favorites)
-        favorites_btn.setObjectName("warningButton")
+        favorites_btn.setProperty("class", "warningButton")
         
         actions_layout.addWidget(add_recipe_btn)
         actions_layout.addWidget(favorites_btn)
@@ -558,13 +1441,17 @@ class MainWindow(QMainWindow):
         list_layout.setContentsMargins(20, 20, 20, 20)
         
         list_header = QLabel("Your Recipes")
-        list_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        list_header.setObjectName("cardHeader")
+        list_header.setFont(_font(14, bold=True))
+        list_header.setProperty("class", "cardHeader")
         list_layout.addWidget(list_header)
         
-        self.recipe_list = QListWidget()
-        self.recipe_list.itemClicked.connect(self.show_recipe_details)
-        self.recipe_list.setObjectName("modernList")
+        self.recipe_list = QListView()
+        self.recipe_list_model = RecipeListModel(self.recipe_list)
+        self.recipe_list.setModel(self.recipe_list_model)
+        self.recipe_list.setUniformItemSizes(True)
+        self.recipe_list.setEditTriggers(QListView.NoEditTriggers)
+        self.recipe_list.clicked.connect(self.show_recipe_details)
+        self.recipe_list.setProperty("class", "modernList")
         list_layout.addWidget(self.recipe_list)
         
         content_splitter.addWidget(list_card)
@@ -576,7 +1463,7 @@ class MainWindow(QMainWindow):
         
         self.recipe_title = QLabel("Select a recipe to view details")
         self.recipe_title.setAlignment(Qt.AlignCenter)
-        self.recipe_title.setFont(QFont("Segoe UI", 18, QFont.Bold))
+        self.recipe_title.setFont(_font(18, bold=True))
         self.recipe_title.setObjectName("recipeTitle")
         details_layout.addWidget(self.recipe_title)
         
@@ -595,34 +1482,34 @@ class MainWindow(QMainWindow):
         
         # Ingredients section
         ingredients_frame = QFrame()
-        ingredients_frame.setObjectName("sectionFrame")
+        ingredients_frame.setProperty("class", "sectionFrame")
         ingredients_layout = QVBoxLayout(ingredients_frame)
         
         ingredients_title = QLabel("Ingredients")
-        ingredients_title.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        ingredients_title.setObjectName("sectionTitle")
+        ingredients_title.setFont(_font(14, bold=True))
+        ingredients_title.setProperty("class", "sectionTitle")
         ingredients_layout.addWidget(ingredients_title)
         
         self.recipe_ingredients = QLabel("")
         self.recipe_ingredients.setWordWrap(True)
-        self.recipe_ingredients.setObjectName("sectionContent")
+        self.recipe_ingredients.setProperty("class", "sectionContent")
         ingredients_layout.addWidget(self.recipe_ingredients)
         
         self.recipe_details_layout.addWidget(ingredients_frame)
         
         # Instructions section
         instructions_frame = QFrame()
-        instructions_frame.setObjectName("sectionFrame")
+        instructions_frame.setProperty("class", "sectionFrame")
         instructions_layout = QVBoxLayout(instructions_frame)
         
         instructions_title = QLabel("Instructions")
-        instructions_title.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        instructions_title.setObjectName("sectionTitle")
+        instructions_title.setFont(_font(14, bold=True))
+        instructions_title.setProperty("class", "sectionTitle")
         instructions_layout.addWidget(instructions_title)
         
         self.recipe_instructions = QLabel("")
         self.recipe_instructions.setWordWrap(True)
-        self.recipe_instructions.setObjectName("sectionContent")
+        self.recipe_instructions.setProperty("class", "sectionContent")
         instructions_layout.addWidget(self.recipe_instructions)
         
         self.recipe_details_layout.addWidget(instructions_frame)
@@ -632,15 +1519,15 @@ class MainWindow(QMainWindow):
         
         self.favorite_button = ModernButton("♥ Add to Favorites")
         self.favorite_button.clicked.connect(self.toggle_favorite)
-        self.favorite_button.setObjectName("warningButton")
+        self.favorite_button.setProperty("class", "warningButton")
         
         cook_button = ModernButton("▲ Start Cooking")
         cook_button.clicked.connect(self.start_cooking)
-        cook_button.setObjectName("primaryButton")
+        cook_button.setProperty("class", "primaryButton")
         
         grocery_button = ModernButton("+ Add to Grocery List")
         grocery_button.clicked.connect(self.add_to_grocery_list)
-        grocery_button.setObjectName("successButton")
+        grocery_button.setProperty("class", "successButton")
         
         buttons_layout.addWidget(self.favorite_button)
         buttons_layout.addWidget(cook_button)
@@ -659,15 +1546,12 @@ class MainWindow(QMainWindow):
         content_splitter.setStretchFactor(1, 1)
         
         layout.addWidget(content_splitter)
-        self.content_stack.addWidget(page)
-        
-        # Load recipes
-        self.load_recipes()
+        return page
     
     def create_suggestion_page(self):
         """Create the modern Smart Suggestions page"""
         page = QWidget()
-        page.setObjectName("contentPage")
+        page.setProperty("class", "contentPage")
         layout = QVBoxLayout(page)
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(20)
@@ -682,19 +1566,19 @@ class MainWindow(QMainWindow):
         input_layout.setContentsMargins(20, 20, 20, 20)
         
         input_header = QLabel("Available Ingredients")
-        input_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        input_header.setObjectName("cardHeader")
+        input_header.setFont(_font(14, bold=True))
+        input_header.setProperty("class", "cardHeader")
         input_layout.addWidget(input_header)
         
         # Ingredient input
         ingredient_input_layout = QHBoxLayout()
         self.ingredient_input = QLineEdit()
         self.ingredient_input.setPlaceholderText("Enter an ingredient (e.g., chicken, tomatoes, rice...)")
-        self.ingredient_input.setObjectName("modernInput")
+        self.ingredient_input.setProperty("class", "modernInput")
         
         add_ingredient_btn = ModernButton("+ Add")
         add_ingredient_btn.clicked.connect(self.add_ingredient)
-        add_ingredient_btn.setObjectName("primaryButton")
+        add_ingredient_btn.setProperty("class", "primaryButton")
         
         ingredient_input_layout.addWidget(self.ingredient_input)
         ingredient_input_layout.addWidget(add_ingredient_btn)
@@ -703,7 +1587,7 @@ class MainWindow(QMainWindow):
         # Ingredients list
         self.ingredients_list = QListWidget()
         self.ingredients_list.setMaximumHeight(150)
-        self.ingredients_list.setObjectName("modernList")
+        self.ingredients_list.setProperty("class", "modernList")
         input_layout.addWidget(self.ingredients_list)
         
         # Ingredient actions
@@ -711,11 +1595,11 @@ class MainWindow(QMainWindow):
         
         remove_ingredient_btn = ModernButton("- Remove Selected")
         remove_ingredient_btn.clicked.connect(self.remove_ingredient)
-        remove_ingredient_btn.setObjectName("errorButton")
+        remove_ingredient_btn.setProperty("class", "errorButton")
         
         clear_ingredients_btn = ModernButton("× Clear All")
         clear_ingredients_btn.clicked.connect(self.clear_ingredients)
-        clear_ingredients_btn.setObjectName("errorButton")
+        clear_ingredients_btn.setProperty("class", "errorButton")
         
         ingredient_actions.addWidget(remove_ingredient_btn)
         ingredient_actions.addWidget(clear_ingredients_btn)
@@ -726,7 +1610,7 @@ class MainWindow(QMainWindow):
         # Get suggestions button
         get_suggestions_btn = ModernButton("⚡ Get Recipe Suggestions")
         get_suggestions_btn.clicked.connect(self.get_recipe_suggestions)
-        get_suggestions_btn.setObjectName("primaryButton")
+        get_suggestions_btn.setProperty("class", "primaryButton")
         get_suggestions_btn.setMinimumHeight(50)
         input_layout.addWidget(get_suggestions_btn)
         
@@ -736,7 +1620,7 @@ class MainWindow(QMainWindow):
         self.suggestion_progress = QProgressBar()
         self.suggestion_progress.setRange(0, 0)
         self.suggestion_progress.setVisible(False)
-        self.suggestion_progress.setObjectName("modernProgress")
+        self.suggestion_progress.setProperty("class", "modernProgress")
         layout.addWidget(self.suggestion_progress)
         
         # Results card
@@ -745,22 +1629,24 @@ class MainWindow(QMainWindow):
         results_layout.setContentsMargins(20, 20, 20, 20)
         
         results_header = QLabel("Recipe Suggestions")
-        results_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        results_header.setObjectName("cardHeader")
+        results_header.setFont(_font(14, bold=True))
+        results_header.setProperty("class", "cardHeader")
         results_layout.addWidget(results_header)
         
         self.suggestions_text = QTextEdit()
         self.suggestions_text.setReadOnly(True)
-        self.suggestions_text.setObjectName("modernTextEdit")
+        self.suggestions_text.setProperty("class", "modernTextEdit")
+        # Parsed once here, so each suggestion list only carries class names
+        self.suggestions_text.document().setDefaultStyleSheet(_SUGGESTIONS_CSS)
         results_layout.addWidget(self.suggestions_text)
         
         layout.addWidget(results_card)
-        self.content_stack.addWidget(page)
+        return page
     
     def create_assistant_page(self):
         """Create the modern AI Assistant page with beautiful chat interface"""
         page = QWidget()
-        page.setObjectName("contentPage")
+        page.setProperty("class", "contentPage")
         layout = QVBoxLayout(page)
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(20)
@@ -783,7 +1669,7 @@ class MainWindow(QMainWindow):
         header_layout.setContentsMargins(20, 15, 20, 15)
         
         chat_title = QLabel("● Cooking Assistant")
-        chat_title.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        chat_title.setFont(_font(14, bold=True))
         chat_title.setObjectName("chatTitle")
         
         status_label = QLabel("○ Online")
@@ -795,20 +1681,21 @@ class MainWindow(QMainWindow):
         
         chat_layout.addWidget(chat_header)
         
-        # Chat messages area
-        self.chat_scroll = QScrollArea()
-        self.chat_scroll.setWidgetResizable(True)
-        self.chat_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.chat_scroll.setObjectName("chatScroll")
-        
-        self.chat_widget = QWidget()
-        self.chat_messages_layout = QVBoxLayout(self.chat_widget)
-        self.chat_messages_layout.setContentsMargins(20, 20, 20, 20)
-        self.chat_messages_layout.setSpacing(15)
-        self.chat_messages_layout.addStretch()
-        
-        self.chat_scroll.setWidget(self.chat_widget)
-        chat_layout.addWidget(self.chat_scroll)
+        # Chat messages area: one model row per message, painted by the delegate
+        self.chat_view = QListView()
+        self.chat_model = ChatModel(self.chat_view)
+        self.chat_delegate = ChatBubbleDelegate(self.chat_view)
+        self.chat_delegate.set_colors(self._theme_colors)
+        self.chat_view.setModel(self.chat_model)
+        self.chat_view.setItemDelegate(self.chat_delegate)
+        self.chat_model.dataChanged.connect(self.chat_delegate.message_changed)
+        self.chat_view.setSelectionMode(QListView.NoSelection)
+        self.chat_view.setFocusPolicy(Qt.NoFocus)
+        self.chat_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.chat_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.chat_view.setResizeMode(QListView.Adjust)
+        self.chat_view.setObjectName("chatScroll")
+        chat_layout.addWidget(self.chat_view)
         
         # Message input area
         input_frame = QFrame()
@@ -827,7 +1714,7 @@ class MainWindow(QMainWindow):
         # Send button
         send_button = ModernButton("▶ Send")
         send_button.clicked.connect(self.send_message)
-        send_button.setObjectName("primaryButton")
+        send_button.setProperty("class", "primaryButton")
         send_button.setMinimumWidth(80)
         send_button.setMinimumHeight(70)
         
@@ -840,7 +1727,7 @@ class MainWindow(QMainWindow):
         self.assistant_progress = QProgressBar()
         self.assistant_progress.setRange(0, 0)
         self.assistant_progress.setVisible(False)
-        self.assistant_progress.setObjectName("modernProgress")
+        self.assistant_progress.setProperty("class", "modernProgress")
         chat_layout.addWidget(self.assistant_progress)
         
         layout.addWidget(chat_card)
@@ -849,12 +1736,12 @@ class MainWindow(QMainWindow):
         welcome_msg = "Hello! I'm your AI cooking assistant. I can help you with recipes, cooking techniques, ingredient substitutions, and more. What would you like to know?"
         self.add_chat_bubble(welcome_msg, False)
         
-        self.content_stack.addWidget(page)
+        return page
     
     def create_grocery_page(self):
         """Create the modern Grocery & Pantry page"""
         page = QWidget()
-        page.setObjectName("contentPage")
+        page.setProperty("class", "contentPage")
         layout = QVBoxLayout(page)
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(20)
@@ -872,8 +1759,8 @@ class MainWindow(QMainWindow):
         pantry_layout.setContentsMargins(20, 20, 20, 20)
         
         pantry_header = QLabel("□ Your Pantry")
-        pantry_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        pantry_header.setObjectName("cardHeader")
+        pantry_header.setFont(_font(14, bold=True))
+        pantry_header.setProperty("class", "cardHeader")
         pantry_layout.addWidget(pantry_header)
         
         # Pantry input
@@ -881,16 +1768,16 @@ class MainWindow(QMainWindow):
         
         self.pantry_item_input = QLineEdit()
         self.pantry_item_input.setPlaceholderText("Enter pantry item")
-        self.pantry_item_input.setObjectName("modernInput")
+        self.pantry_item_input.setProperty("class", "modernInput")
         
         self.pantry_amount_input = QLineEdit()
         self.pantry_amount_input.setPlaceholderText("Amount")
         self.pantry_amount_input.setMaximumWidth(100)
-        self.pantry_amount_input.setObjectName("modernInput")
+        self.pantry_amount_input.setProperty("class", "modernInput")
         
         add_pantry_btn = ModernButton("+")
         add_pantry_btn.clicked.connect(self.add_pantry_item)
-        add_pantry_btn.setObjectName("primaryButton")
+        add_pantry_btn.setProperty("class", "primaryButton")
         add_pantry_btn.setMaximumWidth(40)
         
         pantry_input_layout.addWidget(self.pantry_item_input)
@@ -899,8 +1786,12 @@ class MainWindow(QMainWindow):
         pantry_layout.addLayout(pantry_input_layout)
         
         # Pantry list
-        self.pantry_list = QListWidget()
-        self.pantry_list.setObjectName("modernList")
+        self.pantry_list = QListView()
+        self.pantry_list_model = ItemListModel(self.pantry_list)
+        self.pantry_list.setModel(self.pantry_list_model)
+        self.pantry_list.setUniformItemSizes(True)
+        self.pantry_list.setEditTriggers(QListView.NoEditTriggers)
+        self.pantry_list.setProperty("class", "modernList")
         pantry_layout.addWidget(self.pantry_list)
         
         # Pantry actions
@@ -908,11 +1799,11 @@ class MainWindow(QMainWindow):
         
         remove_pantry_btn = ModernButton("- Remove")
         remove_pantry_btn.clicked.connect(self.remove_pantry_item)
-        remove_pantry_btn.setObjectName("errorButton")
+        remove_pantry_btn.setProperty("class", "errorButton")
         
         clear_pantry_btn = ModernButton("× Clear All")
         clear_pantry_btn.clicked.connect(self.clear_pantry)
-        clear_pantry_btn.setObjectName("errorButton")
+        clear_pantry_btn.setProperty("class", "errorButton")
         
         pantry_actions.addWidget(remove_pantry_btn)
         pantry_actions.addWidget(clear_pantry_btn)
@@ -926,8 +1817,8 @@ class MainWindow(QMainWindow):
         grocery_layout.setContentsMargins(20, 20, 20, 20)
         
         grocery_header = QLabel("□ Grocery List")
-        grocery_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        grocery_header.setObjectName("cardHeader")
+        grocery_header.setFont(_font(14, bold=True))
+        grocery_header.setProperty("class", "cardHeader")
         grocery_layout.addWidget(grocery_header)
         
         # Grocery input
@@ -935,16 +1826,16 @@ class MainWindow(QMainWindow):
         
         self.grocery_item_input = QLineEdit()
         self.grocery_item_input.setPlaceholderText("Enter grocery item")
-        self.grocery_item_input.setObjectName("modernInput")
+        self.grocery_item_input.setProperty("class", "modernInput")
         
         self.grocery_amount_input = QLineEdit()
         self.grocery_amount_input.setPlaceholderText("Amount")
         self.grocery_amount_input.setMaximumWidth(100)
-        self.grocery_amount_input.setObjectName("modernInput")
+        self.grocery_amount_input.setProperty("class", "modernInput")
         
         add_grocery_btn = ModernButton("+")
         add_grocery_btn.clicked.connect(self.add_grocery_item)
-        add_grocery_btn.setObjectName("primaryButton")
+        add_grocery_btn.setProperty("class", "primaryButton")
         add_grocery_btn.setMaximumWidth(40)
         
         grocery_input_layout.addWidget(self.grocery_item_input)
@@ -953,8 +1844,12 @@ class MainWindow(QMainWindow):
         grocery_layout.addLayout(grocery_input_layout)
         
         # Grocery list
-        self.grocery_list = QListWidget()
-        self.grocery_list.setObjectName("modernList")
+        self.grocery_list = QListView()
+        self.grocery_list_model = ItemListModel(self.grocery_list)
+        self.grocery_list.setModel(self.grocery_list_model)
+        self.grocery_list.setUniformItemSizes(True)
+        self.grocery_list.setEditTriggers(QListView.NoEditTriggers)
+        self.grocery_list.setProperty("class", "modernList")
         grocery_layout.addWidget(self.grocery_list)
         
         # Grocery actions
@@ -962,15 +1857,15 @@ class MainWindow(QMainWindow):
         
         remove_grocery_btn = ModernButton("- Remove")
         remove_grocery_btn.clicked.connect(self.remove_grocery_item)
-        remove_grocery_btn.setObjectName("errorButton")
+        remove_grocery_btn.setProperty("class", "errorButton")
         
         clear_grocery_btn = ModernButton("× Clear All")
         clear_grocery_btn.clicked.connect(self.clear_grocery_list)
-        clear_grocery_btn.setObjectName("errorButton")
+        clear_grocery_btn.setProperty("class", "errorButton")
         
         export_grocery_btn = ModernButton("▶ Export List")
         export_grocery_btn.clicked.connect(self.export_grocery_list)
-        export_grocery_btn.setObjectName("successButton")
+        export_grocery_btn.setProperty("class", "successButton")
         
         grocery_actions.addWidget(remove_grocery_btn)
         grocery_actions.addWidget(clear_grocery_btn)
@@ -983,16 +1878,12 @@ class MainWindow(QMainWindow):
         content_splitter.setStretchFactor(1, 1)
         
         layout.addWidget(content_splitter)
-        self.content_stack.addWidget(page)
-        
-        # Load data
-        self.load_pantry()
-        self.load_grocery_list()
+        return page
     
     def create_cooking_page(self):
         """Create the modern Cooking Guide page"""
         page = QWidget()
-        page.setObjectName("contentPage")
+        page.setProperty("class", "contentPage")
         layout = QVBoxLayout(page)
         layout.setContentsMargins(30, 30, 30, 30)
         layout.setSpacing(20)
@@ -1007,8 +1898,8 @@ class MainWindow(QMainWindow):
         selection_layout.setContentsMargins(20, 20, 20, 20)
         
         selection_header = QLabel("Select Recipe to Cook")
-        selection_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        selection_header.setObjectName("cardHeader")
+        selection_header.setFont(_font(14, bold=True))
+        selection_header.setProperty("class", "cardHeader")
         selection_layout.addWidget(selection_header)
         
         recipe_selection_layout = QHBoxLayout()
@@ -1019,7 +1910,7 @@ class MainWindow(QMainWindow):
         
         load_recipe_btn = ModernButton("▲ Start Cooking")
         load_recipe_btn.clicked.connect(self.load_cooking_recipe)
-        load_recipe_btn.setObjectName("primaryButton")
+        load_recipe_btn.setProperty("class", "primaryButton")
         recipe_selection_layout.addWidget(load_recipe_btn)
         
         selection_layout.addLayout(recipe_selection_layout)
@@ -1028,7 +1919,7 @@ class MainWindow(QMainWindow):
         # Recipe title
         self.cooking_recipe_title = QLabel("Select a recipe to begin cooking")
         self.cooking_recipe_title.setAlignment(Qt.AlignCenter)
-        self.cooking_recipe_title.setFont(QFont("Segoe UI", 18, QFont.Bold))
+        self.cooking_recipe_title.setFont(_font(18, bold=True))
         self.cooking_recipe_title.setObjectName("cookingTitle")
         layout.addWidget(self.cooking_recipe_title)
         
@@ -1043,13 +1934,13 @@ class MainWindow(QMainWindow):
         steps_layout.setContentsMargins(15, 15, 15, 15)
         
         steps_header = QLabel("▲ Cooking Steps")
-        steps_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        steps_header.setObjectName("cardHeader")
+        steps_header.setFont(_font(14, bold=True))
+        steps_header.setProperty("class", "cardHeader")
         steps_layout.addWidget(steps_header)
         
         self.cooking_steps_list = QListWidget()
         self.cooking_steps_list.itemClicked.connect(self.show_step_details)
-        self.cooking_steps_list.setObjectName("modernList")
+        self.cooking_steps_list.setProperty("class", "modernList")
         steps_layout.addWidget(self.cooking_steps_list)
         
         # Navigation
@@ -1061,7 +1952,7 @@ class MainWindow(QMainWindow):
         
         self.next_step_button = ModernButton("Next ▶")
         self.next_step_button.clicked.connect(self.next_step)
-        self.next_step_button.setObjectName("primaryButton")
+        self.next_step_button.setProperty("class", "primaryButton")
         
         nav_layout.addWidget(self.prev_step_button)
         nav_layout.addWidget(self.next_step_button)
@@ -1077,24 +1968,18 @@ class MainWindow(QMainWindow):
         
         # Step details
         details_header = QLabel("● Step Details")
-        details_header.setFont(QFont("Segoe UI", 14, QFont.Bold))
-        details_header.setObjectName("cardHeader")
+        details_header.setFont(_font(14, bold=True))
+        details_header.setProperty("class", "cardHeader")
         details_layout.addWidget(details_header)
         
-        # Step details with scroll area for responsiveness
-        details_scroll = QScrollArea()
-        details_scroll.setWidgetResizable(True)
-        details_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        details_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        details_scroll.setMinimumHeight(100)
-        
-        self.step_details_text = QLabel("Select a step to view details")
-        self.step_details_text.setWordWrap(True)
+        # Step details; the browser scrolls itself and re-wraps only changed blocks
+        self.step_details_text = QTextBrowser()
+        self.step_details_text.setOpenLinks(False)
+        self.step_details_text.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.step_details_text.setMinimumHeight(100)
         self.step_details_text.setObjectName("stepDetails")
-        self.step_details_text.setAlignment(Qt.AlignTop)
-        
-        details_scroll.setWidget(self.step_details_text)
-        details_layout.addWidget(details_scroll)
+        self.step_details_text.setPlainText("Select a step to view details")
+        details_layout.addWidget(self.step_details_text)
         
         # Assistant section with improved layout
         assistant_frame = QFrame()
@@ -1105,18 +1990,18 @@ class MainWindow(QMainWindow):
         assistant_layout.setSpacing(8)
         
         assistant_header = QLabel("● Need Help?")
-        assistant_header.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        assistant_header.setFont(_font(12, bold=True))
         assistant_header.setObjectName("assistantHeader")
         assistant_layout.addWidget(assistant_header)
         
         question_layout = QHBoxLayout()
         self.step_question_input = QLineEdit()
         self.step_question_input.setPlaceholderText("Ask about this step...")
-        self.step_question_input.setObjectName("modernInput")
+        self.step_question_input.setProperty("class", "modernInput")
         
         ask_btn = ModernButton("Ask")
         ask_btn.clicked.connect(self.ask_step_question)
-        ask_btn.setObjectName("primaryButton")
+        ask_btn.setProperty("class", "primaryButton")
         ask_btn.setMinimumWidth(80)
         ask_btn.setFixedHeight(32)
         
@@ -1124,10 +2009,10 @@ class MainWindow(QMainWindow):
         question_layout.addWidget(ask_btn)
         assistant_layout.addLayout(question_layout)
         
-        self.step_answer_text = QTextEdit()
+        self.step_answer_text = QPlainTextEdit()
         self.step_answer_text.setReadOnly(True)
         self.step_answer_text.setMaximumHeight(150)
-        self.step_answer_text.setObjectName("modernTextEdit")
+        self.step_answer_text.setProperty("class", "modernTextEdit")
         assistant_layout.addWidget(self.step_answer_text)
         
         details_layout.addWidget(assistant_frame)
@@ -1139,14 +2024,14 @@ class MainWindow(QMainWindow):
         content_splitter.setStretchFactor(1, 1)
         
         layout.addWidget(content_splitter)
-        self.content_stack.addWidget(page)
+        return page
         
         # Cooking recipes will be loaded after UI initialization
     
     def create_page_header(self, title, subtitle, icon=""):
         """Create an enhanced page header with icon"""
         header_frame = QFrame()
-        header_frame.setObjectName("pageHeader")
+        header_frame.setProperty("class", "pageHeader")
         header_layout = QVBoxLayout(header_frame)
         header_layout.setContentsMargins(0, 0, 0, 25)
         header_layout.setSpacing(8)
@@ -1159,30 +2044,30 @@ class MainWindow(QMainWindow):
         # Icon (if provided)
         if icon:
             icon_label = QLabel(icon)
-            icon_label.setFont(QFont("Segoe UI", 24, QFont.Bold))
+            icon_label.setFont(_font(24, bold=True))
             icon_label.setFixedSize(35, 35)
             icon_label.setAlignment(Qt.AlignCenter)
-            icon_label.setObjectName("pageIcon")
+            icon_label.setProperty("class", "pageIcon")
             title_layout.addWidget(icon_label)
         
         # Title text
         title_label = QLabel(title)
-        title_label.setFont(QFont("Segoe UI", 28, QFont.Bold))
-        title_label.setObjectName("pageTitle")
+        title_label.setFont(_font(28, bold=True))
+        title_label.setProperty("class", "pageTitle")
         title_layout.addWidget(title_label)
         title_layout.addStretch()
         
         # Subtitle
         subtitle_label = QLabel(subtitle)
-        subtitle_label.setFont(QFont("Segoe UI", 13))
-        subtitle_label.setObjectName("pageSubtitle")
+        subtitle_label.setFont(_font(13))
+        subtitle_label.setProperty("class", "pageSubtitle")
         subtitle_label.setMargin(5)
         
         # Decorative line
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
         line.setFrameShadow(QFrame.Sunken)
-        line.setObjectName("headerLine")
+        line.setProperty("class", "headerLine")
         line.setMaximumHeight(1)
         
         header_layout.addLayout(title_layout)
@@ -1193,592 +2078,114 @@ class MainWindow(QMainWindow):
     
     def switch_page(self, page_index):
         """Switch to the specified page"""
-        # Update navigation buttons
-        for i, btn in enumerate(self.nav_buttons):
-            btn.setChecked(i == page_index)
+        if page_index == self.current_page:
+            # Clicking the current tab toggled its checkable button off; undo that
+            self.nav_buttons[page_index].setChecked(True)
+            return
+        
+        self._build_page(page_index)
+        
+        # Update navigation buttons; only the old and new ones change
+        self.nav_buttons[self.current_page].setChecked(False)
+        self.nav_buttons[page_index].setChecked(True)
         
         # Switch content
         self.content_stack.setCurrentIndex(page_index)
         self.current_page = page_index
         
         # Update status
-        page_names = ["Recipe Library", "Smart Suggestions", "AI Assistant", "Grocery & Pantry", "Cooking Guide"]
-        if page_index < len(page_names):
-            self.status_bar.showMessage(f"Viewing {page_names[page_index]}")
-    
-    def add_typing_indicator(self):
-        """Add a typing indicator to show AI is responding"""
-        typing_bubble = QFrame()
-        typing_bubble.setObjectName("typingBubble")
-        typing_bubble.setMaximumWidth(120)
-        
-        typing_layout = QHBoxLayout(typing_bubble)
-        typing_layout.setContentsMargins(18, 12, 18, 12)
-        
-        typing_label = QLabel("● thinking...")
-        typing_label.setFont(QFont("Segoe UI", 10))
-        typing_label.setObjectName("typingLabel")
-        typing_layout.addWidget(typing_label)
-        
-        # Remove stretch before adding typing indicator
-        self.chat_messages_layout.takeAt(self.chat_messages_layout.count() - 1)
-        
-        # Add typing indicator with proper alignment
-        indicator_layout = QHBoxLayout()
-        indicator_layout.addWidget(typing_bubble)
-        indicator_layout.addStretch()
-        indicator_layout.setContentsMargins(0, 0, 50, 0)
-        
-        self.chat_messages_layout.addLayout(indicator_layout)
-        self.chat_messages_layout.addStretch()
-        
-        # Store reference to remove later
-        self.typing_indicator_layout = indicator_layout
-        
-        # Scroll to bottom
-        QTimer.singleShot(100, self.scroll_to_bottom)
-    
-    def remove_typing_indicator(self):
-        """Remove the typing indicator"""
-        if hasattr(self, 'typing_indicator_layout'):
-            # Remove stretch
-            self.chat_messages_layout.takeAt(self.chat_messages_layout.count() - 1)
-            # Remove typing indicator
-            for i in range(self.typing_indicator_layout.count()):
-                widget = self.typing_indicator_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
-            self.chat_messages_layout.removeItem(self.typing_indicator_layout)
-            # Add stretch back
-            self.chat_messages_layout.addStretch()
-            delattr(self, 'typing_indicator_layout')
-    
-    def add_chat_bubble(self, message, is_user=True):
-        """Add a chat bubble to the conversation"""
-        # Remove typing indicator if present
-        if not is_user:
-            self.remove_typing_indicator()
-        
-        bubble = ChatBubble(message, is_user)
-        
-        # Remove stretch before adding new bubble
-        self.chat_messages_layout.takeAt(self.chat_messages_layout.count() - 1)
-        
-        # Add bubble with proper alignment
-        if is_user:
-            bubble_layout = QHBoxLayout()
-            bubble_layout.addStretch()
-            bubble_layout.addWidget(bubble)
-            bubble_layout.setContentsMargins(50, 0, 0, 0)
-        else:
-            bubble_layout = QHBoxLayout()
-            bubble_layout.addWidget(bubble)
-            bubble_layout.addStretch()
-            bubble_layout.setContentsMargins(0, 0, 50, 0)
+        if page_index < len(self.PAGE_NAMES):
+            self.status_bar.showMessage(f"Viewing {self.PAGE_NAMES[page_index]}")
+    
+    def add_chat_bubble(self, message, is_user=True, pre_rendered_html=None):
+        """Add a message to the conversation and return its ChatMessage"""
+        chat_message = ChatMessage(ChatMessage.USER if is_user else ChatMessage.ASSISTANT, "")
+        self.set_chat_message(chat_message, message, html_text=pre_rendered_html, notify=False)
+        self.chat_model.append(chat_message)
+        self.scroll_to_bottom()
         
-        self.chat_messages_layout.addLayout(bubble_layout)
+        return chat_message
+    
+    def set_chat_message(self, chat_message, message, partial=False, html_text=None, notify=True):
+        """Replace a message's text; partial=True while a response is still streaming in"""
+        chat_message.text = message = str(message)
         
-        # Add stretch back
-        self.chat_messages_layout.addStretch()
+        # Format message based on sender
+        if chat_message.kind == ChatMessage.USER:
+            # User messages - plain text keeps line breaks and any literal < or &
+            chat_message.html = None
+        elif html_text is not None:
+            # Already formatted, e.g. by a MarkdownRenderWorker
+            chat_message.html = html_text
+        elif partial:
+            # Intermediate streamed text is never shown again, so skip the cache
+            chat_message.html = markdown_to_html.__wrapped__(message)
+        else:
+            # AI messages - convert markdown to HTML
+            chat_message.html = markdown_to_html(message)
         
-        # Scroll to bottom
-        QTimer.singleShot(100, self.scroll_to_bottom)
+        if notify:
+            self.chat_model.message_changed(chat_message)
     
     def scroll_to_bottom(self):
-        """Scroll chat to bottom"""
-        scrollbar = self.chat_scroll.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        """Scroll chat to bottom once the view has laid out new rows
+        
+        Requests made while one is pending (e.g. a burst of streamed chunks)
+        share it, so the view scrolls once per event-loop pass.
+        """
+        if self._scroll_pending:
+            return
+        self._scroll_pending = True
+        QTimer.singleShot(0, self._scroll_chat_to_bottom)
+    
+    def _scroll_chat_to_bottom(self):
+        self._scroll_pending = False
+        self.chat_view.scrollToBottom()
     
     def apply_theme(self):
         """Apply the modern theme with beautiful styling"""
         theme = self.config.get("theme", "light")
-        colors = self.dark_colors if theme == "dark" else self.light_colors
         
         # Update theme button text
         self.theme_btn.setText("○ Light Mode" if theme == "dark" else "◐ Dark Mode")
         
-        # Enhanced stylesheet with improved visual design
-        stylesheet = f"""
-        /* Main Window */
-        QMainWindow {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
-                stop:0 {colors['background']}, 
-                stop:1 {colors['border_light']});
-            color: {colors['text']};
-            font-family: "Segoe UI", sans-serif;
-        }}
-        
-        /* Sidebar */
-        #sidebar {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:1, 
-                stop:0 {colors['sidebar']}, 
-                stop:1 {colors['secondary']});
-            border-right: 1px solid {colors['border']};
-        }}
-        
-        #sidebarHeader {{
-            background: transparent;
-            border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        
-        #appIcon {{
-            color: {colors['primary_light']};
-        }}
-        
-        #appTitle {{
-            color: {colors['sidebar_text']};
-            font-weight: bold;
-            letter-spacing: -0.5px;
-        }}
-        
-        #subtitleIcon {{
-            color: {colors['accent']};
-        }}
-        
-        #appSubtitle {{
-            color: rgba(255, 255, 255, 0.8);
-            font-weight: 400;
-        }}
-        
-        #versionBadge {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 {colors['accent']}, stop:1 {colors['primary_light']});
-            color: white;
-            border-radius: 9px;
-            font-weight: bold;
-            padding: 2px 6px;
-        }}
-        
-        /* Sidebar Buttons */
-        #sidebarButton {{
-            background: transparent;
-            color: {colors['sidebar_text']};
-            border: none;
-            text-align: left;
-            padding-left: 60px;
-            font-size: 14px;
-            font-weight: 500;
-        }}
-        
-        #sidebarButton:hover {{
-            background: rgba(255, 255, 255, 0.1);
-        }}
-        
-        #sidebarButton:checked {{
-            background: rgba(255, 255, 255, 0.2);
-            border-left: 4px solid {colors['primary']};
-        }}
-        
-        /* Content Area */
-        #contentStack {{
-            background-color: {colors['background']};
-        }}
-        
-        #contentPage {{
-            background-color: {colors['background']};
-        }}
-        
-        /* Modern Cards */
-        #modernCard {{
-            background-color: {colors['surface']};
-            border: 1px solid {colors['border']};
-            border-radius: 12px;
-            margin: 2px;
-        }}
-        
-        /* Enhanced Page Headers */
-        #pageHeader {{
-            background: transparent;
-            margin-bottom: 10px;
-        }}
-        
-        #pageTitle {{
-            color: {colors['text']};
-            font-weight: 800;
-        }}
-        
-        #pageSubtitle {{
-            color: {colors['text_light']};
-            font-weight: 400;
-            margin-top: 5px;
-        }}
-        
-        #pageIcon {{
-            color: {colors['primary']};
-        }}
-        
-        #headerLine {{
-            background-color: {colors['border']};
-            border: none;
-            height: 2px;
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 {colors['primary']}, 
-                stop:0.5 {colors['accent']}, 
-                stop:1 {colors['secondary']});
-            border-radius: 1px;
-            margin: 10px 0;
-        }}
-        
-        /* Card Headers */
-        #cardHeader {{
-            color: {colors['text']};
-            margin-bottom: 15px;
-        }}
-        
-        /* Modern Inputs */
-        #modernInput {{
-            background-color: {colors['surface']};
-            border: 2px solid {colors['border']};
-            border-radius: 8px;
-            padding: 12px;
-            font-size: 14px;
-            color: {colors['text']};
-        }}
-        
-        #modernInput:focus {{
-            border-color: {colors['primary']};
-            outline: none;
-        }}
-        
-        #modernCombo {{
-            background-color: {colors['surface']};
-            border: 2px solid {colors['border']};
-            border-radius: 8px;
-            padding: 8px 12px;
-            font-size: 14px;
-            color: {colors['text']};
-            min-height: 20px;
-        }}
-        
-        #modernCombo:focus {{
-            border-color: {colors['primary']};
-        }}
-        
-        #modernCombo::drop-down {{
-            border: none;
-            width: 30px;
-        }}
-        
-        #modernCombo::down-arrow {{
-            image: none;
-            border: 2px solid {colors['text_light']};
-            border-top: none;
-            border-right: none;
-            width: 6px;
-            height: 6px;
-            margin-right: 8px;
-            transform: rotate(-45deg);
-        }}
-        
-        /* Modern Lists */
-        #modernList {{
-            background-color: {colors['surface']};
-            border: 1px solid {colors['border']};
-            border-radius: 8px;
-            padding: 5px;
-            font-size: 14px;
-            color: {colors['text']};
-        }}
-        
-        #modernList::item {{
-            padding: 12px;
-            border-radius: 6px;
-            margin: 2px;
-        }}
-        
-        #modernList::item:selected {{
-            background-color: {colors['primary']};
-            color: white;
-        }}
-        
-        #modernList::item:hover {{
-            background-color: {colors['border']};
-        }}
-        
-        /* Modern Text Edit */
-        #modernTextEdit {{
-            background-color: {colors['surface']};
-            border: 1px solid {colors['border']};
-            border-radius: 8px;
-            padding: 12px;
-            font-size: 14px;
-            color: {colors['text']};
-        }}
-        
-        /* Enhanced Modern Buttons */
-        QPushButton {{
-            background-color: {colors['surface_elevated']};
-            color: {colors['text']};
-            border: 1px solid {colors['border']};
-            border-radius: 10px;
-            padding: 12px 24px;
-            font-size: 14px;
-            font-weight: 500;
-            min-height: 16px;
-        }}
-        
-        QPushButton:hover {{
-            background-color: {colors['border_light']};
-            border-color: {colors['primary']};
-        }}
-        
-        QPushButton:pressed {{
-            background-color: {colors['primary']};
-            color: white;
-        }}
-        
-        #primaryButton {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 {colors['primary']}, stop:1 {colors['primary_dark']});
-            color: white;
-            font-weight: 600;
-            border: none;
-        }}
-        
-        #primaryButton:hover {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 {colors['primary_light']}, stop:1 {colors['primary']});
-        }}
-        
-        #primaryButton:pressed {{
-            background: {colors['primary_dark']};
-        }}
-        
-        #successButton {{
-            background-color: {colors['success']};
-            color: white;
-        }}
-        
-        #successButton:hover {{
-            background-color: {colors['success']};
-        }}
-        
-        #warningButton {{
-            background-color: {colors['warning']};
-            color: white;
-        }}
-        
-        #warningButton:hover {{
-            background-color: {colors['warning']};
-        }}
-        
-        #errorButton {{
-            background-color: {colors['error']};
-            color: white;
-        }}
-        
-        #errorButton:hover {{
-            background-color: {colors['error']};
-        }}
-        
-        #secondaryButton {{
-            background-color: transparent;
-            border: 2px solid {colors['primary']};
-            color: {colors['primary']};
-        }}
-        
-        #secondaryButton:hover {{
-            background-color: {colors['primary']};
-            color: white;
-        }}
-        
-        /* Settings Buttons */
-        #themeButton, #settingsButton {{
-            background-color: rgba(255, 255, 255, 0.1);
-            color: {colors['sidebar_text']};
-            border: 1px solid rgba(255, 255, 255, 0.2);
-        }}
-        
-        #themeButton:hover, #settingsButton:hover {{
-            background-color: rgba(255, 255, 255, 0.2);
-        }}
-        
-        #settingsLabel {{
-            color: rgba(255, 255, 255, 0.8);
-            font-size: 12px;
-            margin-bottom: 5px;
-        }}
-        
-        #settingsCombo {{
-            background-color: rgba(255, 255, 255, 0.1);
-            color: {colors['sidebar_text']};
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            border-radius: 6px;
-        }}
-        
-        /* Chat Interface */
-        #chatHeader {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 {colors['primary']}, stop:1 {colors['primary_dark']});
-            border-top-left-radius: 12px;
-            border-top-right-radius: 12px;
-        }}
-        
-        #chatTitle {{
-            color: white;
-        }}
-        
-        #statusOnline {{
-            color: {colors['success']};
-            font-weight: bold;
-        }}
-        
-        #chatScroll {{
-            background-color: {colors['surface']};
-            border: none;
-        }}
-        
-        #chatInput {{
-            background-color: {colors['background']};
-            border-top: 1px solid {colors['border']};
-        }}
-        
-        #messageInput {{
-            background-color: {colors['surface']};
-            border: 2px solid {colors['border']};
-            border-radius: 20px;
-            padding: 15px 20px;
-            font-size: 14px;
-            color: {colors['text']};
-        }}
-        
-        #messageInput:focus {{
-            border-color: {colors['primary']};
-        }}
-        
-        /* Enhanced Chat Bubbles */
-        #userBubble {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 {colors['chat_user']}, stop:1 {colors['primary_dark']});
-            color: white;
-            border-radius: 20px 20px 5px 20px;
-            border: none;
-            margin: 5px 0;
-        }}
-        
-        #assistantBubble {{
-            background-color: {colors['chat_assistant']};
-            color: {colors['text']};
-            border-radius: 20px 20px 20px 5px;
-            border: 1px solid {colors['border']};
-            margin: 5px 0;
-        }}
-        
-        #typingBubble {{
-            background-color: {colors['border_light']};
-            border: 1px solid {colors['border']};
-            border-radius: 20px 20px 20px 5px;
-            margin: 5px 0;
-        }}
-        
-        #typingLabel {{
-            color: {colors['text_muted']};
-            font-style: italic;
-        }}
-        
-        /* Recipe Details */
-        #recipeTitle {{
-            color: {colors['text']};
-        }}
-        
-        #recipeInfo {{
-            color: {colors['text_light']};
-            margin: 10px 0;
-        }}
-        
-        #sectionFrame {{
-            background-color: {colors['background']};
-            border: 1px solid {colors['border']};
-            border-radius: 8px;
-            margin: 10px 0;
-            padding: 10px;
-        }}
-        
-        #sectionTitle {{
-            color: {colors['text']};
-        }}
-        
-        #sectionContent {{
-            color: {colors['text_light']};
-        }}
-        
-        /* Cooking Guide */
-        #cookingTitle {{
-            color: {colors['text']};
-            margin: 20px 0;
-        }}
-        
-        #stepDetails {{
-            color: {colors['text']};
-            background-color: {colors['background']};
-            border: 1px solid {colors['border']};
-            border-radius: 8px;
-            padding: 15px;
-            margin: 10px 0;
-        }}
-        
-        #assistantFrame {{
-            background-color: {colors['background']};
-            border: 2px solid {colors['primary']};
-            border-radius: 12px;
-            margin-top: 20px;
-        }}
-        
-        #assistantHeader {{
-            color: {colors['primary']};
-        }}
-        
-        /* Progress Bars */
-        #modernProgress {{
-            background-color: {colors['border']};
-            border: none;
-            border-radius: 10px;
-            height: 20px;
-        }}
-        
-        #modernProgress::chunk {{
-            background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                stop:0 {colors['primary']}, stop:1 {colors['primary_dark']});
-            border-radius: 10px;
-        }}
-        
-        /* Scrollbars */
-        QScrollBar:vertical {{
-            background-color: {colors['background']};
-            width: 8px;
-            border-radius: 4px;
-        }}
-        
-        QScrollBar::handle:vertical {{
-            background-color: {colors['text_light']};
-            border-radius: 4px;
-            min-height: 20px;
-        }}
-        
-        QScrollBar::handle:vertical:hover {{
-            background-color: {colors['primary']};
-        }}
-        
-        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-            height: 0px;
-        }}
-        
-        /* Status Bar */
-        #modernStatusBar {{
-            background-color: {colors['surface']};
-            color: {colors['text_light']};
-            border-top: 1px solid {colors['border']};
-            padding: 5px;
-        }}
-        
-        /* Scroll Areas */
-        #detailsScroll {{
-            background-color: transparent;
-            border: none;
-        }}
-        """
+        # setStyleSheet re-polishes every widget, so skip it when the theme is
+        # unchanged (e.g. saving preferences without switching themes)
+        if theme == self._applied_theme:
+            return
+        self._applied_theme = theme
+        
+        # Each theme's stylesheet is built once; toggling back reuses the cached string
+        colors = self.dark_colors if theme == "dark" else self.light_colors
+        stylesheet = self._stylesheets.get(theme)
+        if stylesheet is None:
+            stylesheet = self._stylesheets[theme] = self._build_stylesheet(colors)
         
         self.setStyleSheet(stylesheet)
+        
+        # Chat bubbles are painted by their delegate rather than styled by the sheet
+        self._theme_colors = colors
+        if self._page_built(2):
+            self.chat_delegate.set_colors(colors)
+            self.chat_view.viewport().update()
+        
+        # The large window and sidebar gradients are blitted from cached pixmaps
+        self._window_gradient = (colors['background'], colors['border_light'])
+        self.sidebar.set_gradient(colors['sidebar'], colors['secondary'])
+        self.update()
+    
+    def paintEvent(self, event):
+        """Draw the window background gradient"""
+        if self._window_gradient:
+            painter = QPainter(self)
+            painter.drawPixmap(0, 0, _gradient_pixmap(self.width(), self.height(), *self._window_gradient))
+            painter.end()
+        super().paintEvent(event)
+    
+    @staticmethod
+    def _build_stylesheet(colors):
+        """Fill the stylesheet template with a theme's colors"""
+        return _STYLESHEET_TEMPLATE.format_map(colors)
     
     def toggle_theme(self):
         """Toggle between light and dark themes"""
@@ -1802,6 +2209,10 @@ class MainWindow(QMainWindow):
         self.current_model_type = model_type
         self.model_combo.setCurrentText("DeepSeek" if model_type == "deepseek" else "Llama 3.3")
         self.status_bar.showMessage(f"Using {model_type} model")
+        
+        # Rebuilding the client is only needed when the model actually changes
+        if self.api_initialized and model_type == self.api_model_type:
+            return
         self.initialize_api(model_type)
     
     def on_model_changed(self, index):
@@ -1815,6 +2226,7 @@ class MainWindow(QMainWindow):
             model_type = self.current_model_type
             
         self.api_initialized = initialize_api(model_type)
+        self.api_model_type = model_type if self.api_initialized else None
         
         if not self.api_initialized:
             QMessageBox.warning(
@@ -1826,9 +2238,9 @@ class MainWindow(QMainWindow):
             if hasattr(self, 'status_bar') and self.status_bar:
                 self.status_bar.showMessage(f"API initialized for {model_type} model")
     
-    def show_preferences(self):
-        """Show the preferences dialog"""
-        from PyQt5.QtWidgets import QDialog, QFormLayout, QDialogButtonBox, QComboBox, QCheckBox, QLineEdit, QGroupBox, QVBoxLayout, QLabel
+    def build_preferences_dialog(self):
+        """Create the preferences dialog; built once and reused by show_preferences"""
+        from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QFormLayout
         
         dialog = QDialog(self)
         dialog.setWindowTitle("Preferences")
@@ -1836,19 +2248,15 @@ class MainWindow(QMainWindow):
         
         layout = QFormLayout(dialog)
         
-        theme_combo = QComboBox()
-        theme_combo.addItems(["Light", "Dark"])
-        current_theme = self.config.get("theme", "light")
-        theme_combo.setCurrentText(current_theme.capitalize())
-        layout.addRow("Theme:", theme_combo)
+        self.prefs_theme_combo = QComboBox()
+        self.prefs_theme_combo.addItems(["Light", "Dark"])
+        layout.addRow("Theme:", self.prefs_theme_combo)
         
-        auto_save = QCheckBox()
-        auto_save.setChecked(self.config.get("auto_save", True))
-        layout.addRow("Auto-save changes:", auto_save)
+        self.prefs_auto_save = QCheckBox()
+        layout.addRow("Auto-save changes:", self.prefs_auto_save)
         
-        enable_cache = QCheckBox()
-        enable_cache.setChecked(self.config.get("cache", {}).get("enabled", True))
-        layout.addRow("Enable API response caching:", enable_cache)
+        self.prefs_enable_cache = QCheckBox()
+        layout.addRow("Enable API response caching:", self.prefs_enable_cache)
         
         api_group = QGroupBox("API Settings")
         api_layout = QVBoxLayout()
@@ -1856,17 +2264,11 @@ class MainWindow(QMainWindow):
         
         api_form = QFormLayout()
         
-        model_combo = QComboBox()
-        model_combo.addItem("DeepSeek", "deepseek")
-        model_combo.addItem("Llama 3.3", "llama")
-        
-        current_model_type = self.current_model_type
-        if current_model_type == "deepseek":
-            model_combo.setCurrentIndex(0)
-        else:
-            model_combo.setCurrentIndex(1)
+        self.prefs_model_combo = QComboBox()
+        self.prefs_model_combo.addItem("DeepSeek", "deepseek")
+        self.prefs_model_combo.addItem("Llama 3.3", "llama")
         
-        api_form.addRow("Default AI Model:", model_combo)
+        api_form.addRow("Default AI Model:", self.prefs_model_combo)
         api_layout.addLayout(api_form)
         
         api_info = QLabel("Note: API keys can be set in the Settings menu.")
@@ -1880,15 +2282,31 @@ class MainWindow(QMainWindow):
         button_box.rejected.connect(dialog.reject)
         layout.addRow(button_box)
         
-        if dialog.exec_() == QDialog.Accepted:
-            self.config["theme"] = theme_combo.currentText().lower()
-            self.config["auto_save"] = auto_save.isChecked()
+        self.prefs_dialog = dialog
+    
+    def show_preferences(self):
+        """Show the preferences dialog"""
+        from PyQt5.QtWidgets import QDialog
+        
+        if self.prefs_dialog is None:
+            self.build_preferences_dialog()
+        
+        # Show the current settings; a cancelled edit from last time must not linger
+        current_theme = self.config.get("theme", "light")
+        self.prefs_theme_combo.setCurrentText(current_theme.capitalize())
+        self.prefs_auto_save.setChecked(self.config.get("auto_save", True))
+        self.prefs_enable_cache.setChecked(self.config.get("cache", {}).get("enabled", True))
+        self.prefs_model_combo.setCurrentIndex(0 if self.current_model_type == "deepseek" else 1)
+        
+        if self.prefs_dialog.exec_() == QDialog.Accepted:
+            self.config["theme"] = self.prefs_theme_combo.currentText().lower()
+            self.config["auto_save"] = self.prefs_auto_save.isChecked()
             
             if "cache" not in self.config:
                 self.config["cache"] = {}
-            self.config["cache"]["enabled"] = enable_cache.isChecked()
+            self.config["cache"]["enabled"] = self.prefs_enable_cache.isChecked()
             
-            self.current_model_type = model_combo.currentData()
+            self.current_model_type = self.prefs_model_combo.currentData()
             self.model_combo.setCurrentText("DeepSeek" if self.current_model_type == "deepseek" else "Llama 3.3")
             
             # Update individual config values
@@ -1901,52 +2319,101 @@ class MainWindow(QMainWindow):
             
             QMessageBox.information(self, "Preferences", "Preferences updated successfully.")
     
+    def load_initial_data(self):
+        """Populate the database-backed pages; called once database initialization finishes"""
+        self._data_loaded = True
+        self.load_recipes()
+        
+        # Favorites are needed on the first recipe click; read them alongside the recipe list
+        self.run_in_background(
+            _load_favorite_ids,
+            on_done=self.seed_favorite_ids,
+            on_error=lambda message: logger.error(f"Error preloading favorites: {message}")
+        )
+        
+        self.load_pantry()
+        self.load_grocery_list()
+        self.load_cooking_recipes()
+    
     # Keep all the original backend methods exactly as they were
+    def run_in_background(self, fn, *args, on_done, on_error):
+        """Call fn(*args) on the thread pool; on_done(result) or on_error(message) runs on the main thread"""
+        worker = BackendWorker(fn, *args, parent=self)
+        worker.signals.finished.connect(on_done)
+        worker.signals.failed.connect(on_error)
+        worker.signals.finished.connect(worker.signals.deleteLater)
+        worker.signals.failed.connect(worker.signals.deleteLater)
+        QThreadPool.globalInstance().start(worker)
+    
+    def fill_recipe_list(self, fn, *args, status, error, full_list=False):
+        """Fill the recipe list from fn(*args) off the main thread
+        
+        status(count) gives the status bar message once the rows arrive. When
+        requests overlap (e.g. two quick searches), only the latest one is shown.
+        With full_list=True the rows are also kept for show_all_recipes and
+        refill the cooking recipe combo.
+        """
+        self._recipe_list_request += 1
+        request = self._recipe_list_request
+        
+        def on_done(recipes):
+            if full_list:
+                self._all_recipe_rows = recipes
+                self.load_cooking_recipes()
+            if request == self._recipe_list_request:
+                self.recipe_list_model.set_recipes(recipes)
+                self.status_bar.showMessage(status(len(recipes)))
+        
+        def on_error(message):
+            logger.error(f"{error}: {message}")
+            if request == self._recipe_list_request:
+                QMessageBox.critical(self, "Error", f"{error}: {message}")
+        
+        self.run_in_background(fn, *args, on_done=on_done, on_error=on_error)
+    
     def load_recipes(self):
         """Load all recipes into the recipe list"""
-        try:
-            recipes = get_all_recipes()
-            
-            self.recipe_list.clear()
-            
-            for recipe in recipes:
-                item = QListWidgetItem(recipe["name"])
-                item.setData(Qt.UserRole, recipe["id"])
-                self.recipe_list.addItem(item)
-            
-            self.status_bar.showMessage(f"Loaded {len(recipes)} recipes")
-            
-        except Exception as e:
-            logger.error(f"Error loading recipes: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to load recipes: {str(e)}")
+        self.fill_recipe_list(
+            list_recipes,
+            status=lambda count: f"Loaded {count} recipes",
+            error="Failed to load recipes",
+            full_list=True
+        )
+    
+    def show_all_recipes(self):
+        """Show every recipe, reusing the rows from the last load_recipes when there are any
+        
+        Recipes are only added through this window, and adding one calls load_recipes,
+        so the kept rows are current.
+        """
+        if self._all_recipe_rows is None:
+            self.load_recipes()
+            return
+        
+        # Supersede any search still running
+        self._recipe_list_request += 1
+        self.recipe_list_model.set_recipes(self._all_recipe_rows)
+        self.status_bar.showMessage(f"Loaded {len(self._all_recipe_rows)} recipes")
     
     def search_recipes(self):
         """Search recipes by name or description"""
+        # Return, the Search button or the debounce timer; a pending timed search is now redundant
+        self.search_timer.stop()
         query = self.recipe_search_input.text().strip()
         
         if not query:
-            self.load_recipes()
+            self.show_all_recipes()
             return
         
-        try:
-            recipes = search_recipes(query)
-            
-            self.recipe_list.clear()
-            
-            for recipe in recipes:
-                item = QListWidgetItem(recipe["name"])
-                item.setData(Qt.UserRole, recipe["id"])
-                self.recipe_list.addItem(item)
-            
-            self.status_bar.showMessage(f"Found {len(recipes)} recipes matching '{query}'")
-            
-        except Exception as e:
-            logger.error(f"Error searching recipes: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to search recipes: {str(e)}")
+        self.fill_recipe_list(
+            search_recipes, query,
+            status=lambda count: f"Found {count} recipes matching '{query}'",
+            error="Failed to search recipes"
+        )
     
-    def show_recipe_details(self, item):
-        """Show details for the selected recipe"""
-        recipe_id = item.data(Qt.UserRole)
+    def show_recipe_details(self, index):
+        """Show details for the recipe at the clicked model index"""
+        recipe_id = index.data(Qt.UserRole)
         
         try:
             recipe = get_recipe_by_id(recipe_id)
@@ -1956,27 +2423,23 @@ class MainWindow(QMainWindow):
                 
                 self.recipe_title.setText(recipe["name"])
                 
-                difficulty_color = "green" if recipe["difficulty"] == "Easy" else "orange" if recipe["difficulty"] == "Medium" else "red"
+                # Recipe fields are user or AI supplied; escape them before building rich text
+                difficulty_color = _DIFFICULTY_COLORS.get(recipe["difficulty"], "red")
                 
-                info_text = f"<b>Cooking Time:</b> {recipe['cooking_time']} minutes<br>"
-                info_text += f"<b>Difficulty:</b> <span style='color: {difficulty_color};'>{recipe['difficulty']}</span><br>"
-                info_text += f"<b>Description:</b> {recipe['description']}"
+                info_text = f"<b>Cooking Time:</b> {_esc(recipe['cooking_time'])} minutes<br>"
+                info_text += f"<b>Difficulty:</b> <span style='color: {difficulty_color};'>{_esc(recipe['difficulty'])}</span><br>"
+                info_text += f"<b>Description:</b> {_esc(recipe['description'])}"
                 
                 self.recipe_info.setText(info_text)
                 
-                ingredients_text = "<ul>"
-                for ingredient in recipe["ingredients"]:
-                    ingredients_text += f"<li><b>{ingredient['name']}:</b> {ingredient['amount']}</li>"
-                ingredients_text += "</ul>"
-                
-                self.recipe_ingredients.setText(ingredients_text)
+                ingredients_text = "".join(
+                    f"<li><b>{_esc(ingredient['name'])}:</b> {_esc(ingredient['amount'])}</li>"
+                    for ingredient in recipe["ingredients"]
+                )
+                self.recipe_ingredients.setText(f"<ul>{ingredients_text}</ul>")
                 
-                instructions_text = "<ol>"
-                for instruction in recipe["instructions"]:
-                    instructions_text += f"<li>{instruction}</li>"
-                instructions_text += "</ol>"
-                
-                self.recipe_instructions.setText(instructions_text)
+                instructions_text = "".join(f"<li>{_esc(instruction)}</li>" for instruction in recipe["instructions"])
+                self.recipe_instructions.setText(f"<ol>{instructions_text}</ol>")
                 
                 self.update_favorite_button(recipe_id)
                 
@@ -1987,13 +2450,21 @@ class MainWindow(QMainWindow):
             logger.error(f"Error showing recipe details: {e}")
             QMessageBox.critical(self, "Error", f"Failed to load recipe details: {str(e)}")
     
+    def favorite_ids(self):
+        """Ids of the favorite recipes, read once and then kept in step by toggle_favorite"""
+        if self._favorite_ids is None:
+            self._favorite_ids = _load_favorite_ids()
+        return self._favorite_ids
+    
+    def seed_favorite_ids(self, favorite_ids):
+        """Keep preloaded favorite ids unless favorite_ids() already read them"""
+        if self._favorite_ids is None:
+            self._favorite_ids = favorite_ids
+    
     def update_favorite_button(self, recipe_id):
         """Update the favorite button text based on whether the recipe is a favorite"""
         try:
-            favorites = get_favorite_recipes()
-            is_favorite = any(recipe["id"] == recipe_id for recipe in favorites)
-            
-            if is_favorite:
+            if recipe_id in self.favorite_ids():
                 self.favorite_button.setText("Remove from Favorites")
             else:
                 self.favorite_button.setText("Add to Favorites")
@@ -2009,15 +2480,18 @@ class MainWindow(QMainWindow):
         recipe_id = self.current_recipe["id"]
         
         try:
-            favorites = get_favorite_recipes()
-            is_favorite = any(recipe["id"] == recipe_id for recipe in favorites)
+            favorite_ids = self.favorite_ids()
             
-            if is_favorite:
-                if remove_from_favorites(recipe_id):
+            if recipe_id in favorite_ids:
+                removed = remove_from_favorites(recipe_id)
+                favorite_ids.discard(recipe_id)
+                if removed:
                     self.favorite_button.setText("Add to Favorites")
                     self.status_bar.showMessage(f"Removed '{self.current_recipe['name']}' from favorites")
             else:
-                if add_to_favorites(recipe_id):
+                added = add_to_favorites(recipe_id)
+                favorite_ids.add(recipe_id)
+                if added:
                     self.favorite_button.setText("Remove from Favorites")
                     self.status_bar.showMessage(f"Added '{self.current_recipe['name']}' to favorites")
                 
@@ -2027,21 +2501,11 @@ class MainWindow(QMainWindow):
     
     def show_favorites(self):
         """Show only favorite recipes in the recipe list"""
-        try:
-            favorites = get_favorite_recipes()
-            
-            self.recipe_list.clear()
-            
-            for recipe in favorites:
-                item = QListWidgetItem(recipe["name"])
-                item.setData(Qt.UserRole, recipe["id"])
-                self.recipe_list.addItem(item)
-            
-            self.status_bar.showMessage(f"Showing {len(favorites)} favorite recipes")
-            
-        except Exception as e:
-            logger.error(f"Error showing favorites: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to load favorite recipes: {str(e)}")
+        self.fill_recipe_list(
+            functools.partial(list_recipes, favorites_only=True),
+            status=lambda count: f"Showing {count} favorite recipes",
+            error="Failed to load favorite recipes"
+        )
     
     def start_cooking(self):
         """Start cooking the current recipe"""
@@ -2051,7 +2515,7 @@ class MainWindow(QMainWindow):
         
         self.switch_page(4)  # Cooking Guide page
         
-        index = self.cooking_recipe_combo.findText(self.current_recipe["name"])
+        index = self.cooking_index_by_id.get(self.current_recipe["id"], -1)
         if index >= 0:
             self.cooking_recipe_combo.setCurrentIndex(index)
             self.load_cooking_recipe()
@@ -2065,29 +2529,28 @@ class MainWindow(QMainWindow):
         try:
             grocery_items = get_grocery_list()
             pantry_items = get_pantry_ingredients()
-            pantry_item_names = [item["name"].lower() for item in pantry_items]
             
-            added_count = 0
+            # Names already on hand or on the list, lowercased for O(1) membership tests
+            skip_names = {item["name"].lower() for item in pantry_items}
+            skip_names.update(item["name"].lower() for item in grocery_items)
+            
+            new_items = []
             for ingredient in self.current_recipe["ingredients"]:
                 ingredient_name = ingredient["name"]
                 
-                if ingredient_name.lower() in pantry_item_names:
+                key = ingredient_name.lower()
+                if key in skip_names:
                     continue
+                skip_names.add(key)
                 
-                existing_item = next((item for item in grocery_items if item["name"].lower() == ingredient_name.lower()), None)
-                
-                if existing_item:
-                    continue
-                
-                grocery_items.append({
+                new_items.append({
                     "name": ingredient_name,
                     "amount": ingredient["amount"],
                     "checked": False
                 })
-                
-                added_count += 1
             
-            if update_grocery_list(grocery_items):
+            added_count = len(new_items)
+            if add_grocery_items(new_items):
                 self.load_grocery_list()
                 
                 QMessageBox.information(self, "Ingredients Added", f"Added {added_count} ingredients to your grocery list.")
@@ -2149,31 +2612,30 @@ class MainWindow(QMainWindow):
             self.suggestions_text.setPlainText("No recipe suggestions found for your ingredients.")
             return
         
-        html = "<h2>Recipe Suggestions</h2>"
+        # Collect the fragments and join once at the end
+        parts = ["<h2>Recipe Suggestions</h2>"]
         
         for i, recipe in enumerate(recipes):
-            html += f"<h3>{i+1}. {recipe['name']}</h3>"
-            html += f"<p><b>Description:</b> {recipe.get('description', '')}</p>"
+            parts.append(f"<h3>{i+1}. {_esc(recipe['name'])}</h3>")
+            parts.append(f"<p><b>Description:</b> {_esc(recipe.get('description', ''))}</p>")
             
-            html += "<p><b>Ingredients:</b></p><ul>"
+            parts.append("<p><b>Ingredients:</b></p><ul>")
             for ingredient in recipe.get('ingredients', []):
-                available = ingredient.get('available', False)
-                style = "color: green;" if available else "color: red;"
-                html += f"<li style='{style}'><b>{ingredient['name']}:</b> {ingredient.get('amount', '')}</li>"
-            html += "</ul>"
+                css_class = "available" if ingredient.get('available', False) else "missing"
+                parts.append(f"<li class='{css_class}'><b>{_esc(ingredient['name'])}:</b> {_esc(ingredient.get('amount', ''))}</li>")
+            parts.append("</ul>")
             
-            html += "<p><b>Instructions:</b></p><ol>"
-            for instruction in recipe.get('instructions', []):
-                html += f"<li>{instruction}</li>"
-            html += "</ol>"
+            parts.append("<p><b>Instructions:</b></p><ol>")
+            parts.extend(f"<li>{_esc(instruction)}</li>" for instruction in recipe.get('instructions', []))
+            parts.append("</ol>")
             
-            html += f"<p><b>Cooking Time:</b> {recipe.get('cooking_time', 0)} minutes</p>"
-            html += f"<p><b>Difficulty:</b> {recipe.get('difficulty', 'Medium')}</p>"
+            parts.append(f"<p><b>Cooking Time:</b> {_esc(recipe.get('cooking_time', 0))} minutes</p>")
+            parts.append(f"<p><b>Difficulty:</b> {_esc(recipe.get('difficulty', 'Medium'))}</p>")
             
             if i < len(recipes) - 1:
-                html += "<hr>"
+                parts.append("<hr>")
         
-        self.suggestions_text.setHtml(html)
+        self.suggestions_text.setHtml("".join(parts))
     
     def send_message(self):
         """Send a message to the AI cooking assistant"""
@@ -2189,22 +2651,52 @@ class MainWindow(QMainWindow):
         self.add_chat_bubble(message, True)
         self.message_input.clear()
         
-        # Show typing indicator and progress
-        self.add_typing_indicator()
+        # The indeterminate progress bar shows the AI is responding
         self.assistant_progress.setVisible(True)
         
         get_chat_response([{"role": "user", "content": message}], self.handle_assistant_response, self.current_model_type)
     
+    def handle_assistant_response_chunk(self, delta):
+        """Append a streamed piece of the assistant response to its bubble"""
+        if self.streaming_bubble is None:
+            self.streaming_text = ""
+            self.streaming_bubble = self.add_chat_bubble("", False)
+        
+        self.streaming_text += delta
+        self.set_chat_message(self.streaming_bubble, self.streaming_text, partial=True)
+        self.scroll_to_bottom()
+    
     def handle_assistant_response(self, result):
         """Handle the assistant response"""
         self.assistant_progress.setVisible(False)
         
+        # A streamed response already has a bubble; finalize it in place
+        bubble = self.streaming_bubble
+        self.streaming_bubble = None
+        self.streaming_text = ""
+        
         if "error" in result and result["error"]:
-            self.add_chat_bubble(f"Error: {result['error']}", False)
+            if bubble:
+                self.set_chat_message(bubble, f"Error: {result['error']}")
+            else:
+                self.add_chat_bubble(f"Error: {result['error']}", False)
             return
         
         response = result.get("response", "I'm sorry, I couldn't generate a response.")
-        self.add_chat_bubble(response, False)
+        
+        # Long responses can take a while to format; do it on the thread pool
+        # so the window keeps painting, then fill in or add the bubble
+        worker = MarkdownRenderWorker(response, self)
+        worker.signals.finished.connect(functools.partial(self.show_rendered_response, bubble))
+        worker.signals.finished.connect(worker.signals.deleteLater)
+        QThreadPool.globalInstance().start(worker)
+    
+    def show_rendered_response(self, bubble, message, html_text):
+        """Display an assistant response formatted by a MarkdownRenderWorker"""
+        if bubble:
+            self.set_chat_message(bubble, message, html_text=html_text)
+        else:
+            self.add_chat_bubble(message, False, pre_rendered_html=html_text)
     
     # Continue with all the remaining original backend methods...
     def add_pantry_item(self):
@@ -2216,16 +2708,8 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            pantry_items = get_pantry_ingredients()
-            
-            existing_item = next((item for item in pantry_items if item["name"].lower() == name.lower()), None)
-            
-            if existing_item:
-                existing_item["amount"] = amount
-            else:
-                pantry_items.append({"name": name, "amount": amount})
-            
-            if update_pantry_ingredients(pantry_items):
+            # An existing item with the same name (any case) just gets the new amount
+            if add_pantry_items([{"name": name, "amount": amount}]):
                 self.load_pantry()
                 self.pantry_item_input.clear()
                 self.pantry_amount_input.clear()
@@ -2236,19 +2720,15 @@ class MainWindow(QMainWindow):
     
     def remove_pantry_item(self):
         """Remove the selected item from the pantry"""
-        selected_items = self.pantry_list.selectedItems()
+        selected_indexes = self.pantry_list.selectionModel().selectedIndexes()
         
-        if not selected_items:
+        if not selected_indexes:
             return
         
         try:
-            pantry_items = get_pantry_ingredients()
-            
-            for item in selected_items:
-                item_name = item.text().split(" - ")[0]
-                pantry_items = [i for i in pantry_items if i["name"].lower() != item_name.lower()]
+            item_names = [index.data(Qt.UserRole) for index in selected_indexes]
             
-            if update_pantry_ingredients(pantry_items):
+            if remove_pantry_items(item_names):
                 self.load_pantry()
                 
         except Exception as e:
@@ -2258,7 +2738,7 @@ class MainWindow(QMainWindow):
     def clear_pantry(self):
         """Clear all items from the pantry"""
         try:
-            if update_pantry_ingredients([]):
+            if clear_pantry_items():
                 self.load_pantry()
                 
         except Exception as e:
@@ -2267,17 +2747,13 @@ class MainWindow(QMainWindow):
     
     def load_pantry(self):
         """Load pantry items into the pantry list"""
+        if not self._page_built(3):
+            return  # loaded when the page is first shown
+        
         try:
             pantry_items = get_pantry_ingredients()
             
-            self.pantry_list.clear()
-            
-            for item in pantry_items:
-                display_text = item["name"]
-                if item["amount"]:
-                    display_text += f" - {item['amount']}"
-                
-                self.pantry_list.addItem(display_text)
+            self.pantry_list_model.set_items(pantry_items)
             
         except Exception as e:
             logger.error(f"Error loading pantry: {e}")
@@ -2292,16 +2768,8 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            grocery_items = get_grocery_list()
-            
-            existing_item = next((item for item in grocery_items if item["name"].lower() == name.lower()), None)
-            
-            if existing_item:
-                existing_item["amount"] = amount
-            else:
-                grocery_items.append({"name": name, "amount": amount, "checked": False})
-            
-            if update_grocery_list(grocery_items):
+            # An existing item with the same name (any case) just gets the new amount
+            if add_grocery_items([{"name": name, "amount": amount, "checked": False}]):
                 self.load_grocery_list()
                 self.grocery_item_input.clear()
                 self.grocery_amount_input.clear()
@@ -2312,23 +2780,15 @@ class MainWindow(QMainWindow):
     
     def remove_grocery_item(self):
         """Remove the selected item from the grocery list"""
-        selected_items = self.grocery_list.selectedItems()
+        selected_indexes = self.grocery_list.selectionModel().selectedIndexes()
         
-        if not selected_items:
+        if not selected_indexes:
             return
         
         try:
-            grocery_items = get_grocery_list()
-            
-            for item in selected_items:
-                item_text = item.text()
-                if item_text.startswith("[x] "):
-                    item_text = item_text[4:]
-                
-                item_name = item_text.split(" - ")[0]
-                grocery_items = [i for i in grocery_items if i["name"].lower() != item_name.lower()]
+            item_names = [index.data(Qt.UserRole) for index in selected_indexes]
             
-            if update_grocery_list(grocery_items):
+            if remove_grocery_items(item_names):
                 self.load_grocery_list()
                 
         except Exception as e:
@@ -2338,7 +2798,7 @@ class MainWindow(QMainWindow):
     def clear_grocery_list(self):
         """Clear all items from the grocery list"""
         try:
-            if update_grocery_list([]):
+            if clear_grocery_items():
                 self.load_grocery_list()
                 
         except Exception as e:
@@ -2347,21 +2807,13 @@ class MainWindow(QMainWindow):
     
     def load_grocery_list(self):
         """Load grocery items into the grocery list"""
+        if not self._page_built(3):
+            return  # loaded when the page is first shown
+        
         try:
             grocery_items = get_grocery_list()
             
-            self.grocery_list.clear()
-            
-            for item in grocery_items:
-                display_text = ""
-                if item.get("checked", False):
-                    display_text = "[x] "
-                
-                display_text += item["name"]
-                if item["amount"]:
-                    display_text += f" - {item['amount']}"
-                
-                self.grocery_list.addItem(display_text)
+            self.grocery_list_model.set_items(grocery_items)
             
         except Exception as e:
             logger.error(f"Error loading grocery list: {e}")
@@ -2369,6 +2821,8 @@ class MainWindow(QMainWindow):
     
     def export_grocery_list(self):
         """Export the grocery list to a text file"""
+        from PyQt5.QtWidgets import QFileDialog
+        
         try:
             grocery_items = get_grocery_list()
             
@@ -2379,31 +2833,40 @@ class MainWindow(QMainWindow):
             file_path, _ = QFileDialog.getSaveFileName(self, "Export Grocery List", "grocery_list.txt", "Text Files (*.txt)")
             
             if file_path:
-                with open(file_path, "w") as f:
-                    f.write("DishDazzle Grocery List\n")
-                    f.write("======================\n\n")
-                    
-                    for item in grocery_items:
-                        status = "[x]" if item.get("checked", False) else "[ ]"
-                        amount = f" - {item['amount']}" if item["amount"] else ""
-                        f.write(f"{status} {item['name']}{amount}\n")
-                
-                QMessageBox.information(self, "Export Successful", "Grocery list exported successfully!")
+                # Write on the thread pool so a slow disk doesn't freeze the window
+                self.run_in_background(
+                    _write_grocery_list, file_path, grocery_items,
+                    on_done=lambda _: QMessageBox.information(self, "Export Successful", "Grocery list exported successfully!"),
+                    on_error=self.show_export_error
+                )
                 
         except Exception as e:
-            logger.error(f"Error exporting grocery list: {e}")
-            QMessageBox.critical(self, "Error", "Failed to export grocery list: {str(e)}")
+            self.show_export_error(str(e))
+    
+    def show_export_error(self, message):
+        """Report a failed grocery list export"""
+        logger.error(f"Error exporting grocery list: {message}")
+        QMessageBox.critical(self, "Error", f"Failed to export grocery list: {message}")
     
     def load_cooking_recipes(self):
         """Load recipes into the cooking recipe combo box"""
+        if not self._page_built(4):
+            return  # loaded when the page is first shown
+        
         try:
-            recipes = get_all_recipes()
+            # Reuse the rows from the last load_recipes rather than querying again
+            recipes = self._all_recipe_rows
+            if recipes is None:
+                recipes = list_recipes()
             
             self.cooking_recipe_combo.clear()
             
             for recipe in recipes:
                 self.cooking_recipe_combo.addItem(recipe["name"], recipe["id"])
             
+            # Combo position of each recipe id, for start_cooking
+            self.cooking_index_by_id = {recipe["id"]: i for i, recipe in enumerate(recipes)}
+            
         except Exception as e:
             logger.error(f"Error loading cooking recipes: {e}")
             QMessageBox.critical(self, "Error", f"Failed to load recipes: {str(e)}")
@@ -2419,13 +2882,19 @@ class MainWindow(QMainWindow):
             recipe = get_recipe_by_id(recipe_id)
             
             if recipe:
+                self.cooking_recipe = recipe
                 self.cooking_recipe_title.setText(recipe["name"])
                 
-                self.cooking_steps_list.clear()
-                
-                for i, instruction in enumerate(recipe["instructions"]):
-                    display_text = f"Step {i+1}: {instruction[:50]}..." if len(instruction) > 50 else f"Step {i+1}: {instruction}"
-                    self.cooking_steps_list.addItem(display_text)
+                # Refill in one batch and repaint once
+                self.cooking_steps_list.setUpdatesEnabled(False)
+                try:
+                    self.cooking_steps_list.clear()
+                    self.cooking_steps_list.addItems([
+                        f"Step {i+1}: {instruction[:50]}{'...' if len(instruction) > 50 else ''}"
+                        for i, instruction in enumerate(recipe["instructions"])
+                    ])
+                finally:
+                    self.cooking_steps_list.setUpdatesEnabled(True)
                 
                 if self.cooking_steps_list.count() > 0:
                     self.cooking_steps_list.setCurrentRow(0)
@@ -2446,20 +2915,16 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            recipe_id = self.cooking_recipe_combo.currentData()
-            if not recipe_id:
-                return
-                
-            recipe = get_recipe_by_id(recipe_id)
+            recipe = self.cooking_recipe
             if not recipe:
                 return
                 
-            step_text = item.text()
-            step_index = int(step_text.split(":")[0].replace("Step ", "")) - 1
+            # Rows are filled in step order, so the row is the step index
+            step_index = self.cooking_steps_list.row(item)
             
             if 0 <= step_index < len(recipe["instructions"]):
                 instruction = recipe["instructions"][step_index]
-                self.step_details_text.setText(instruction)
+                self.step_details_text.setPlainText(instruction)
                 
                 self.update_step_navigation()
                 
@@ -2500,43 +2965,37 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Empty Question", "Please enter a question to ask.")
             return
         
-        try:
-            recipe_id = self.cooking_recipe_combo.currentData()
-            if not recipe_id:
-                QMessageBox.warning(self, "No Recipe Selected", "Please select a recipe first.")
-                return
-                
-            recipe = get_recipe_by_id(recipe_id)
-            if not recipe:
-                return
-                
-            current_row = self.cooking_steps_list.currentRow()
-            if current_row < 0 or current_row >= len(recipe["instructions"]):
-                return
-                
-            current_step = recipe["instructions"][current_row]
-            
-            self.step_answer_text.setText("Getting answer...")
-            QApplication.processEvents()
-            
-            context = {"name": recipe["name"], "current_step": current_step}
-            result = get_cooking_assistance(question, context, None, self.current_model_type)
-            
-            if "error" in result and result["error"]:
-                self.step_answer_text.setText(f"Error: {result['error']}")
-            else:
-                self.step_answer_text.setText(result.get("response", "No response received."))
-            
-            self.step_question_input.clear()
-            
-        except Exception as e:
-            logger.error(f"Error asking cooking question: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to get answer: {str(e)}")
-            self.step_answer_text.setText("Error getting answer. Please try again.")
+        recipe = self.cooking_recipe
+        if not recipe:
+            QMessageBox.warning(self, "No Recipe Selected", "Please select a recipe first.")
+            return
+        
+        current_row = self.cooking_steps_list.currentRow()
+        if current_row < 0 or current_row >= len(recipe["instructions"]):
+            return
+        
+        current_step = recipe["instructions"][current_row]
+        
+        self._step_question_request += 1
+        request = self._step_question_request
+        
+        def on_done(answer):
+            if request == self._step_question_request:
+                self.step_answer_text.setPlainText(answer)
+        
+        def on_error(message):
+            logger.error(f"Error asking cooking question: {message}")
+            if request == self._step_question_request:
+                self.step_answer_text.setPlainText(f"Error: {message}")
+        
+        self.step_answer_text.setPlainText("Getting answer...")
+        self.step_question_input.clear()
+        self.run_in_background(_answer_step_question, question, recipe["name"], current_step, self.current_model_type,
+                               on_done=on_done, on_error=on_error)
     
-    def show_add_recipe_dialog(self):
-        """Show the dialog to add a new recipe"""
-        from PyQt5.QtWidgets import QDialog, QFormLayout, QDialogButtonBox, QTextEdit, QLineEdit, QSpinBox, QComboBox
+    def build_add_recipe_dialog(self):
+        """Create the add recipe dialog; built once and reused by show_add_recipe_dialog"""
+        from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QFormLayout
         
         dialog = QDialog(self)
         dialog.setWindowTitle("Add New Recipe")
@@ -2544,57 +3003,73 @@ class MainWindow(QMainWindow):
         
         layout = QFormLayout(dialog)
         
-        name_input = QLineEdit()
-        name_input.setPlaceholderText("Enter recipe name")
-        layout.addRow("Name:", name_input)
+        self.add_recipe_name = QLineEdit()
+        self.add_recipe_name.setPlaceholderText("Enter recipe name")
+        layout.addRow("Name:", self.add_recipe_name)
         
-        description_input = QTextEdit()
-        description_input.setMaximumHeight(80)
-        description_input.setPlaceholderText("Enter recipe description")
-        layout.addRow("Description:", description_input)
+        self.add_recipe_description = QTextEdit()
+        self.add_recipe_description.setMaximumHeight(80)
+        self.add_recipe_description.setPlaceholderText("Enter recipe description")
+        layout.addRow("Description:", self.add_recipe_description)
         
-        cooking_time_input = QSpinBox()
-        cooking_time_input.setRange(1, 500)
-        cooking_time_input.setSuffix(" minutes")
-        layout.addRow("Cooking Time:", cooking_time_input)
+        self.add_recipe_cooking_time = QSpinBox()
+        self.add_recipe_cooking_time.setRange(1, 500)
+        self.add_recipe_cooking_time.setSuffix(" minutes")
+        layout.addRow("Cooking Time:", self.add_recipe_cooking_time)
         
-        difficulty_input = QComboBox()
-        difficulty_input.addItems(["Easy", "Medium", "Hard"])
-        layout.addRow("Difficulty:", difficulty_input)
+        self.add_recipe_difficulty = QComboBox()
+        self.add_recipe_difficulty.addItems(["Easy", "Medium", "Hard"])
+        layout.addRow("Difficulty:", self.add_recipe_difficulty)
         
-        ingredients_input = QTextEdit()
-        ingredients_input.setMaximumHeight(120)
-        ingredients_input.setPlaceholderText("Enter ingredients (one per line)\nFormat: Name - Amount")
-        layout.addRow("Ingredients:", ingredients_input)
+        self.add_recipe_ingredients = QTextEdit()
+        self.add_recipe_ingredients.setMaximumHeight(120)
+        self.add_recipe_ingredients.setPlaceholderText("Enter ingredients (one per line)\nFormat: Name - Amount")
+        layout.addRow("Ingredients:", self.add_recipe_ingredients)
         
-        instructions_input = QTextEdit()
-        instructions_input.setMaximumHeight(200)
-        instructions_input.setPlaceholderText("Enter instructions (one per line)")
-        layout.addRow("Instructions:", instructions_input)
+        self.add_recipe_instructions = QTextEdit()
+        self.add_recipe_instructions.setMaximumHeight(200)
+        self.add_recipe_instructions.setPlaceholderText("Enter instructions (one per line)")
+        layout.addRow("Instructions:", self.add_recipe_instructions)
         
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         button_box.accepted.connect(dialog.accept)
         button_box.rejected.connect(dialog.reject)
         layout.addRow(button_box)
         
-        if dialog.exec_() == QDialog.Accepted:
+        self.add_recipe_dialog = dialog
+    
+    def show_add_recipe_dialog(self):
+        """Show the dialog to add a new recipe"""
+        from PyQt5.QtWidgets import QDialog
+        
+        if self.add_recipe_dialog is None:
+            self.build_add_recipe_dialog()
+        
+        # Start from an empty form each time, as a freshly built dialog would
+        self.add_recipe_name.clear()
+        self.add_recipe_description.clear()
+        self.add_recipe_cooking_time.setValue(self.add_recipe_cooking_time.minimum())
+        self.add_recipe_difficulty.setCurrentIndex(0)
+        self.add_recipe_ingredients.clear()
+        self.add_recipe_instructions.clear()
+        self.add_recipe_name.setFocus()
+        
+        if self.add_recipe_dialog.exec_() == QDialog.Accepted:
             ingredients = []
-            for line in ingredients_input.toPlainText().split('\n'):
+            for line in self.add_recipe_ingredients.toPlainText().split('\n'):
                 line = line.strip()
                 if line:
-                    if ' - ' in line:
-                        name, amount = line.split(' - ', 1)
-                        ingredients.append({"name": name.strip(), "amount": amount.strip()})
-                    else:
-                        ingredients.append({"name": line, "amount": ""})
+                    # "name - amount"; lines without the separator have no amount
+                    name, _, amount = line.partition(' - ')
+                    ingredients.append({"name": name.strip(), "amount": amount.strip()})
             
-            instructions = [line.strip() for line in instructions_input.toPlainText().split('\n') if line.strip()]
+            instructions = [line.strip() for line in self.add_recipe_instructions.toPlainText().split('\n') if line.strip()]
             
             recipe_data = {
-                "name": name_input.text(),
-                "description": description_input.toPlainText(),
-                "cooking_time": cooking_time_input.value(),
-                "difficulty": difficulty_input.currentText(),
+                "name": self.add_recipe_name.text(),
+                "description": self.add_recipe_description.toPlainText(),
+                "cooking_time": self.add_recipe_cooking_time.value(),
+                "difficulty": self.add_recipe_difficulty.currentText(),
                 "ingredients": ingredients,
                 "instructions": instructions
             }
@@ -2603,10 +3078,11 @@ class MainWindow(QMainWindow):
                 recipe_id = add_recipe(recipe_data)
                 
                 if recipe_id:
-                    QMessageBox.information(self, "Recipe Added", f"Recipe '{recipe_data['name']}' added successfully!")
-                    
+                    # Reloads in the background while the confirmation is up; the cooking
+                    # combo is refilled from the same rows when they arrive
                     self.load_recipes()
-                    self.load_cooking_recipes()
+                    
+                    QMessageBox.information(self, "Recipe Added", f"Recipe '{recipe_data['name']}' added successfully!")
                 else:
                     QMessageBox.warning(self, "Add Failed", "Failed to add the recipe to the database.")
             except Exception as e:
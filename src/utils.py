@@ -7,10 +7,27 @@ Provides logging, configuration, and helper functions
 """
 
 import os
+import copy
 import json
+import functools
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+# orjson encodes and decodes several times faster than the stdlib; fall back to json if absent.
+# Files are read and written as UTF-8 bytes, which both json.loads and orjson.loads accept.
+try:
+    import orjson
+    
+    def _dumps(value):
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(value):
+        return json.dumps(value, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    _loads = json.loads
 
 # Base paths
 BASE_DIR = Path(os.path.dirname(os.path.dirname(__file__)))
@@ -18,6 +35,12 @@ CONFIG_DIR = BASE_DIR / 'config'
 CONFIG_FILE = CONFIG_DIR / 'config.json'
 LOG_DIR = BASE_DIR / 'logs'
 
+# Create the config and log directories once per process rather than on every write
+CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+logger = logging.getLogger(__name__)
+
 # Default configuration
 DEFAULT_CONFIG = {
     "openai_api_key": "",
@@ -27,6 +50,16 @@ DEFAULT_CONFIG = {
     "max_cache_size": 100
 }
 
+# Display colors for recipe difficulty levels
+DIFFICULTY_COLORS = {
+    "Easy": "#4CAF50",  # Green
+    "Medium": "#FF9800",  # Orange
+    "Hard": "#F44336"  # Red
+}
+
+# (mtime_ns, config) of the config file as last read or written
+_config_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+
 
 def setup_logging(log_level: Optional[str] = None) -> None:
     """Set up logging configuration
@@ -34,9 +67,6 @@ def setup_logging(log_level: Optional[str] = None) -> None:
     Args:
         log_level: Optional log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
-    # Create log directory if it doesn't exist
-    os.makedirs(LOG_DIR, exist_ok=True)
-    
     # Get log level from config if not provided
     if log_level is None:
         config = load_config()
@@ -55,8 +85,6 @@ def setup_logging(log_level: Optional[str] = None) -> None:
         ]
     )
     
-    # Create logger
-    logger = logging.getLogger(__name__)
     logger.info(f"Logging initialized with level {log_level}")
 
 
@@ -65,27 +93,32 @@ def load_config() -> Dict[str, Any]:
     
     Returns:
         Dictionary containing configuration values
+    
+    The parsed file is cached and only re-read when its modification time
+    changes; each call returns a deep copy, so callers may modify it, nested
+    values included, without touching the cache.
     """
-    # Create config directory if it doesn't exist
-    os.makedirs(CONFIG_DIR, exist_ok=True)
+    global _config_cache
     
-    # If config file doesn't exist, create it with default values
-    if not os.path.exists(CONFIG_FILE):
+    try:
+        mtime = os.stat(CONFIG_FILE).st_mtime_ns
+    except FileNotFoundError:
+        # If config file doesn't exist, create it with default values
         save_config(DEFAULT_CONFIG)
         return DEFAULT_CONFIG.copy()
     
+    if _config_cache is not None and _config_cache[0] == mtime:
+        return copy.deepcopy(_config_cache[1])
+    
     try:
-        with open(CONFIG_FILE, 'r') as f:
-            config = json.load(f)
+        config = _loads(CONFIG_FILE.read_bytes())
         
-        # Ensure all default keys are present
-        for key, value in DEFAULT_CONFIG.items():
-            if key not in config:
-                config[key] = value
+        # Ensure all default keys are present; values from the file win
+        config = {**DEFAULT_CONFIG, **config}
         
-        return config
+        _config_cache = (mtime, config)
+        return copy.deepcopy(config)
     except Exception as e:
-        logger = logging.getLogger(__name__)
         logger.error(f"Error loading config: {e}")
         return DEFAULT_CONFIG.copy()
 
@@ -99,22 +132,30 @@ def save_config(config: Dict[str, Any]) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    global _config_cache
+    
     try:
-        # Create config directory if it doesn't exist
-        os.makedirs(CONFIG_DIR, exist_ok=True)
+        with open(CONFIG_FILE, 'wb') as f:
+            f.write(_dumps(config))
         
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        # Keep the defaults merged in, as load_config would after re-reading; copied
+        # deeply so later edits to the caller's dict cannot reach the cache
+        _config_cache = (os.stat(CONFIG_FILE).st_mtime_ns, copy.deepcopy({**DEFAULT_CONFIG, **config}))
         
-        logger = logging.getLogger(__name__)
         logger.info("Configuration saved successfully")
         return True
     except Exception as e:
-        logger = logging.getLogger(__name__)
+        invalidate_config_cache()
         logger.error(f"Error saving config: {e}")
         return False
 
 
+def invalidate_config_cache() -> None:
+    """Force the next load_config call to re-read the config file"""
+    global _config_cache
+    _config_cache = None
+
+
 def update_config(key: str, value: Any) -> bool:
     """Update a specific configuration value
     
@@ -130,7 +171,6 @@ def update_config(key: str, value: Any) -> bool:
         config[key] = value
         return save_config(config)
     except Exception as e:
-        logger = logging.getLogger(__name__)
         logger.error(f"Error updating config: {e}")
         return False
 
@@ -160,14 +200,12 @@ def export_recipe_to_json(recipe_data: Dict[str, Any], file_path: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        with open(file_path, 'w') as f:
-            json.dump(recipe_data, f, indent=4)
+        with open(file_path, 'wb') as f:
+            f.write(_dumps(recipe_data))
         
-        logger = logging.getLogger(__name__)
         logger.info(f"Recipe exported successfully to {file_path}")
         return True
     except Exception as e:
-        logger = logging.getLogger(__name__)
         logger.error(f"Error exporting recipe: {e}")
         return False
 
@@ -182,18 +220,16 @@ def import_recipe_from_json(file_path: str) -> Optional[Dict[str, Any]]:
         Recipe data dictionary if successful, None otherwise
     """
     try:
-        with open(file_path, 'r') as f:
-            recipe_data = json.load(f)
+        recipe_data = _loads(Path(file_path).read_bytes())
         
-        logger = logging.getLogger(__name__)
         logger.info(f"Recipe imported successfully from {file_path}")
         return recipe_data
     except Exception as e:
-        logger = logging.getLogger(__name__)
         logger.error(f"Error importing recipe: {e}")
         return None
 
 
+@functools.lru_cache(maxsize=512)
 def format_cooking_time(minutes: int) -> str:
     """Format cooking time from minutes to a human-readable string
     
@@ -224,10 +260,4 @@ def get_difficulty_color(difficulty: str) -> str:
     Returns:
         Hex color code for the difficulty
     """
-    difficulty_colors = {
-        "Easy": "#4CAF50",  # Green
-        "Medium": "#FF9800",  # Orange
-        "Hard": "#F44336"  # Red
-    }
-    
-    return difficulty_colors.get(difficulty, "#9E9E9E")  # Default to gray
\ No newline at end of file
+    return DIFFICULTY_COLORS.get(difficulty, "#9E9E9E")  # Default to gray
\ No newline at end of file
@@ -1,96 +1,289 @@
 import os
 import sys
+import json
+import time
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+import threading
 import unittest
-from unittest.mock import patch, MagicMock
+from pathlib import Path
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
-# Add the src directory to the path so we can import the modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add the src directory to the path so we can import the modules the way main.py does
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from src.api import (
-    init_api, get_recipe_suggestions, get_ingredient_substitutions,
-    get_cooking_assistance, get_chat_response
-)
+import api
+from api import ResponseCache, RequestBatcher, ClientInfo, get_recipe_suggestions, get_ingredient_substitutions
 
-class TestAPI(unittest.TestCase):
-    @patch('src.api.openai.ChatCompletion.create')
-    def test_get_recipe_suggestions(self, mock_create):
-        # Mock the OpenAI API response
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = {'content': '{"recipes": [{"name": "Pasta", "ingredients": ["pasta", "sauce"], "instructions": ["cook pasta", "add sauce"]}]}'}
-        mock_create.return_value = mock_response
-        
-        # Call the function with test ingredients
+RECIPES_RESPONSE = {"recipes": [{"name": "Pasta", "ingredients": ["pasta", "sauce"], "instructions": ["cook pasta", "add sauce"]}]}
+SUBSTITUTIONS_RESPONSE = {"substitutions": [{"name": "margarine", "ratio": "1:1", "notes": "Slightly less rich"}]}
+
+
+class StubClient:
+    """Stands in for AsyncOpenAI, answering every completion with canned content"""
+    
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+        self.gate = None
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        
+        # Hold the response until the test opens the gate
+        if self.gate is not None:
+            while not self.gate.is_set():
+                await asyncio.sleep(0.01)
+        
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))])
+
+
+class TestAPIRequests(unittest.TestCase):
+    def setUp(self):
+        # Fresh in-memory cache and a stubbed client for the default model
+        self.stub = StubClient(json.dumps(RECIPES_RESPONSE))
+        self.patchers = [
+            patch.object(api, 'response_cache', ResponseCache(maxsize=16, ttl=60)),
+            patch.dict(api._clients, {"deepseek": ClientInfo(self.stub, "test/model")}, clear=True),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+    
+    def tearDown(self):
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+    
+    def test_get_recipe_suggestions(self):
         result = get_recipe_suggestions(["pasta", "sauce"])
         
         # Verify the result
-        self.assertIsNotNone(result)
-        self.assertIn("recipes", result)
-        self.assertEqual(len(result["recipes"]), 1)
-        self.assertEqual(result["recipes"][0]["name"], "Pasta")
-    
-    @patch('src.api.openai.ChatCompletion.create')
-    def test_get_ingredient_substitutions(self, mock_create):
-        # Mock the OpenAI API response
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = {'content': '{"substitutions": [{"original": "butter", "substitute": "margarine"}]}'}
-        mock_create.return_value = mock_response
-        
-        # Call the function with test ingredient
-        result = get_ingredient_substitutions("butter")
+        self.assertEqual(result, RECIPES_RESPONSE)
+        self.assertEqual(self.stub.calls, 1)
+    
+    def test_second_identical_call_is_cache_hit(self):
+        first = get_recipe_suggestions(["pasta", "sauce"])
         
-        # Verify the result
-        self.assertIsNotNone(result)
-        self.assertIn("substitutions", result)
-        self.assertEqual(len(result["substitutions"]), 1)
-        self.assertEqual(result["substitutions"][0]["original"], "butter")
-        self.assertEqual(result["substitutions"][0]["substitute"], "margarine")
-    
-    @patch('src.api.openai.ChatCompletion.create')
-    def test_get_cooking_assistance(self, mock_create):
-        # Mock the OpenAI API response
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = {'content': 'Chop the onions finely and sauté them until translucent.'}
-        mock_create.return_value = mock_response
-        
-        # Call the function with test question and context
-        result = get_cooking_assistance("How do I chop onions?", "Recipe: Pasta with Onions\nCurrent step: Prepare the onions")
+        # Same ingredients in another order and case normalize to the same key
+        second = get_recipe_suggestions(["Sauce ", "pasta"])
         
-        # Verify the result
-        self.assertIsNotNone(result)
-        self.assertIn("Chop the onions", result)
+        self.assertEqual(second, first)
+        self.assertEqual(self.stub.calls, 1)
     
-    @patch('src.api.openai.ChatCompletion.create')
-    def test_get_chat_response(self, mock_create):
-        # Mock the OpenAI API response
-        mock_response = MagicMock()
-        mock_response.choices = [MagicMock()]
-        mock_response.choices[0].message = {'content': 'You can substitute milk with almond milk in most recipes.'}
-        mock_create.return_value = mock_response
+    def test_concurrent_identical_calls_share_one_request(self):
+        self.stub.gate = threading.Event()
         
-        # Call the function with test message
-        result = get_chat_response("What can I use instead of milk?")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(get_recipe_suggestions, ["pasta", "sauce"]) for _ in range(4)]
+            
+            # Let every caller reach the in-flight request before it answers
+            deadline = time.time() + 5
+            while self.stub.calls == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.1)
+            self.stub.gate.set()
+            
+            results = [future.result(timeout=5) for future in futures]
         
-        # Verify the result
-        self.assertIsNotNone(result)
-        self.assertIn("almond milk", result)
-    
-    @patch('src.api.get_config')
-    def test_init_api(self, mock_get_config):
-        # Mock the config
-        mock_get_config.return_value = {
-            "api": {
-                "openai_api_key": "test_key",
-                "model": "gpt-3.5-turbo"
-            }
-        }
-        
-        # Call the function
-        init_api()
-        
-        # No assertion needed as we're just testing that it doesn't raise an exception
+        self.assertEqual(self.stub.calls, 1)
+        self.assertTrue(all(result == RECIPES_RESPONSE for result in results))
+        self.assertEqual(api._inflight, {})
+    
+    def test_failed_parse_is_not_cached(self):
+        self.stub.content = "Sorry, I cannot help with that."
+        
+        result = get_recipe_suggestions(["pasta"])
+        self.assertIn("error", result)
+        
+        # The next identical call asks the model again
+        get_recipe_suggestions(["pasta"])
+        self.assertEqual(self.stub.calls, 2)
+    
+    def test_cache_key_includes_model(self):
+        get_recipe_suggestions(["pasta"])
+        
+        # Switching the configured model must not reuse the previous model's answer
+        api._clients["deepseek"] = ClientInfo(self.stub, "other/model")
+        get_recipe_suggestions(["pasta"])
+        
+        self.assertEqual(self.stub.calls, 2)
+    
+    def test_substitutions_cache_hit(self):
+        self.stub.content = json.dumps(SUBSTITUTIONS_RESPONSE)
+        
+        first = get_ingredient_substitutions("butter")
+        second = get_ingredient_substitutions("Butter")
+        
+        self.assertEqual(first, SUBSTITUTIONS_RESPONSE)
+        self.assertEqual(second, first)
+        self.assertEqual(self.stub.calls, 1)
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_entries_expire(self):
+        cache = ResponseCache(maxsize=4, ttl=10)
+        
+        with patch('api.time.time', return_value=1000.0) as mock_time:
+            cache["key"] = "value"
+            
+            mock_time.return_value = 1009.0
+            self.assertEqual(cache.get("key"), "value")
+            
+            mock_time.return_value = 1011.0
+            self.assertIsNone(cache.get("key"))
+            self.assertNotIn("key", cache)
+            self.assertEqual(len(cache), 0)
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache["a"] = 1
+        cache["b"] = 2
+        
+        # Reading "a" makes "b" the least recently used
+        self.assertEqual(cache.get("a"), 1)
+        cache["c"] = 3
+        
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(len(cache), 2)
+    
+    def test_falsy_values_are_cached(self):
+        cache = ResponseCache(maxsize=2, ttl=60)
+        cache["empty"] = {}
+        
+        self.assertIn("empty", cache)
+        self.assertEqual(cache.get("empty", "missing"), {})
+
+
+class TestPersistentResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / 'api_cache.db'
+        self.caches = []
+    
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def open_cache(self, ttl=60, disk_maxsize=16):
+        cache = ResponseCache(maxsize=4, ttl=ttl, path=self.path, disk_maxsize=disk_maxsize)
+        self.caches.append(cache)
+        return cache
+    
+    def disk_keys(self):
+        conn = sqlite3.connect(str(self.path))
+        try:
+            return [row[0] for row in conn.execute("SELECT key FROM response_cache ORDER BY expires_at")]
+        finally:
+            conn.close()
+    
+    def test_entry_survives_reload(self):
+        key = ("recipe_suggestions", "test/model", b"\x00\x01")
+        cache = self.open_cache()
+        cache[key] = RECIPES_RESPONSE
+        cache.flush()
+        
+        # A new cache on the same file, as after a restart, reads the entry back
+        reloaded = self.open_cache()
+        self.assertEqual(reloaded.get(key), RECIPES_RESPONSE)
+        self.assertEqual(len(reloaded), 1)
+    
+    def test_close_finishes_queued_writes(self):
+        cache = self.open_cache()
+        cache[("key",)] = "value"
+        cache.close()
+        
+        self.assertEqual(self.open_cache().get(("key",)), "value")
+    
+    def test_expired_entry_is_not_reloaded(self):
+        with patch('api.time.time', return_value=1000.0) as mock_time:
+            cache = self.open_cache(ttl=10)
+            cache[("key",)] = "value"
+            cache.flush()
+            
+            mock_time.return_value = 1011.0
+            reloaded = self.open_cache(ttl=10)
+            self.assertIsNone(reloaded.get(("key",)))
+            
+            # The expired row is deleted from the file as well
+            reloaded.flush()
+            self.assertEqual(self.disk_keys(), [])
+    
+    def test_file_keeps_at_most_disk_maxsize_entries(self):
+        cache = self.open_cache(disk_maxsize=3)
+        with patch('api.time.time', return_value=1000.0) as mock_time:
+            for i in range(5):
+                mock_time.return_value = 1000.0 + i
+                cache[(f"key{i}",)] = i
+            cache.flush()
+        
+        # The entries expiring soonest are dropped first
+        self.assertEqual(self.disk_keys(), ["key2", "key3", "key4"])
+    
+    def test_writes_do_not_wait_for_the_file(self):
+        cache = self.open_cache()
+        cache[("first",)] = 1
+        cache.flush()
+        
+        # Another connection holds the file's write lock for a moment
+        blocker = sqlite3.connect(str(self.path), isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        try:
+            started = time.time()
+            cache[("second",)] = 2
+            self.assertEqual(cache.get(("second",)), 2)
+            self.assertLess(time.time() - started, 0.5)
+        finally:
+            blocker.execute("COMMIT")
+            blocker.close()
+        
+        cache.flush()
+        self.assertEqual(self.disk_keys(), ["first", "second"])
+    
+    def test_clear_removes_persisted_entries(self):
+        cache = self.open_cache()
+        cache[("key",)] = "value"
+        cache.clear()
+        cache.flush()
+        
+        self.assertNotIn(("key",), self.open_cache())
+
+
+class TestRequestBatcher(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+    
+    async def flush(self, signature, items):
+        self.batches.append((signature, list(items)))
+        return [f"{signature}:{item}" for item in items]
+    
+    def submit_all(self, batcher, requests):
+        async def gather():
+            return await asyncio.gather(*(batcher.submit(signature, item) for signature, item in requests))
+        return api._run_sync(gather())
+    
+    def test_requests_in_window_share_one_flush(self):
+        batcher = RequestBatcher(self.flush, max_batch_size=10, max_wait_ms=20)
+        
+        results = self.submit_all(batcher, [("deepseek", "a"), ("deepseek", "b"), ("llama", "c")])
+        
+        # Each waiter gets its own result, and each signature is flushed once
+        self.assertEqual(results, ["deepseek:a", "deepseek:b", "llama:c"])
+        self.assertEqual(sorted(self.batches), [("deepseek", ["a", "b"]), ("llama", ["c"])])
+    
+    def test_full_batch_flushes_immediately(self):
+        batcher = RequestBatcher(self.flush, max_batch_size=2, max_wait_ms=20)
+        
+        results = self.submit_all(batcher, [("deepseek", item) for item in "abc"])
+        
+        self.assertEqual(results, ["deepseek:a", "deepseek:b", "deepseek:c"])
+        self.assertEqual(self.batches, [("deepseek", ["a", "b"]), ("deepseek", ["c"])])
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,39 +1,146 @@
 import os
 import sys
-import unittest
+import shutil
+import sqlite3
 import tempfile
+import unittest
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
-# Add the src directory to the path so we can import the modules
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add the src directory to the path so we can import the modules the way main.py does
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from src.database import (
-    init_db, create_tables, get_all_recipes, add_recipe, 
-    get_recipe_by_id, update_recipe, delete_recipe
+import database
+from database import (
+    initialize_database, close_connections, acquire, list_recipes, get_recipes_full,
+    get_recipe_by_id, search_recipes, add_recipe, update_recipe, delete_recipe,
+    add_to_favorites, remove_from_favorites, get_favorite_recipes,
+    get_pantry_ingredients, add_pantry_items, remove_pantry_items, clear_pantry_items,
+    update_pantry_ingredients, get_grocery_list, add_grocery_items, remove_grocery_items,
+    clear_grocery_items, update_grocery_list, SAMPLE_RECIPES
 )
 
+# Schema and data as written by the original JSON-column version of database.py
+BASELINE_SCHEMA = '''
+CREATE TABLE recipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT,
+    ingredients TEXT NOT NULL,
+    instructions TEXT NOT NULL,
+    cooking_time INTEGER,
+    difficulty TEXT CHECK(difficulty IN ('Easy', 'Medium', 'Hard')),
+    image_url TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipe_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (recipe_id) REFERENCES recipes (id) ON DELETE CASCADE
+);
+CREATE TABLE pantry (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ingredients TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE grocery_list (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    items TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+INSERT INTO recipes (name, description, ingredients, instructions, cooking_time, difficulty, image_url, created_at)
+VALUES ('Tomato Soup', 'Warm and simple', '[{"name": "Tomatoes", "amount": "6"}, {"name": "Salt", "amount": "1 pinch"}]',
+        '["Chop the tomatoes", "Simmer for 20 minutes"]', 30, 'Easy', '', '2024-01-02 03:04:05');
+INSERT INTO favorites (recipe_id, created_at) VALUES (1, '2024-01-02 03:04:05');
+INSERT INTO favorites (recipe_id, created_at) VALUES (1, '2024-01-03 03:04:05');
+INSERT INTO pantry (ingredients) VALUES ('[{"name": "Flour", "amount": "1 kg"}]');
+INSERT INTO grocery_list (items) VALUES ('[{"name": "Milk", "amount": "1 l", "checked": false}]');
+'''
+
+
+def make_recipe(name="Test Recipe", **fields):
+    recipe = {
+        "name": name,
+        "description": "A recipe for testing",
+        "ingredients": [{"name": "ingredient1", "amount": "1 cup"}, {"name": "ingredient2", "amount": "2 tbsp"}],
+        "instructions": ["step1", "step2"],
+        "cooking_time": 30,
+        "difficulty": "Easy",
+        "image_url": "http://example.com/image.jpg"
+    }
+    recipe.update(fields)
+    return recipe
+
+
 class TestDatabase(unittest.TestCase):
     def setUp(self):
-        # Create a temporary database file
-        self.db_fd, self.db_path = tempfile.mkstemp()
-        # Initialize the database with the temporary file
-        init_db(self.db_path)
-        create_tables()
+        # Point the module at a fresh database file in a temporary directory
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.temp_dir) / 'dishdazzle.db'
+        self.patchers = [
+            patch.object(database, 'DB_PATH', self.db_path),
+            patch.object(database, '_wal_enabled', False),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
         
+        # Drop pooled connections and cached recipes left over from another database
+        close_connections()
+    
     def tearDown(self):
         # Close and remove the temporary database
-        os.close(self.db_fd)
-        os.unlink(self.db_path)
+        close_connections()
+        for patcher in reversed(self.patchers):
+            patcher.stop()
+        shutil.rmtree(self.temp_dir)
+    
+    def count_rows(self, table):
+        with acquire() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    
+    def test_initialize_seeds_sample_recipes(self):
+        initialize_database()
+        
+        names = [recipe["name"] for recipe in list_recipes()]
+        self.assertEqual(names, sorted(recipe["name"] for recipe in SAMPLE_RECIPES))
+        
+        # Running it again keeps the schema and does not seed twice
+        initialize_database()
+        self.assertEqual(len(list_recipes()), len(SAMPLE_RECIPES))
+    
+    def trace_transactions(self):
+        """Record the BEGIN statements run on every connection opened from here on"""
+        statements = []
+        open_connection = database.get_db_connection
+        
+        def traced_connection():
+            conn = open_connection()
+            conn.set_trace_callback(statements.append)
+            return conn
+        
+        patcher = patch.object(database, 'get_db_connection', traced_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return lambda: [statement for statement in statements if statement.startswith("BEGIN")]
+    
+    def test_initialize_uses_one_transaction(self):
+        begins = self.trace_transactions()
+        
+        # A fresh database gets its schema, indexes and sample recipes in one commit
+        initialize_database()
+        self.assertEqual(len(begins()), 1)
+        
+        # A restart finds everything in place and needs just the one transaction
+        close_connections()
+        initialize_database()
+        self.assertEqual(len(begins()), 2)
+        self.assertEqual([r["name"] for r in search_recipes("apr")], ["Caprese Salad"])
     
     def test_add_and_get_recipe(self):
-        # Test adding a recipe
-        recipe = {
-            "name": "Test Recipe",
-            "ingredients": ["ingredient1", "ingredient2"],
-            "instructions": ["step1", "step2"],
-            "cooking_time": 30,
-            "difficulty": "Easy",
-            "image_url": "http://example.com/image.jpg"
-        }
+        initialize_database()
+        recipe = make_recipe(ingredients=[{"name": "Egg", "amount": "2"}, "Salt"])
         
         # Add the recipe
         recipe_id = add_recipe(recipe)
@@ -44,96 +151,271 @@ class TestDatabase(unittest.TestCase):
         # Get the recipe by ID
         retrieved_recipe = get_recipe_by_id(recipe_id)
         
-        # Verify the retrieved recipe matches what we added
+        # Verify the retrieved recipe matches what we added, children in list order
         self.assertEqual(retrieved_recipe["name"], recipe["name"])
         self.assertEqual(retrieved_recipe["cooking_time"], recipe["cooking_time"])
         self.assertEqual(retrieved_recipe["difficulty"], recipe["difficulty"])
+        self.assertEqual(retrieved_recipe["ingredients"], [{"name": "Egg", "amount": "2"}, {"name": "Salt", "amount": ""}])
+        self.assertEqual(retrieved_recipe["instructions"], recipe["instructions"])
+        self.assertIsInstance(retrieved_recipe["created_at"], int)
+        
+        self.assertIsNone(get_recipe_by_id(recipe_id + 1000))
     
-    def test_get_all_recipes(self):
-        # Add multiple recipes
-        recipes = [
-            {
-                "name": "Recipe 1",
-                "ingredients": ["ingredient1", "ingredient2"],
-                "instructions": ["step1", "step2"],
-                "cooking_time": 30,
-                "difficulty": "Easy",
-                "image_url": "http://example.com/image1.jpg"
-            },
-            {
-                "name": "Recipe 2",
-                "ingredients": ["ingredient3", "ingredient4"],
-                "instructions": ["step1", "step2"],
-                "cooking_time": 45,
-                "difficulty": "Medium",
-                "image_url": "http://example.com/image2.jpg"
-            }
-        ]
+    def test_get_recipes_full(self):
+        initialize_database()
+        recipes = [make_recipe("Recipe 1"), make_recipe("Recipe 2", instructions=["only step"])]
         
         for recipe in recipes:
             add_recipe(recipe)
         
         # Get all recipes
-        all_recipes = get_all_recipes()
+        all_recipes = {recipe["name"]: recipe for recipe in get_recipes_full()}
+        
+        # Verify every recipe came back with its own children
+        self.assertEqual(len(all_recipes), len(SAMPLE_RECIPES) + len(recipes))
+        self.assertEqual(all_recipes["Recipe 2"]["instructions"], ["only step"])
+        self.assertEqual(all_recipes["Recipe 1"]["ingredients"], recipes[0]["ingredients"])
+    
+    def test_search_recipes(self):
+        initialize_database()
+        
+        # Queries match anywhere in names and descriptions, like the original LIKE search
+        self.assertEqual([r["name"] for r in search_recipes("agli")], ["Pasta Aglio e Olio"])
+        self.assertEqual([r["name"] for r in search_recipes("HEARTY BEEF")], ["Classic Beef Stew"])
+        self.assertEqual(search_recipes("hearty stew"), [])
+        
+        # Typing more of a word only narrows the results
+        for query in ("ap", "apr", "apre", "caprese"):
+            self.assertEqual([r["name"] for r in search_recipes(query)], ["Caprese Salad"], query)
+        self.assertEqual([r["name"] for r in search_recipes("tew")], ["Classic Beef Stew"])
+        self.assertEqual([r["name"] for r in search_recipes("ast")], ["Pasta Aglio e Olio"])
+        
+        # Wildcards and quotes are matched literally
+        self.assertEqual(search_recipes("%"), [])
+        self.assertEqual(search_recipes('"pasta'), [])
+        
+        # The search index follows inserts, updates and deletes
+        recipe_id = add_recipe(make_recipe("Lemon Tart"))
+        self.assertEqual([r["name"] for r in search_recipes("lemon")], ["Lemon Tart"])
+        
+        update_recipe(recipe_id, make_recipe("Lime Tart"))
+        self.assertEqual(search_recipes("lemon"), [])
+        self.assertEqual([r["name"] for r in search_recipes("lime")], ["Lime Tart"])
         
-        # Verify we got the correct number of recipes
-        self.assertEqual(len(all_recipes), len(recipes))
+        delete_recipe(recipe_id)
+        self.assertEqual(search_recipes("lime"), [])
+    
+    def test_word_tokenized_index_is_rebuilt(self):
+        initialize_database()
+        
+        # Replace the index with the word-tokenized one earlier versions created
+        with acquire(readonly=False) as conn:
+            conn.execute("DROP TABLE recipes_fts")
+            conn.execute("CREATE VIRTUAL TABLE recipes_fts USING fts5(name, description, content='recipes', content_rowid='id')")
+        
+        initialize_database()
+        self.assertEqual([r["name"] for r in search_recipes("apr")], ["Caprese Salad"])
     
     def test_update_recipe(self):
-        # Add a recipe
-        recipe = {
-            "name": "Original Recipe",
-            "ingredients": ["ingredient1", "ingredient2"],
-            "instructions": ["step1", "step2"],
-            "cooking_time": 30,
-            "difficulty": "Easy",
-            "image_url": "http://example.com/image.jpg"
-        }
+        initialize_database()
+        recipe_id = add_recipe(make_recipe("Original Recipe"))
         
-        recipe_id = add_recipe(recipe)
+        # Read it once so the cached copy has to be invalidated by the update
+        self.assertEqual(get_recipe_by_id(recipe_id)["name"], "Original Recipe")
         
         # Update the recipe
-        updated_recipe = {
-            "id": recipe_id,
-            "name": "Updated Recipe",
-            "ingredients": ["ingredient1", "ingredient2", "ingredient3"],
-            "instructions": ["step1", "step2", "step3"],
-            "cooking_time": 45,
-            "difficulty": "Medium",
-            "image_url": "http://example.com/updated_image.jpg"
-        }
-        
-        update_recipe(updated_recipe)
+        updated_recipe = make_recipe(
+            "Updated Recipe",
+            ingredients=[{"name": "ingredient3", "amount": "3"}],
+            instructions=["step1", "step2", "step3"],
+            cooking_time=45,
+            difficulty="Medium"
+        )
+        
+        self.assertTrue(update_recipe(recipe_id, updated_recipe))
         
         # Get the updated recipe
         retrieved_recipe = get_recipe_by_id(recipe_id)
         
-        # Verify the update was successful
+        # Verify the update was successful and the child rows were replaced
         self.assertEqual(retrieved_recipe["name"], updated_recipe["name"])
         self.assertEqual(retrieved_recipe["cooking_time"], updated_recipe["cooking_time"])
         self.assertEqual(retrieved_recipe["difficulty"], updated_recipe["difficulty"])
+        self.assertEqual(retrieved_recipe["ingredients"], updated_recipe["ingredients"])
+        self.assertEqual(retrieved_recipe["instructions"], updated_recipe["instructions"])
+        
+        # Updating a missing recipe reports that nothing changed
+        self.assertFalse(update_recipe(recipe_id + 1000, updated_recipe))
     
     def test_delete_recipe(self):
-        # Add a recipe
-        recipe = {
-            "name": "Recipe to Delete",
-            "ingredients": ["ingredient1", "ingredient2"],
-            "instructions": ["step1", "step2"],
-            "cooking_time": 30,
-            "difficulty": "Easy",
-            "image_url": "http://example.com/image.jpg"
-        }
-        
-        recipe_id = add_recipe(recipe)
+        initialize_database()
+        recipe_id = add_recipe(make_recipe("Recipe to Delete"))
+        add_to_favorites(recipe_id)
         
         # Verify it was added
         self.assertIsNotNone(get_recipe_by_id(recipe_id))
         
         # Delete the recipe
-        delete_recipe(recipe_id)
+        self.assertTrue(delete_recipe(recipe_id))
         
-        # Verify it was deleted
+        # Verify it was deleted, along with its child rows and favorite
         self.assertIsNone(get_recipe_by_id(recipe_id))
+        with acquire() as conn:
+            for table in ("recipe_ingredients", "recipe_instructions", "favorites"):
+                count = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE recipe_id = ?", (recipe_id,)).fetchone()[0]
+                self.assertEqual(count, 0, table)
+        
+        self.assertFalse(delete_recipe(recipe_id))
+    
+    def test_favorites(self):
+        initialize_database()
+        recipe_id = list_recipes()[0]["id"]
+        
+        # Adding twice keeps a single favorite
+        self.assertTrue(add_to_favorites(recipe_id))
+        self.assertFalse(add_to_favorites(recipe_id))
+        
+        self.assertEqual([r["id"] for r in list_recipes(favorites_only=True)], [recipe_id])
+        favorites = get_favorite_recipes()
+        self.assertEqual([r["id"] for r in favorites], [recipe_id])
+        self.assertTrue(favorites[0]["ingredients"])
+        
+        self.assertTrue(remove_from_favorites(recipe_id))
+        self.assertFalse(remove_from_favorites(recipe_id))
+        self.assertEqual(list_recipes(favorites_only=True), [])
+    
+    def test_pantry_items(self):
+        initialize_database()
+        self.assertEqual(get_pantry_ingredients(), [])
+        
+        add_pantry_items([{"name": "Salt", "amount": "1 box"}, {"name": "Rice", "amount": "2 kg"}])
+        
+        # Names match case-insensitively, so this updates Salt in place
+        add_pantry_items([{"name": "salt", "amount": "2 boxes"}])
+        self.assertEqual(get_pantry_ingredients(), [
+            {"name": "Salt", "amount": "2 boxes"},
+            {"name": "Rice", "amount": "2 kg"}
+        ])
+        
+        remove_pantry_items(["RICE"])
+        self.assertEqual(get_pantry_ingredients(), [{"name": "Salt", "amount": "2 boxes"}])
+        
+        update_pantry_ingredients([{"name": "Oil", "amount": "1 l"}])
+        self.assertEqual(get_pantry_ingredients(), [{"name": "Oil", "amount": "1 l"}])
+        
+        clear_pantry_items()
+        self.assertEqual(get_pantry_ingredients(), [])
+    
+    def test_grocery_list(self):
+        initialize_database()
+        self.assertEqual(get_grocery_list(), [])
+        
+        items = [{"name": "Milk", "amount": "1 l", "checked": False}, {"name": "Eggs", "amount": "", "checked": True}]
+        self.assertTrue(update_grocery_list(items))
+        self.assertEqual(get_grocery_list(), items)
+        
+        # Re-adding an item updates its amount in place and keeps it checked
+        add_grocery_items([{"name": "eggs", "amount": "12"}, {"name": "Bread", "amount": "1 loaf"}])
+        self.assertEqual(get_grocery_list(), [
+            {"name": "Milk", "amount": "1 l", "checked": False},
+            {"name": "Eggs", "amount": "12", "checked": True},
+            {"name": "Bread", "amount": "1 loaf", "checked": False}
+        ])
+        
+        remove_grocery_items(["MILK"])
+        self.assertEqual([item["name"] for item in get_grocery_list()], ["Eggs", "Bread"])
+        
+        clear_grocery_items()
+        self.assertEqual(get_grocery_list(), [])
+    
+    def test_fresh_database_has_no_legacy_tables(self):
+        initialize_database()
+        
+        with acquire() as conn:
+            tables = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue({"pantry_items", "grocery_items"} <= tables)
+        self.assertFalse({"pantry", "grocery_list", "kv"} & tables)
+    
+    def test_migrate_kv_lists(self):
+        # Databases from the kv-table version kept both lists as JSON rows there
+        conn = sqlite3.connect(str(self.db_path))
+        conn.executescript('''
+        CREATE TABLE kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at INTEGER NOT NULL DEFAULT 0);
+        INSERT INTO kv (key, value) VALUES ('pantry', '[{"name": "Rice", "amount": "2 kg"}]');
+        INSERT INTO kv (key, value) VALUES ('grocery', '[{"name": "Eggs", "amount": "6", "checked": true}]');
+        ''')
+        conn.close()
+        
+        initialize_database()
+        
+        self.assertEqual(get_pantry_ingredients(), [{"name": "Rice", "amount": "2 kg"}])
+        self.assertEqual(get_grocery_list(), [{"name": "Eggs", "amount": "6", "checked": True}])
+        
+        # Items edited after the move are not overwritten by the old rows on the next start
+        clear_grocery_items()
+        close_connections()
+        initialize_database()
+        self.assertEqual(get_grocery_list(), [])
+    
+    def test_concurrent_reads_during_writes(self):
+        initialize_database()
+        
+        # Pooled readers run alongside the single writer without errors or lost writes
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            writes = [executor.submit(add_recipe, make_recipe(f"Concurrent {i}")) for i in range(20)]
+            reads = [executor.submit(list_recipes) for _ in range(40)]
+            recipe_ids = [future.result() for future in writes]
+            for future in reads:
+                self.assertGreaterEqual(len(future.result()), len(SAMPLE_RECIPES))
+        
+        self.assertEqual(len(set(recipe_ids)), 20)
+        self.assertEqual(len(list_recipes()), len(SAMPLE_RECIPES) + 20)
+    
+    def test_migrate_baseline_database(self):
+        # Build a database the way the original JSON-column schema left it
+        conn = sqlite3.connect(str(self.db_path))
+        conn.executescript(BASELINE_SCHEMA)
+        conn.close()
+        
+        initialize_database()
+        
+        # Recipes keep their data, with ingredients and instructions moved into child tables
+        recipes = get_recipes_full()
+        self.assertEqual([recipe["name"] for recipe in recipes], ["Tomato Soup"])
+        recipe = recipes[0]
+        self.assertEqual(recipe["ingredients"], [{"name": "Tomatoes", "amount": "6"}, {"name": "Salt", "amount": "1 pinch"}])
+        self.assertEqual(recipe["instructions"], ["Chop the tomatoes", "Simmer for 20 minutes"])
+        with acquire() as conn:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(recipes)")}
+        self.assertNotIn("ingredients", columns)
+        self.assertNotIn("instructions", columns)
+        
+        # TIMESTAMP text became epoch seconds
+        self.assertEqual(recipe["created_at"], 1704164645)
+        
+        # Duplicate favorites collapse to one, and the favorite survived the table rebuilds
+        self.assertEqual([r["id"] for r in list_recipes(favorites_only=True)], [recipe["id"]])
+        self.assertEqual(self.count_rows("favorites"), 1)
+        
+        # Pantry and grocery JSON rows were carried over
+        self.assertEqual(get_pantry_ingredients(), [{"name": "Flour", "amount": "1 kg"}])
+        self.assertEqual(get_grocery_list(), [{"name": "Milk", "amount": "1 l", "checked": False}])
+        
+        # Existing recipes mean no samples are added; migrated recipes are searchable
+        self.assertEqual(len(list_recipes()), 1)
+        self.assertEqual([r["name"] for r in search_recipes("tomato")], ["Tomato Soup"])
+        
+        # The search index follows the rebuilt recipes table
+        recipe_id = add_recipe(make_recipe("Onion Soup"))
+        self.assertEqual([r["name"] for r in search_recipes("soup")], ["Onion Soup", "Tomato Soup"])
+        delete_recipe(recipe_id)
+        
+        # A second start-up finds nothing left to migrate and runs a single transaction
+        close_connections()
+        begins = self.trace_transactions()
+        initialize_database()
+        self.assertEqual(len(begins()), 1)
+        self.assertEqual(get_recipe_by_id(recipe["id"])["ingredients"], recipe["ingredients"])
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()